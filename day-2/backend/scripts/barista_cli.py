@@ -1,21 +1,16 @@
 #!/usr/bin/env python3
 """Interactive Barista CLI for Everbean Coffee.
-Asks clarifying questions until the order is complete, then saves to `orders/`.
+Asks clarifying questions until the order is complete, then saves it to the
+order store under `orders/`.
 """
-from datetime import datetime
-import json
 import os
 import sys
 
-ORDER_SCHEMA = ["drinkType", "size", "milk", "extras", "name"]
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-PROMPTS = {
-    "drinkType": "What would you like to drink? (e.g. latte, cappuccino, americano)",
-    "size": "What size? (small/medium/large)",
-    "milk": "Which milk? (dairy/oat/almond/soy)",
-    "extras": "Any extras? (comma-separated, or 'none')",
-    "name": "What's the name for the order?",
-}
+from menu import FIELD_CATEGORIES, load_menu  # noqa: E402
+from order_state import ORDER_SCHEMA, PROMPTS, normalize_extras  # noqa: E402
+from order_store import open_repository  # noqa: E402
 
 
 def ask(prompt):
@@ -26,27 +21,9 @@ def ask(prompt):
         sys.exit(0)
 
 
-def normalize_extras(text):
-    if not text:
-        return []
-    t = text.strip()
-    if t.lower() == "none":
-        return []
-    return [e.strip() for e in t.split(",") if e.strip()]
-
-
 def save_order(order):
-    cwd = os.getcwd()
-    orders_dir = os.path.join(cwd, "orders")
-    os.makedirs(orders_dir, exist_ok=True)
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    name_part = order.get("name") or "guest"
-    filename = f"order_{ts}_{name_part.replace(' ', '_')}.json"
-    filepath = os.path.join(orders_dir, filename)
-    order_copy = {**order, "saved_at": datetime.utcnow().isoformat() + "Z"}
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(order_copy, f, indent=2, ensure_ascii=False)
-    return filepath
+    record = open_repository().add(order)
+    return record["id"]
 
 
 def run():
@@ -70,8 +47,19 @@ def run():
             if ans.strip().lower() in ("quit", "exit"):
                 print("Bye — see you next time!")
                 return
+            menu = load_menu()
             if field == "extras":
-                order["extras"] = normalize_extras(ans)
+                order["extras"] = normalize_extras(ans, menu)
+                skipped = menu.match_list(ans, "extras")[1] if ans.strip().lower() != "none" else []
+                if skipped:
+                    print(f"Sorry, we don't have: {', '.join(skipped)}")
+            elif field in FIELD_CATEGORIES:
+                found = menu.match(ans, FIELD_CATEGORIES[field])
+                if found is None:
+                    options = ", ".join(menu.categories[FIELD_CATEGORIES[field]])
+                    print(f"Sorry, that's not on our menu. We have: {options}")
+                    continue
+                order[field] = found.item
             else:
                 order[field] = ans.strip()
         # All fields filled — confirm with user
@@ -83,8 +71,8 @@ def run():
         print(f"  Name: {order['name']}")
         confirm = ask("Would you like to place this order? (yes/no)")
         if confirm.strip().lower() in ("y", "yes"):
-            path = save_order(order)
-            print(f"Thanks! Your order was saved to: {path}")
+            order_id = save_order(order)
+            print(f"Thanks! Your order number is: {order_id}")
             print("Have a lovely day — enjoy your coffee!")
             return
         else:
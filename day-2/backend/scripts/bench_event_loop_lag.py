@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Measure event-loop lag caused by tool persistence under a slow disk.
+
+A probe task wakes every `--interval` ms and records how late it ran while
+simulated tool calls persist records. "before" writes synchronously inside
+the handler (the old `open`/`json.dump` pattern); "after" hands the record to
+`write_behind.WriteBehindWriter`. The slow disk is simulated by sleeping
+`--disk-ms` in the write (blocking, as a real fsync would).
+
+Usage: python scripts/bench_event_loop_lag.py [--calls 50] [--disk-ms 40]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from write_behind import WriteBehindWriter  # noqa: E402
+
+
+def slow_write(disk_ms):
+    def sink(records, sync):
+        for _ in records:
+            time.sleep(disk_ms / 1000)
+
+    return sink
+
+
+async def probe(interval_ms, lags, stop):
+    interval = interval_ms / 1000
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+async def run(mode, calls, disk_ms, interval_ms, gap_ms):
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(interval_ms, lags, stop))
+    sink = slow_write(disk_ms)
+    writer = WriteBehindWriter(sink)
+
+    handler_ms = []
+    for i in range(calls):
+        start = time.perf_counter()
+        if mode == "before":
+            sink([{"order": i}], True)
+        else:
+            await writer.submit({"order": i})
+        handler_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(gap_ms / 1000)
+
+    await writer.aclose()
+    stop.set()
+    await probe_task
+    lags.sort()
+    return {
+        "handler_p50_ms": statistics.median(handler_ms),
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--disk-ms", type=float, default=40.0)
+    parser.add_argument("--interval", type=float, default=5.0, help="probe interval in ms")
+    parser.add_argument("--gap-ms", type=float, default=20.0, help="time between tool calls")
+    args = parser.parse_args()
+
+    print(f"slow disk: {args.disk_ms} ms per write, {args.calls} tool calls")
+    print(f"{'mode':>7} | {'handler p50':>11} | {'lag p50':>8} {'lag p99':>8} {'lag max':>8}  (ms)")
+    for mode in ("before", "after"):
+        r = asyncio.run(run(mode, args.calls, args.disk_ms, args.interval, args.gap_ms))
+        print(
+            f"{mode:>7} | {r['handler_p50_ms']:>11.2f} | "
+            f"{r['lag_p50_ms']:>8.2f} {r['lag_p99_ms']:>8.2f} {r['lag_max_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Time to first audio with sentence-only vs adaptive first-chunk segmentation.
+
+Streams agent replies from a stub LLM at each `--rates` (tokens per second,
+one word per token, `--chunk-tokens` tokens per streamed chunk) into the
+barista's `CachedTTS` (empty cache, text pacing on) in front of a stub
+Murf that answers after `--tts-ttfb`. Each reply is timed from the first
+LLM token to the first audio frame, once with the plain sentence tokenizer
+and once with `text_segmentation.AdaptiveSentenceTokenizer`.
+
+Prints one JSON object: the median time to first audio per rate and mode,
+and for the adaptive mode the first chunk of every reply, so the cuts can
+be checked by ear (or eye).
+
+Usage: python scripts/bench_first_chunk.py [--rates 10,20,50,100] [--chunk-tokens 1] [--tts-ttfb 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from livekit.agents import APIConnectOptions, tokenize, tts, utils  # noqa: E402
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS  # noqa: E402
+
+from text_segmentation import AdaptiveSentenceTokenizer  # noqa: E402
+from tts_cache import AudioCache, CachedTTS  # noqa: E402
+
+SAMPLE_RATE = 24000
+REPLIES = [
+    "Great choice, a large oat latte coming right up. Would you like any extras, like vanilla or caramel syrup?",
+    "I would recommend our seasonal maple latte with a shot of vanilla syrup, it is our most popular drink this week.",
+    "Sure. Can I get a name for the order?",
+    "That sounds like a really full day, and it is okay to feel a bit tired. "
+    "What is one small thing you would like to get done this morning?",
+    "Razorpay offers a payment gateway, payment links and subscriptions for businesses of every size. "
+    "Could you tell me a little about what your company sells?",
+    "Thanks for sharing that with me today. I have noted your mood as calm and your energy as medium.",
+]
+
+
+class StubTTS(tts.TTS):
+    """Non-streaming Murf stand-in: first audio after `ttfb`, 0.3 s of audio per word."""
+
+    def __init__(self, ttfb: float) -> None:
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=SAMPLE_RATE, num_channels=1)
+        self.ttfb = ttfb
+        self.texts = []
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        self.texts.append(text)
+        return StubChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class StubChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        await asyncio.sleep(self._tts.ttfb)
+        output_emitter.initialize(
+            request_id=utils.shortuuid(), sample_rate=SAMPLE_RATE, num_channels=1, mime_type="audio/pcm"
+        )
+        output_emitter.push(bytes(2 * int(SAMPLE_RATE * 0.3 * len(self._input_text.split()))))
+        output_emitter.flush()
+
+
+async def first_audio(reply, tokenizer, rate, args, cache_dir):
+    stub = StubTTS(args.tts_ttfb)
+    cached = CachedTTS(
+        tts=stub, cache=AudioCache(cache_dir), voice="bench", sentence_tokenizer=tokenizer, text_pacing=True
+    )
+    stream = cached.stream()
+    words = [word + " " for word in reply.split()]
+    start = time.perf_counter()
+
+    async def llm():
+        for i in range(0, len(words), args.chunk_tokens):
+            if i:
+                await asyncio.sleep(args.chunk_tokens / rate)
+            stream.push_text("".join(words[i : i + args.chunk_tokens]))
+        stream.end_input()
+
+    feeding = asyncio.create_task(llm())
+    async for _ in stream:
+        break
+    seconds = time.perf_counter() - start
+    await utils.aio.cancel_and_wait(feeding)
+    await stream.aclose()
+    await cached.aclose()
+    return seconds, stub.texts[0]
+
+
+async def run(args):
+    modes = {
+        "sentences": lambda: tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+        "adaptive": lambda: AdaptiveSentenceTokenizer(),
+    }
+    result = {"settings": vars(args), "ttfa_ms": {}, "first_chunks": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rate in args.rates:
+            row = {}
+            for mode, make_tokenizer in modes.items():
+                times = []
+                for n, reply in enumerate(REPLIES):
+                    # A fresh cache directory, so every sentence is a miss
+                    cache_dir = os.path.join(tmp, f"{rate}-{mode}-{n}")
+                    seconds, first = await first_audio(reply, make_tokenizer(), rate, args, cache_dir)
+                    times.append(seconds * 1000)
+                    if mode == "adaptive":
+                        result["first_chunks"].setdefault(f"{rate:g} tok/s", []).append(first)
+                row[mode] = round(statistics.median(times), 1)
+            result["ttfa_ms"][f"{rate:g} tok/s"] = row
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")], default=[10, 20, 50, 100])
+    parser.add_argument("--chunk-tokens", type=int, default=1)
+    parser.add_argument("--tts-ttfb", type=float, default=0.2)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark menu matching on noisy, transcript-like variants.
+
+Generates `--variants` noisy spellings of the phrases in `menu.json`
+(dropped, doubled, swapped and substituted letters, plus filler words such
+as "please"), then times `MenuCatalog.match` on them with the per-query cache
+cleared, and reports throughput and how often the canonical item was found.
+
+Usage: python scripts/bench_menu_matching.py [--variants 5000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from menu import MenuCatalog  # noqa: E402
+
+FILLERS = ["", "", "please", "a", "can I get a", "uh", "with"]
+SOUNDALIKE = {"c": "k", "k": "c", "s": "z", "ph": "f", "ee": "ea", "o": "oh"}
+
+
+def misspell(rng, phrase):
+    word = list(phrase)
+    op = rng.choice(["drop", "double", "swap", "sub", "soundalike", "none"])
+    i = rng.randrange(1, len(word)) if len(word) > 1 else 0
+    if op == "drop" and len(word) > 4:
+        del word[i]
+    elif op == "double":
+        word.insert(i, word[i])
+    elif op == "swap" and i < len(word) - 1:
+        word[i], word[i + 1] = word[i + 1], word[i]
+    elif op == "sub":
+        word[i] = rng.choice("aeiou") if word[i] in "aeiou" else word[i]
+    elif op == "soundalike":
+        text = "".join(word)
+        for a, b in SOUNDALIKE.items():
+            if a in text[1:]:
+                return text[0] + text[1:].replace(a, b, 1)
+    return "".join(word)
+
+
+def variants(menu, n, rng):
+    phrases = [
+        (category, canonical, phrase)
+        for category in menu.categories
+        for phrase, canonical in menu.lexicon(category).items()
+    ]
+    out = []
+    for _ in range(n):
+        category, canonical, phrase = rng.choice(phrases)
+        text = f"{rng.choice(FILLERS)} {misspell(rng, phrase)} {rng.choice(FILLERS)}".strip()
+        out.append((text, category, canonical))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    menu = MenuCatalog.load()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = variants(menu, args.variants, random.Random(args.seed))
+    timings, correct, missed = [], 0, 0
+    for text, category, canonical in queries:
+        menu._cache.clear()  # time the index, not the cache
+        start = time.perf_counter()
+        found = menu.match(text, category)
+        timings.append((time.perf_counter() - start) * 1e6)
+        if found is None:
+            missed += 1
+        elif found.item == canonical:
+            correct += 1
+
+    # Repeated phrases ("oat milk") are answered from the per-query cache
+    repeated = queries[:1000]
+    for text, category, _ in repeated:
+        menu.match(text, category)
+    start = time.perf_counter()
+    for text, category, _ in repeated:
+        menu.match(text, category)
+    cached_us = (time.perf_counter() - start) / len(repeated) * 1e6
+
+    timings.sort()
+    wrong = len(queries) - correct - missed
+    print(f"catalog compiled in {build_ms:.2f} ms")
+    print(f"{len(queries)} noisy variants: {len(queries) / (sum(timings) / 1e6):,.0f} matches/s uncached")
+    print(f"latency us: p50 {statistics.median(timings):.1f}  p99 {timings[int(len(timings) * 0.99) - 1]:.1f}  "
+          f"max {timings[-1]:.1f}  cached {cached_us:.2f}")
+    print(f"canonical item found: {correct / len(queries):.1%}  "
+          f"no match: {missed / len(queries):.1%}  wrong item: {wrong / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Memory per job process with and without shared model weights.
+
+Starts a forkserver the way the worker does, preloading the agent's
+plugins (plus `shared_models` in shared mode), and forks N job processes.
+Each one runs the agent's VAD setup and a few VAD inferences, then reports
+its memory while all N are alive, so shared pages are split between them.
+
+Rooms per GB assumes one room per job process (the worker default) and
+uses PSS, which counts shared pages once across the processes.
+
+    uv run python scripts/bench_model_memory.py --processes 8
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+
+def job_process(results, release) -> None:
+    import numpy as np
+    from livekit.plugins.silero import onnx_model
+
+    import shared_models
+
+    preloaded = shared_models.preloaded()
+    vad = shared_models.vad()
+    model = onnx_model.OnnxModel(onnx_session=vad._onnx_session, sample_rate=16000)
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(50):
+        model(rng.standard_normal(model.window_size_samples).astype(np.float32) * 0.1)
+    results.put({**shared_models.memory_usage(), "preloaded": preloaded})
+    release.wait()
+
+
+def run_mode(shared: bool, processes: int) -> dict:
+    """Runs in its own interpreter: the forkserver preload is fixed once started."""
+    import agent
+    import shared_models
+
+    os.environ["SHARE_MODELS"] = "1" if shared else "0"
+    preload = [f"livekit.plugins.{name}" for name in agent.PLUGINS] + ["av"]
+    if shared:
+        shared_models.enable()
+        preload.append("shared_models")
+
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload(preload)
+    results, release = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=job_process, args=(results, release)) for _ in range(processes)]
+    for proc in procs:
+        proc.start()
+    usage = [results.get(timeout=300) for _ in procs]
+    release.set()
+    for proc in procs:
+        proc.join()
+
+    report = {"mode": "shared" if shared else "per_process", "processes": processes}
+    for field in ("rss_mb", "pss_mb", "uss_mb"):
+        values = [u[field] for u in usage if field in u]
+        if values:
+            report[f"mean_{field}"] = round(statistics.fmean(values), 1)
+    report["preloaded"] = sum(u["preloaded"] for u in usage)
+    per_room = report.get("mean_pss_mb", report["mean_rss_mb"])
+    report["rooms_per_gb"] = round(1024 / per_room, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--mode", choices=["shared", "per_process"], help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode == "shared", args.processes)))
+        return
+
+    reports = []
+    for mode in ("per_process", "shared"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--processes", str(args.processes)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        reports.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for r in reports:
+        print(
+            f"{r['mode']:12} {r['processes']} procs  rss {r['mean_rss_mb']:7.1f} MB  "
+            f"pss {r.get('mean_pss_mb', float('nan')):7.1f} MB  "
+            f"uss {r.get('mean_uss_mb', float('nan')):7.1f} MB  "
+            f"rooms/GB {r['rooms_per_gb']:5.1f}  preloaded {r['preloaded']}"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Load-test the live order feed end to end over SSE.
+
+Publishes orders into an `order_queue.OrderQueue` at `--rate` orders per
+minute while `--displays` SSE clients consume `/orders/stream`, and reports
+publish-to-delivery latency. Halfway through, one display disconnects and
+resumes with `Last-Event-ID` to check replay delivers every order exactly
+once.
+
+Usage: python scripts/bench_order_queue.py [--orders 1000] [--rate 1000] [--displays 4]
+(the defaults take one minute; raise --rate for a quicker run)
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from order_queue import OrderQueue, OrderStreamServer  # noqa: E402
+
+
+async def read_events(response):
+    """Yield parsed SSE events from an aiohttp response."""
+    while True:
+        chunk = await response.content.readuntil(b"\n\n")
+        if chunk.startswith(b":"):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+        yield int(fields["id"]), json.loads(fields["data"])
+
+
+async def display(url, total, latencies, seen, reconnect_at=None):
+    """Consume the stream; `reconnect_at` drops and resumes the connection once."""
+    last_id = None
+    async with aiohttp.ClientSession() as http:
+        while len(seen) < total:
+            headers = {"Last-Event-ID": str(last_id)} if last_id is not None else {}
+            async with http.get(url, headers=headers) as response:
+                async for offset, event in read_events(response):
+                    if latencies is not None:
+                        latencies.append((time.time() - event["ts"]) * 1000)
+                    seen.append(event["order"]["n"])
+                    last_id = offset
+                    if len(seen) >= total:
+                        return
+                    if reconnect_at is not None and len(seen) == reconnect_at:
+                        reconnect_at = None
+                        break  # drop the connection and resume from last_id
+
+
+async def run(args):
+    queue = OrderQueue()
+    server = OrderStreamServer(queue, port=0)
+    await server.start()
+    url = f"http://127.0.0.1:{server.port}/orders/stream?offset={queue.next_offset}"
+
+    # Display 0 reconnects halfway; it checks replay, so it's left out of the
+    # live delivery latency numbers.
+    latencies, seen = [], [[] for _ in range(args.displays)]
+    tasks = [
+        asyncio.create_task(display(url, args.orders, None, seen[0], reconnect_at=args.orders // 2))
+    ] + [
+        asyncio.create_task(display(url, args.orders, latencies, seen[i]))
+        for i in range(1, args.displays)
+    ]
+    await asyncio.sleep(0.2)  # let displays connect
+
+    interval = 60 / args.rate
+    start = time.perf_counter()
+    for n in range(args.orders):
+        queue.publish("placed", {"n": n, "drinkType": "latte", "size": "large", "name": f"guest{n}"})
+        await asyncio.sleep(max(0.0, start + (n + 1) * interval - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=30)
+    await server.aclose()
+
+    latencies.sort()
+    complete = all(s == list(range(args.orders)) for s in seen)
+    print(f"published {args.orders} orders in {elapsed:.1f}s ({args.orders / elapsed * 60:.0f}/min) to {args.displays} displays")
+    print(f"live delivery latency ms: p50 {statistics.median(latencies):.2f}  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}  max {latencies[-1]:.2f}")
+    print(f"every display saw every order exactly once (incl. reconnect/replay): {complete}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=1000, help="orders per minute")
+    parser.add_argument("--displays", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark of the barista agent with stub providers.
+
+Runs `--sessions` concurrent `AgentSession`s of the day-2 `Assistant`
+through a scripted order (including the `save_order` tool call) using the
+stub STT/LLM/TTS in `pipeline_bench.py`, and prints one JSON object with
+per-turn latency, framework overhead (latency minus stub provider time),
+event-loop lag and memory per session. Orders go to a temporary directory.
+
+Usage: python scripts/bench_pipeline.py [--sessions 10] [--llm-ttft 0.4] [--output result.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline_bench import (  # noqa: E402
+    ToolCall,
+    add_profile_arguments,
+    profile_from_args,
+    run_benchmark,
+)
+
+ORDER = {"drinkType": "latte", "size": "large", "milk": "oat", "extras": [], "name": "Jordan"}
+
+CONVERSATION = [
+    {"user": "Hi, what do you recommend today?", "llm": ["Our oat latte is lovely today. What would you like?"]},
+    {"user": "A large oat latte please"},  # answered by the slot-filling fast path
+    {"user": "no thanks"},
+    {"user": "Jordan", "llm": ["A large oat latte with no extras for Jordan. Shall I place it?"]},
+    {"user": "yes that's right", "llm": [ToolCall("save_order", {"order": ORDER}), "Your order is in. Enjoy!"]},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    from agent import Assistant
+    from order_store import OrderRepository
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def make_agent():
+            return Assistant(orders=OrderRepository(os.path.join(tmp, "orders")))
+
+        result = asyncio.run(
+            run_benchmark("day-2 barista", make_agent, CONVERSATION, profile_from_args(args), args.sessions)
+        )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""First-turn latency with and without the provider warm-up at dispatch.
+
+Runs the real `deepgram.STT`, `google.LLM` and `murf.TTS` plugins against
+local stand-ins for the three providers. Each stand-in delays the first
+request on a new connection by `--handshake` (DNS, TCP and TLS to a remote
+provider) and every websocket upgrade by `--ws-setup`, then answers in the
+provider's own protocol after `--stt-delay`, `--llm-ttft` or `--tts-ttfb`.
+
+Every trial is one simulated job from dispatch to the first agent audio:
+
+- the providers are built and warmed as `entrypoint` does: `before` only
+  runs their `prewarm` (what the tree did until now: Murf opens its
+  websocket), `after` runs `provider_pool.warm_up` with a fresh pooled
+  session
+- `--room-connect` later the session starts and opens its STT stream
+- the user speaks at once for `--speech` seconds (streamed in real time)
+- the turn is the final transcript, the first LLM token, then the first
+  TTS audio, timed from the end of speech
+
+Prints one JSON object with the median first-turn latency per mode, its
+split by provider and the connections each first turn had to open.
+
+Usage: python scripts/bench_preconnect.py [--trials 10] [--handshake 0.15] [--speech 0.5]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import provider_pool  # noqa: E402
+from startup import warm_providers  # noqa: E402
+
+STT_SAMPLE_RATE = 16000
+TRANSCRIPT = "A large oat latte please"
+REPLY = "Sure, one large oat latte. Can I get a name for the order?"
+MODEL = "gemini-2.5-flash"
+
+
+class StandIn:
+    """One provider's server, counting the connections opened to it."""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.connections = set()
+        self.runner = None
+        self.url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.url = f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+
+    async def _handle(self, request):
+        transport = id(request.transport)
+        if transport not in self.connections:
+            self.connections.add(transport)
+            await asyncio.sleep(self.args.handshake)
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            await asyncio.sleep(self.args.ws_setup)
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await (self._stt(ws) if self.name == "stt" else self._tts(ws))
+            return ws
+        if self.name == "llm" and request.method == "POST":
+            return await self._llm(request)
+        if self.name == "llm":
+            return web.json_response({"name": f"models/{MODEL}"})
+        return web.Response(status=404)
+
+    async def _stt(self, ws):
+        speech_bytes = int(self.args.speech * STT_SAMPLE_RATE) * 2
+        received = 0
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.BINARY:
+                continue
+            received += len(msg.data)
+            if received >= speech_bytes:
+                received = -(1 << 62)
+                await asyncio.sleep(self.args.stt_delay)
+                alternative = {"transcript": TRANSCRIPT, "confidence": 0.99, "words": []}
+                await ws.send_json({
+                    "type": "Results",
+                    "is_final": True,
+                    "speech_final": True,
+                    "start": 0.0,
+                    "duration": self.args.speech,
+                    "metadata": {"request_id": "bench"},
+                    "channel": {"alternatives": [alternative]},
+                })
+
+    async def _tts(self, ws):
+        audio = base64.b64encode(bytes(4800)).decode()  # 100 ms at 24 kHz
+        async for msg in ws:
+            data = json.loads(msg.data)
+            if data.get("text"):
+                await asyncio.sleep(self.args.tts_ttfb)
+                await ws.send_json({"audio": audio, "context_id": data["context_id"]})
+            if data.get("end"):
+                await ws.send_json({"final": True, "context_id": data["context_id"]})
+
+    async def _llm(self, request):
+        await request.read()
+        await asyncio.sleep(self.args.llm_ttft)
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": REPLY}]}}]}
+        await resp.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+        await resp.write_eof()
+        return resp
+
+
+def build_session(servers, http_session):
+    from google.genai import types
+    from livekit.agents import AgentSession
+    from livekit.plugins import deepgram, google, murf
+
+    return AgentSession(
+        stt=deepgram.STT(
+            model="nova-3", api_key="bench", base_url=f"{servers['stt'].url}/v1/listen",
+            http_session=http_session,
+        ),
+        llm=google.LLM(
+            model=MODEL, api_key="bench", http_options=types.HttpOptions(base_url=servers["llm"].url),
+        ),
+        tts=murf.TTS(
+            voice="en-US-matthew", api_key="bench", base_url=servers["tts"].url,
+            http_session=http_session,
+        ),
+    )
+
+
+async def speak(stt_stream, seconds):
+    from livekit import rtc
+
+    samples = STT_SAMPLE_RATE // 20
+    for _ in range(round(seconds * 20)):
+        await asyncio.sleep(0.05)
+        stt_stream.push_frame(rtc.AudioFrame(bytes(samples * 2), STT_SAMPLE_RATE, 1, samples))
+
+
+async def first_turn(servers, mode, args):
+    from livekit.agents import llm, stt
+
+    if mode == "after":
+        http_session = provider_pool.http_session()
+        session = build_session(servers, http_session)
+        warming = provider_pool.warm_up(session, preconnect_urls=[servers["stt"].url])
+    else:
+        # A fresh session per job, as LiveKit's http_context gives each job
+        http_session = aiohttp.ClientSession()
+        session = build_session(servers, http_session)
+        warm_providers(session)
+        warming = None
+
+    await asyncio.sleep(args.room_connect)
+    stt_stream = session.stt.stream()
+    await speak(stt_stream, args.speech)
+    end_of_speech = time.perf_counter()
+    opened = {name: len(server.connections) for name, server in servers.items()}
+
+    async for ev in stt_stream:
+        if ev.type == stt.SpeechEventType.FINAL_TRANSCRIPT:
+            break
+    transcribed = time.perf_counter()
+
+    chat_ctx = llm.ChatContext()
+    chat_ctx.add_message(role="user", content=TRANSCRIPT)
+    async with session.llm.chat(chat_ctx=chat_ctx) as llm_stream:
+        async for chunk in llm_stream:
+            if chunk.delta and chunk.delta.content:
+                text = chunk.delta.content
+                break
+    first_token = time.perf_counter()
+
+    tts_stream = session.tts.stream()
+    tts_stream.push_text(text)
+    tts_stream.end_input()
+    async for _ in tts_stream:
+        break
+    first_audio = time.perf_counter()
+
+    await stt_stream.aclose()
+    await tts_stream.aclose()
+    await session.tts.aclose()
+    if warming is not None:
+        await warming
+        await provider_pool.aclose()
+    else:
+        await http_session.close()
+    return {
+        "first_turn_ms": (first_audio - end_of_speech) * 1000,
+        "stt_ms": (transcribed - end_of_speech) * 1000,
+        "llm_ms": (first_token - transcribed) * 1000,
+        "tts_ms": (first_audio - first_token) * 1000,
+        "first_turn_connections": sum(
+            len(server.connections) - opened[name] for name, server in servers.items()
+        ),
+    }
+
+
+async def run(args):
+    servers = {name: StandIn(name, args) for name in ("stt", "llm", "tts")}
+    for server in servers.values():
+        await server.start()
+    result = {"settings": {k: v for k, v in vars(args).items()}}
+    try:
+        for mode in ("before", "after"):
+            trials = [await first_turn(servers, mode, args) for _ in range(args.trials)]
+            result[mode] = {
+                key: round(statistics.median(t[key] for t in trials), 1) for key in trials[0]
+            }
+    finally:
+        for server in servers.values():
+            await server.runner.cleanup()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--handshake", type=float, default=0.15, help="seconds to open a connection")
+    parser.add_argument("--ws-setup", type=float, default=0.05, help="seconds per websocket upgrade")
+    parser.add_argument("--room-connect", type=float, default=0.3)
+    parser.add_argument("--speech", type=float, default=0.5, help="length of the first utterance")
+    parser.add_argument("--stt-delay", type=float, default=0.05)
+    parser.add_argument("--llm-ttft", type=float, default=0.3)
+    parser.add_argument("--tts-ttfb", type=float, default=0.1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
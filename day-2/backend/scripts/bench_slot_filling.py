@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark the deterministic slot-filling fast path on scripted orders.
+
+Replays a corpus of scripted customer transcripts through
+`order_state.plan_turn`, the same planner the agent's `llm_node` uses, and
+compares LLM round trips per completed order against an LLM-every-turn
+baseline. Latency per order is modelled as `--llm-ms` per LLM round trip
+plus the measured planner time for turns answered by the fast path.
+
+Usage: python scripts/bench_slot_filling.py [--llm-ms 800] [--repeat 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from order_state import OrderState, plan_turn  # noqa: E402
+
+# Each script is what the customer says, turn by turn, ending with the
+# confirmation that makes the LLM call save_order.
+CORPUS = [
+    ["Hi, can I get a large oat latte", "no thanks", "Jordan", "yes that's right"],
+    ["A cappuccino please", "medium", "almond", "caramel and an extra shot", "it's for Priya", "yes"],
+    ["hello", "I'd like a flat white", "small", "oat milk", "none", "Sam", "perfect"],
+    ["what do you recommend?", "ok a mocha then", "large", "soy", "whipped cream", "Alex", "yes please"],
+    ["small americano, no milk, for Chris", "nope", "yes"],
+    ["can I get a medium cortado with whole milk", "vanilla", "my name is Dana", "yep"],
+    ["do you have decaf?", "then a decaf latte", "large", "dairy", "no", "Lee", "yes"],
+    ["large cold brew for Maya", "oat", "no extras", "correct"],
+    ["uh a latte", "make it a large", "almond milk please", "hazelnut please", "Ravi", "yes"],
+    ["one espresso", "small", "no milk", "extra shot", "under Kim", "thanks"],
+]
+
+
+def run_script(script):
+    state = OrderState()
+    llm_calls = fast_turns = 0
+    fast_seconds = 0.0
+    for text in script:
+        start = time.perf_counter()
+        plan = plan_turn(state, text)
+        elapsed = time.perf_counter() - start
+        state = plan.state
+        if plan.reply is not None:
+            fast_turns += 1
+            fast_seconds += elapsed
+        else:
+            llm_calls += 1
+    # Saving the order is a tool call plus a follow-up LLM reply either way.
+    llm_calls += 1
+    return state.is_complete(), len(script), llm_calls, fast_turns, fast_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-ms", type=float, default=800.0, help="modelled LLM round trip")
+    parser.add_argument("--repeat", type=int, default=200, help="corpus passes for planner timing")
+    args = parser.parse_args()
+
+    rows = []
+    for _ in range(args.repeat):
+        rows = [run_script(script) for script in CORPUS]
+    completed = [r for r in rows if r[0]]
+
+    turns = statistics.mean(r[1] for r in completed)
+    baseline_calls = statistics.mean(r[1] + 1 for r in completed)
+    fast_calls = statistics.mean(r[2] for r in completed)
+    fast_turns = sum(r[3] for r in completed)
+    planner_us = sum(r[4] for r in completed) / max(1, fast_turns) * 1e6
+
+    baseline_ms = baseline_calls * args.llm_ms
+    fast_ms = fast_calls * args.llm_ms + statistics.mean(r[4] for r in completed) * 1000
+
+    print(f"completed orders: {len(completed)}/{len(rows)}  user turns per order: {turns:.2f}")
+    print(f"LLM round trips per order: baseline {baseline_calls:.2f}  fast path {fast_calls:.2f}")
+    print(f"turns answered without the LLM: {fast_turns} ({fast_turns / sum(r[1] for r in completed):.0%})")
+    print(f"planner time per fast turn: {planner_us:.1f} us")
+    print(f"modelled LLM latency per order at {args.llm_ms:.0f} ms/trip: "
+          f"baseline {baseline_ms:.0f} ms  fast path {fast_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
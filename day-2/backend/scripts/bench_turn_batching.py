@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Throughput and EOU latency of the turn detector, serial vs micro-batched.
+
+Runs closed-loop synthetic sessions: each sends an end-of-utterance
+request with a short conversation, waits for the answer, optionally
+thinks for `--think-ms`, and repeats. "serial" runs one request per ONNX
+call, which is how the worker's inference process serves them today;
+"batched" is `turn_batching.TurnDetectionService` with its defaults.
+
+Uses the real multilingual model (run `python src/agent.py download-files`
+first). `--synthetic` swaps in a numpy stand-in with a fixed per-call cost
+and a per-row cost. It is only meant to check the harness, not the model.
+
+Usage: python scripts/bench_turn_batching.py [--sessions 1 10 50] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from turn_batching import BatchedEOURunner, TurnDetectionService  # noqa: E402
+
+TURNS = [
+    ("assistant", "Hi, welcome to the cafe! What can I get started for you?"),
+    ("user", "Can I get a large oat milk latte"),
+    ("assistant", "Sure, a large oat milk latte. Any extras?"),
+    ("user", "um maybe an extra shot and"),
+    ("user", "actually make it iced please"),
+    ("assistant", "Got it. Can I get a name for the order?"),
+    ("user", "it's for Sam"),
+]
+
+
+def request(rng: random.Random) -> bytes:
+    """A chat context of 2-6 recent turns, like the session sends."""
+    end = rng.randint(2, len(TURNS))
+    start = max(0, end - rng.randint(2, 6))
+    chat_ctx = [{"role": role, "content": text} for role, text in TURNS[start:end]]
+    return json.dumps({"chat_ctx": chat_ctx}).encode()
+
+
+class SyntheticRunner:
+    """Numpy stand-in: a fixed cost per call plus a cost per row."""
+
+    INFERENCE_METHOD = "lk_end_of_utterance_multilingual"
+
+    def initialize(self) -> None:
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        self._np = np
+        self._w = rng.standard_normal((512, 512)).astype(np.float32)
+
+    def run_batch(self, requests: list[bytes]) -> list[bytes]:
+        x = self._np.ones((64 + 16 * len(requests), 512), dtype=self._np.float32)
+        for _ in range(8):
+            x = self._np.tanh(x @ self._w)
+        return [json.dumps({"eou_probability": 0.5}).encode() for _ in requests]
+
+
+async def session(svc, rng, deadline, think, latencies) -> None:
+    while time.perf_counter() < deadline:
+        data = request(rng)
+        start = time.perf_counter()
+        await svc.do_inference(svc.runner.INFERENCE_METHOD, data)
+        latencies.append(time.perf_counter() - start)
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+async def run(svc, sessions: int, duration: float, think: float) -> dict:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(session(svc, random.Random(i), deadline, think, latencies) for i in range(sessions))
+    )
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+        "mean_batch": svc.batcher.stats().get("mean_batch"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    runner = SyntheticRunner() if args.synthetic else BatchedEOURunner()
+    runner.initialize()
+    if not args.synthetic:
+        print(f"model: per_token={runner.per_token} batchable={runner.batchable}")
+
+    results = []
+    for mode, max_batch in (("serial", 1), ("batched", None)):
+        for sessions in args.sessions:
+            svc = TurnDetectionService(runner, **({"max_batch": max_batch} if max_batch else {}))
+            result = asyncio.run(run(svc, sessions, args.duration, args.think_ms / 1000))
+            svc.batcher.close()
+            result["mode"] = mode
+            results.append(result)
+            print(
+                f"{mode:8} {sessions:3} sessions  {result['throughput_rps']:7.1f} req/s  "
+                f"p50 {result['p50_ms']:6.1f} ms  p95 {result['p95_ms']:6.1f} ms  "
+                f"mean batch {result['mean_batch']}"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Synthetic load test of job admission against a local LiveKit server.
+
+Start the stack as `start_app.sh` does (`livekit-server --dev` and
+`python src/agent.py dev`), with `CAPACITY_PORT` set for the worker. Lower
+`SESSION_CPU_CORES` / `LOAD_THRESHOLD` to see admission stop on a small
+machine. The provider keys must be set, or each job fails as it starts.
+
+The script opens `--rooms` rooms, `--ramp` seconds apart. In each room a
+synthetic caller publishes a microphone track that alternates speech-like
+tones and silence, and the script waits for the agent to join. It polls
+`/load` on the worker once a second and reports how many rooms got an
+agent, the join latency, and the load and active jobs over time. Rooms the
+worker refused never get an agent within `--join-timeout`.
+
+Usage: python scripts/load_test.py [--rooms 20] [--ramp 1] [--hold 30]
+    [--url ws://localhost:7880] [--capacity-url http://localhost:8090]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import aiohttp
+import numpy as np
+from livekit import api, rtc
+
+SAMPLE_RATE = 48000
+FRAME_MS = 20
+
+
+def caller_audio(seconds: float) -> np.ndarray:
+    """Two seconds of harmonic "speech", then two of quiet noise, repeated."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    voiced = (t % 4) < 2
+    f0 = 140 + 25 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(h * phase) / h for h in range(1, 10)) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.02
+    return ((voice * voiced * 0.3 + noise) * 32767).astype(np.int16)
+
+
+async def caller(args, room_name: str, audio: np.ndarray, stop: asyncio.Event) -> dict:
+    token = (
+        api.AccessToken(args.api_key, args.api_secret)
+        .with_identity(f"caller-{room_name}")
+        .with_grants(api.VideoGrants(room_join=True, room=room_name))
+        .to_jwt()
+    )
+    room = rtc.Room()
+    agent_joined = asyncio.Event()
+
+    def on_participant(participant: rtc.RemoteParticipant) -> None:
+        if participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_AGENT:
+            agent_joined.set()
+
+    room.on("participant_connected", on_participant)
+    start = time.perf_counter()
+    await room.connect(args.url, token)
+    for participant in room.remote_participants.values():
+        on_participant(participant)
+
+    source = rtc.AudioSource(SAMPLE_RATE, 1)
+    track = rtc.LocalAudioTrack.create_audio_track("mic", source)
+    await room.local_participant.publish_track(
+        track, rtc.TrackPublishOptions(source=rtc.TrackSource.SOURCE_MICROPHONE)
+    )
+
+    async def speak() -> None:
+        size = SAMPLE_RATE * FRAME_MS // 1000
+        i = 0
+        while not stop.is_set():
+            chunk = audio[i : i + size]
+            if len(chunk) < size:
+                i = 0
+                continue
+            await source.capture_frame(rtc.AudioFrame(chunk.tobytes(), SAMPLE_RATE, 1, size))
+            i += size
+
+    speaker = asyncio.create_task(speak())
+    result = {"room": room_name, "admitted": False}
+    try:
+        await asyncio.wait_for(agent_joined.wait(), args.join_timeout)
+        result.update(admitted=True, join_s=round(time.perf_counter() - start, 3))
+    except asyncio.TimeoutError:
+        pass
+    await stop.wait()
+    speaker.cancel()
+    await room.disconnect()
+    return result
+
+
+async def poll_load(url: str | None, samples: list, stop: asyncio.Event) -> None:
+    if not url:
+        return
+    async with aiohttp.ClientSession() as http:
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                async with http.get(f"{url}/load") as response:
+                    snapshot = await response.json()
+                samples.append({"t": round(time.perf_counter() - start, 1), **snapshot})
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds between rooms")
+    parser.add_argument("--hold", type=float, default=30.0, help="seconds to hold after the ramp")
+    parser.add_argument("--join-timeout", type=float, default=15.0)
+    parser.add_argument("--url", default=os.getenv("LIVEKIT_URL", "ws://localhost:7880"))
+    parser.add_argument("--api-key", default=os.getenv("LIVEKIT_API_KEY", "devkey"))
+    parser.add_argument("--api-secret", default=os.getenv("LIVEKIT_API_SECRET", "secret"))
+    parser.add_argument("--capacity-url", help="the worker's CAPACITY_PORT, e.g. http://localhost:8090")
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    run = uuid.uuid4().hex[:6]
+    audio = caller_audio(8.0)
+    stop = asyncio.Event()
+    samples: list = []
+    poller = asyncio.create_task(poll_load(args.capacity_url, samples, stop))
+
+    callers = []
+    for i in range(args.rooms):
+        callers.append(asyncio.create_task(caller(args, f"load-{run}-{i}", audio, stop)))
+        await asyncio.sleep(args.ramp)
+    await asyncio.sleep(args.hold)
+    stop.set()
+    results = await asyncio.gather(*callers)
+    await poller
+
+    admitted = sorted(r["join_s"] for r in results if r["admitted"])
+    print(f"rooms {len(results)}  admitted {len(admitted)}  refused {len(results) - len(admitted)}")
+    if admitted:
+        print(
+            f"agent join p50 {admitted[len(admitted) // 2]:.2f} s  "
+            f"p95 {admitted[int(len(admitted) * 0.95)]:.2f} s"
+        )
+    if samples:
+        peak = max(samples, key=lambda s: s.get("load", 0))
+        print(
+            f"peak load {peak.get('load')} at {peak['t']} s with {peak.get('active_jobs')} jobs "
+            f"(threshold {peak.get('threshold')}, budget {peak.get('capacity_sessions')} sessions)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rooms": results, "load": samples}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
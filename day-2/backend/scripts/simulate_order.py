@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """Simulate a multi-turn barista conversation and save the order.
 This script mirrors the assistant's expected behavior and writes the order
-into the `orders/` directory using the same schema.
+into the order store under `orders/` using the same schema.
 """
 import json
 import os
-from datetime import datetime
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from order_store import open_repository  # noqa: E402
 
 # Simulated user responses (change these if you want different outputs)
 responses = {
@@ -38,17 +42,10 @@ order = {
     "name": responses['name'],
 }
 
-# Save to orders/ directory (create it if it doesn't exist)
-cwd = os.getcwd()
-orders_dir = os.path.join(cwd, 'orders')
-os.makedirs(orders_dir, exist_ok=True)
-ts = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-filename = f"order_{ts}_{order.get('name','guest').replace(' ','_')}.json"
-filepath = os.path.join(orders_dir, filename)
-order_copy = {**order, 'saved_at': datetime.utcnow().isoformat() + 'Z'}
-with open(filepath, 'w', encoding='utf-8') as f:
-    json.dump(order_copy, f, indent=2, ensure_ascii=False)
+# Save to the order store under orders/ (created if it doesn't exist)
+repo = open_repository()
+order_copy = repo.add(order)
 
 print('\nEverbean Barista: Thanks! Your order is placed. Summary:')
 print(json.dumps(order_copy, indent=2, ensure_ascii=False))
-print(f"\nOrder saved to: {filepath}")
+print(f"\nOrder {order_copy['id']} saved to: {repo.shard_path(order_copy['created_at'])}")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Pre-synthesize the barista's fixed lines into the TTS cache.
+
+Synthesizes every sentence of the spoken order questions
+(`order_state.QUESTIONS`), plus any lines in `--phrases` (one per line),
+with the same Murf voice the agent uses, so the first session after a
+deploy already plays them from the cache. Sentences that are already cached
+are skipped. Needs MURF_API_KEY (read from .env.local like the agent).
+
+Usage: python scripts/warm_tts_cache.py [--phrases greetings.txt] [--cache-dir tts_cache]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agent import build_tts  # noqa: E402
+from order_state import QUESTIONS  # noqa: E402
+from tts_cache import DEFAULT_CACHE_DIR, AudioCache  # noqa: E402
+
+
+async def run(args):
+    phrases = list(QUESTIONS.values())
+    if args.phrases:
+        with open(args.phrases, encoding="utf-8") as f:
+            phrases += [line.strip() for line in f if line.strip()]
+
+    cache = AudioCache(args.cache_dir)
+    async with aiohttp.ClientSession() as http:
+        tts = build_tts(cache, http_session=http)
+        start = time.perf_counter()
+        synthesized = await tts.warm(phrases)
+        await tts.aclose()
+    print(f"synthesized {synthesized} new sentences in {time.perf_counter() - start:.1f}s; "
+          f"cache holds {len(cache)} sentences ({cache.disk_bytes / 1024:.0f} KiB) in {cache.directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phrases", help="file with extra lines to cache, one per line")
+    parser.add_argument("--cache-dir", default=os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import logging
+import asyncio
 import json
+import logging
 import os
 from datetime import datetime
-from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -14,30 +15,38 @@ from livekit.agents import (
     RoomInputOptions,
     RoomOutputOptions,
     WorkerOptions,
-    cli,
     metrics,
-    tokenize,
     function_tool,
     RunContext,
+    llm,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+import capacity
+import provider_pool
+import shared_models
+import turn_batching
+from context_policy import ContextPolicy
+from latency_metrics import SessionLatency, dispatched_at, worker_options
+from menu import MenuCatalog, load_menu
+from order_queue import OrderQueue, OrderStreamServer
+from order_state import OrderState, TurnPlan, plan_turn
+from order_store import OrderRepository, open_repository
+from session_journal import SessionJournal
+from startup import run_app, startup_step
+from text_segmentation import tts_tokenizer
+from tts_cache import DEFAULT_CACHE_DIR, AudioCache, CachedTTS
+from write_behind import WriteBehindWriter
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+# Provider plugins used by the pipeline, imported lazily where they are
+# used; the worker process registers exactly these (see startup.py)
+PLUGINS = ("deepgram", "google", "murf", "silero", "turn_detector.multilingual")
 
-class Assistant(Agent):
-    def __init__(self) -> None:
-        # Get current date and time for the assistant
-        current_date = datetime.now().strftime("%B %d, %Y")
-        current_time = datetime.now().strftime("%I:%M %p")
-        day_of_week = datetime.now().strftime("%A")
-        
-        # Make this assistant a friendly barista persona for "Everbean Coffee"
-        super().__init__(
-            instructions=f"""You are a friendly barista for the coffee brand Everbean Coffee. The user is ordering a drink from you via voice.
+# Built once per process; `build_instructions` fills in the date and time
+INSTRUCTIONS = """You are a friendly barista for the coffee brand Everbean Coffee. The user is ordering a drink from you via voice.
             Your goal is to collect the full order by asking clarifying questions until all fields are filled. Maintain a small order state object with the following shape:
             {{
               "drinkType": "string",
@@ -49,40 +58,130 @@ class Assistant(Agent):
 
             Ask short, clear clarifying questions (one question at a time) until the user provides values for every field. When a field can have multiple values (like extras), allow the user to add more than one item.
 
+            Only offer items from the menu. If you are not sure whether something the user said is on the menu, call the tool `match_menu_item` to look it up.
+
             Once the order is complete, call the tool `save_order` with the final order object (as JSON) so the order is saved. After saving, read back a brief summary in one or two friendly sentences.
 
             IMPORTANT: Current date and time information:
             - Today is {day_of_week}, {current_date}
             - Current time is approximately {current_time}
             - Always use this date when asked about the current date or today's date.
-            """,
+            """
+
+
+def build_instructions(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    return INSTRUCTIONS.format(
+        current_date=now.strftime("%B %d, %Y"),
+        current_time=now.strftime("%I:%M %p"),
+        day_of_week=now.strftime("%A"),
+    )
+
+
+TTS_VOICE = "en-US-matthew"
+TTS_STYLE = "Conversation"
+
+
+class Assistant(Agent):
+    def __init__(
+        self,
+        orders: Optional[OrderRepository] = None,
+        writer: Optional[WriteBehindWriter] = None,
+        feed: Optional[OrderQueue] = None,
+        menu: Optional[MenuCatalog] = None,
+        summary_llm: Optional[llm.LLM] = None,
+    ) -> None:
+        # Orders are persisted off the event loop
+        self._orders = orders if orders is not None else open_repository()
+        self._writer = writer if writer is not None else WriteBehindWriter(self._orders.append)
+        # Live feed for kitchen/barista displays
+        self._feed = feed
+        # Compiled menu, used to validate and canonicalize order items
+        self._menu = menu if menu is not None else load_menu()
+        # Order slots filled deterministically from transcripts
+        self._state = OrderState()
+        self._plan: Optional[TurnPlan] = None
+        # Long calls send recent turns verbatim and a summary of the rest;
+        # saved orders are always kept
+        self._context = ContextPolicy.from_env(state_tools=("save_order",))
+        self._summary_llm = summary_llm
+
+        # Make this assistant a friendly barista persona for "Everbean Coffee"
+        super().__init__(
+            instructions=build_instructions(),
         )
 
+    def _plan_turn(self, text: str) -> TurnPlan:
+        # Preemptive generation may call llm_node before on_user_turn_completed
+        # commits the turn, so both share one plan per transcript.
+        if self._plan is None or self._plan.text != text:
+            self._plan = plan_turn(self._state, text)
+        return self._plan
+
+    async def on_user_turn_completed(
+        self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage
+    ) -> None:
+        text = new_message.text_content or ""
+        self._state = self._plan_turn(text).state
+
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        last = chat_ctx.items[-1] if chat_ctx.items else None
+        if isinstance(last, llm.ChatMessage) and last.role == "user":
+            plan = self._plan_turn(last.text_content or "")
+            if plan.reply is not None:
+                # The next question is fully determined: skip the LLM round trip
+                return plan.reply
+            # Otherwise give the LLM the slots we already know, so it only
+            # needs to handle what the rules could not.
+            chat_ctx = chat_ctx.copy()
+            chat_ctx.add_message(
+                role="system",
+                content=(
+                    f"Order state so far: {json.dumps(plan.state.as_order())}. "
+                    f"Still missing: {', '.join(plan.state.missing()) or 'nothing'}."
+                ),
+            )
+        chat_ctx = self._context.apply(chat_ctx, self._summary_llm or self.session.llm)
+        return Agent.default.llm_node(self, chat_ctx, tools, model_settings)
+
+    @function_tool
+    async def match_menu_item(
+        self, context: RunContext, text: str, category: Optional[str] = None
+    ):
+        """Look up what the user said on the menu and return the canonical item.
+
+        Args:
+            text: the drink, size, milk or extra as the user said it.
+            category: optionally one of "drinks", "sizes", "milks" or "extras".
+        """
+        found = self._menu.match(text, category)
+        if found is None:
+            return {
+                "status": "not_found",
+                "suggestions": self._menu.suggest(text, category),
+            }
+        return {"status": "ok", "item": found.item, "category": found.category}
+
     @function_tool
     async def save_order(self, context: RunContext, order: dict):
-        """Save a completed order to a JSON file and return the saved path.
+        """Save a completed order to the order store and return its order ID.
 
         Args:
             order: dict matching the order state schema.
         """
+        order, problems = self._menu.canonicalize_order(order)
+        if problems:
+            # Nothing is saved; the LLM asks the user to pick again
+            return {"status": "error", "error": "; ".join(problems)}
         try:
-            orders_dir = Path(os.getcwd()) / "orders"
-            orders_dir.mkdir(parents=True, exist_ok=True)
-            ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-            filename = f"order_{ts}_{order.get('name','guest').replace(' ','_')}.json"
-            filepath = orders_dir / filename
-            # Ensure extras is a list
-            order_copy = {
-                "drinkType": str(order.get("drinkType", "")).strip(),
-                "size": str(order.get("size", "")).strip(),
-                "milk": str(order.get("milk", "")).strip(),
-                "extras": list(order.get("extras") or []),
-                "name": str(order.get("name", "")).strip(),
-                "saved_at": datetime.utcnow().isoformat() + "Z",
-            }
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(order_copy, f, indent=2, ensure_ascii=False)
-            return {"status": "ok", "path": str(filepath), "order": order_copy}
+            record = self._orders.prepare(order)
+            await self._writer.submit(record)
+            if self._feed is not None:
+                self._feed.publish("placed", record)
+            # Start fresh for the next order
+            self._state = OrderState()
+            self._plan = None
+            return {"status": "ok", "order_id": record["id"], "order": record}
         except Exception as e:
             logger.exception("Failed to save order")
             return {"status": "error", "error": str(e)}
@@ -105,34 +204,94 @@ class Assistant(Agent):
     #     return "sunny with a temperature of 70 degrees."
 
 
+def build_tts(cache: AudioCache, http_session=None) -> CachedTTS:
+    """Murf TTS behind the synthesized-audio cache (also used by the warm-up script)."""
+    from livekit.plugins import murf
+
+    return CachedTTS(
+        tts=murf.TTS(voice=TTS_VOICE, style=TTS_STYLE, http_session=http_session),
+        cache=cache,
+        voice=TTS_VOICE,
+        style=TTS_STYLE,
+        sentence_tokenizer=tts_tokenizer(),
+        text_pacing=True,
+    )
+
+
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    # Inherited from the forkserver unless SHARE_MODELS=0 (see shared_models.py)
+    with startup_step("silero_vad"):
+        proc.userdata["vad"] = shared_models.vad()
+    if turn_batching.enabled():
+        # One batched turn detector for every session in the process
+        with startup_step("turn_detector"):
+            turn_batching.service()
+    proc.userdata["menu"] = load_menu()
+    # Shared by every job in this process, so the hot tier stays warm
+    proc.userdata["tts_cache"] = AudioCache(os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR))
+    logger.info(f"Job process memory: {shared_models.memory_usage()}")
+
+
+async def prepare_agent(ctx: JobContext, summary_llm: llm.LLM) -> Assistant:
+    """Set up the agent while the room connects; blocking file I/O runs in a thread."""
+    # Opening the repository imports any legacy order files
+    orders = await asyncio.to_thread(open_repository)
+    # Flush queued orders before the job exits
+    writer = WriteBehindWriter(orders.append)
+    ctx.add_shutdown_callback(writer.aclose)
+
+    # Stream new orders to kitchen displays when ORDER_STREAM_PORT is set
+    feed = OrderQueue()
+    if os.getenv("ORDER_STREAM_PORT"):
+        server = OrderStreamServer(feed, orders, port=int(os.environ["ORDER_STREAM_PORT"]))
+        try:
+            await server.start()
+            ctx.add_shutdown_callback(server.aclose)
+        except OSError:
+            logger.warning("Order stream port %s is busy; live feed disabled for this job", server.port)
+
+    return Assistant(
+        orders=orders,
+        writer=writer,
+        feed=feed,
+        menu=ctx.proc.userdata.get("menu"),
+        summary_llm=summary_llm,
+    )
 
 
 async def entrypoint(ctx: JobContext):
+    from livekit.plugins import deepgram, google
+
     logger.info("agent starting....")
     # Logging setup
     # Add any other context you want in all log entries here
     ctx.log_context_fields = {
         "room": ctx.room.name,
     }
+    latency = SessionLatency(agent="barista", room=ctx.room.name, dispatched_at=dispatched_at(ctx.job))
+
+    # Join the room while the session and the agent are set up
+    connecting = asyncio.create_task(ctx.connect())
+
+    # Kept alive for the whole process rather than per job
+    http_session = provider_pool.http_session()
+    # Repeated lines (order questions, greetings) play from the cache
+    cached_tts = build_tts(ctx.proc.userdata["tts_cache"], http_session=http_session)
 
     #- Temporarily disabled to debug
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(model="nova-3", http_session=http_session),
         llm=google.LLM(
                 model="gemini-2.5-flash",
             ),
-        tts=murf.TTS(
-                voice="en-US-matthew", 
-                style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-                text_pacing=True
-            ),
-        turn_detection=MultilingualModel(),
+        tts=cached_tts,
+        turn_detection=turn_batching.turn_detector(),
         vad=ctx.proc.userdata["vad"],
         preemptive_generation=True,
     )
+    # Open the provider connections before the participant joins
+    warming = provider_pool.warm_up(session)
+    warming.add_done_callback(lambda _: latency.mark("providers_warm"))
 
     usage_collector = metrics.UsageCollector()
 
@@ -140,21 +299,46 @@ async def entrypoint(ctx: JobContext):
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        latency.observe(ev.metrics)
+
+    session.on("agent_state_changed", latency.on_agent_state)
+
+    # Transcripts, tool calls and metrics, for debugging the session later
+    journal = SessionJournal.from_env(agent="barista", room=ctx.room.name, job_id=ctx.job.id)
+    if journal is not None:
+        journal.attach(session)
+        ctx.add_shutdown_callback(journal.aclose)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        logger.info(f"Turn latency: {latency.summary()}")
 
     ctx.add_shutdown_callback(log_usage)
 
-    agent = Assistant()
+    async def log_tts_cache():
+        logger.info(f"TTS cache: {cached_tts.stats.summary()}")
+
+    ctx.add_shutdown_callback(log_tts_cache)
+
+    # A separate instance, so summaries stay out of the turn metrics
+    agent = await prepare_agent(ctx, summary_llm=google.LLM(model="gemini-2.5-flash-lite"))
+    await connecting
     await session.start(
         room=ctx.room,
         agent=agent,
     )
-
-    await ctx.connect()
+    latency.mark("ready")
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            **worker_options(),
+            **turn_batching.worker_options(),
+            **capacity.worker_options(),
+        ),
+        PLUGINS,
+    )
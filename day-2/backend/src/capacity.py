@@ -0,0 +1,208 @@
+"""Load-aware job admission and a local readiness/load endpoint.
+
+The worker reports a load between 0 and 1 to LiveKit and stops taking
+jobs at `load_threshold`. The stock load function is CPU only. It lags:
+a session that was just accepted uses little CPU until the user speaks,
+so a burst of dispatches can all land on one host before its CPU shows
+it. `CapacityModel.load` also reserves a per-session budget for every
+active job and reports the worst of:
+
+- measured CPU (averaged over ~2.5 s, cgroup-aware)
+- measured memory (cgroup limit if there is one, else the host)
+- reserved CPU: active jobs x `SESSION_CPU_CORES` / cores
+- reserved memory: active jobs x `SESSION_MEMORY_MB` / memory limit
+
+The per-session defaults are deliberately above what the benchmarks
+measured. The VAD costs ~0.03 cores per session at 16 kHz
+(scripts/bench_audio_corpus.py) and a job process ~40 MB PSS before its
+session starts (scripts/bench_model_memory.py). Turn detection, noise
+cancellation and the provider streams come on top. Override the defaults
+with numbers from a load test on the target hardware.
+
+Environment:
+
+- `LOAD_THRESHOLD`: admission threshold (default 0.7, also in dev mode)
+- `SESSION_CPU_CORES`, `SESSION_MEMORY_MB`: per-session budget
+- `CAPACITY_PORT`: serve `GET /ready` (200 while below the threshold,
+  503 otherwise or when the worker stopped reporting) and `GET /load`
+  (the latest snapshot as JSON) on this port
+
+LiveKit Cloud ignores custom load functions; this is for self-hosting.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import psutil
+from livekit.agents import utils
+from livekit.agents.utils import hw
+
+logger = logging.getLogger("capacity")
+
+DEFAULT_LOAD_THRESHOLD = 0.7
+DEFAULT_SESSION_CPU_CORES = 0.15
+DEFAULT_SESSION_MEMORY_MB = 300.0
+# A snapshot older than this means the worker stopped computing its load
+STALE_AFTER = 10.0
+
+
+def memory_usage() -> tuple[float, float]:
+    """(used, limit) in MB: the cgroup's if limited, else the host's."""
+    v2 = Path("/sys/fs/cgroup")
+    v1 = Path("/sys/fs/cgroup/memory")
+    for current, limit in (
+        (v2 / "memory.current", v2 / "memory.max"),
+        (v1 / "memory.usage_in_bytes", v1 / "memory.limit_in_bytes"),
+    ):
+        try:
+            raw_limit = limit.read_text().strip()
+            if raw_limit == "max" or int(raw_limit) >= 2**60:
+                continue
+            return int(current.read_text()) / 2**20, int(raw_limit) / 2**20
+        except (OSError, ValueError):
+            continue
+    vm = psutil.virtual_memory()
+    return (vm.total - vm.available) / 2**20, vm.total / 2**20
+
+
+class CapacityModel:
+    """Computes the worker load and serves it; see `worker_options`."""
+
+    def __init__(
+        self,
+        session_cpu_cores: float = DEFAULT_SESSION_CPU_CORES,
+        session_memory_mb: float = DEFAULT_SESSION_MEMORY_MB,
+        threshold: float = DEFAULT_LOAD_THRESHOLD,
+        port: int | None = None,
+    ) -> None:
+        self.session_cpu_cores = session_cpu_cores
+        self.session_memory_mb = session_memory_mb
+        self.threshold = threshold
+        self.port = port
+        self._cpu_monitor = hw.get_cpu_monitor()
+        self._cpu = utils.MovingAverage(5)
+        self._lock = threading.Lock()
+        self._started = False
+        self._server: ThreadingHTTPServer | None = None
+        self.snapshot: dict[str, Any] = {}
+
+    @classmethod
+    def from_env(cls) -> CapacityModel:
+        port = os.getenv("CAPACITY_PORT")
+        return cls(
+            session_cpu_cores=float(os.getenv("SESSION_CPU_CORES", DEFAULT_SESSION_CPU_CORES)),
+            session_memory_mb=float(os.getenv("SESSION_MEMORY_MB", DEFAULT_SESSION_MEMORY_MB)),
+            threshold=float(os.getenv("LOAD_THRESHOLD", DEFAULT_LOAD_THRESHOLD)),
+            port=int(port) if port else None,
+        )
+
+    def _start(self) -> None:
+        # Lazily, from the first load call: that is the process running the
+        # worker (not a dev-mode reloader)
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._sample_cpu, name="capacity-cpu", daemon=True).start()
+        if self.port is not None:
+            self._server = ThreadingHTTPServer(("0.0.0.0", self.port), _handler(self))
+            threading.Thread(
+                target=self._server.serve_forever, name="capacity-http", daemon=True
+            ).start()
+            logger.info("Capacity endpoint on http://0.0.0.0:%d/ready", self.port)
+
+    def _sample_cpu(self) -> None:
+        while True:
+            usage = self._cpu_monitor.cpu_percent(interval=0.5)
+            with self._lock:
+                self._cpu.add_sample(usage)
+
+    def compute(self, active_jobs: int, cpu: float, memory: tuple[float, float]) -> dict[str, Any]:
+        """The load and its parts, for `active_jobs` sessions at the given usage."""
+        cores = self._cpu_monitor.cpu_count()
+        used_mb, limit_mb = memory
+        parts = {
+            "cpu": cpu,
+            "memory": used_mb / limit_mb,
+            "reserved_cpu": active_jobs * self.session_cpu_cores / cores,
+            "reserved_memory": active_jobs * self.session_memory_mb / limit_mb,
+        }
+        load = min(1.0, max(parts.values()))
+        capacity = min(cores / self.session_cpu_cores, limit_mb / self.session_memory_mb)
+        return {
+            "load": round(load, 4),
+            "threshold": self.threshold,
+            "active_jobs": active_jobs,
+            # Sessions this host takes before reaching the threshold on budget alone
+            "capacity_sessions": int(capacity * self.threshold),
+            "parts": {name: round(value, 4) for name, value in parts.items()},
+        }
+
+    def load(self, worker: Any) -> float:
+        self._start()
+        with self._lock:
+            cpu = self._cpu.get_avg()
+        snapshot = self.compute(len(worker.active_jobs), cpu, memory_usage())
+        snapshot["updated_at"] = time.time()
+        self.snapshot = snapshot
+        return snapshot["load"]
+
+    def ready(self) -> tuple[bool, dict[str, Any]]:
+        snapshot = self.snapshot
+        fresh = bool(snapshot) and time.time() - snapshot["updated_at"] < STALE_AFTER
+        return fresh and snapshot["load"] < self.threshold, snapshot
+
+
+def _handler(capacity: CapacityModel) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/ready":
+                ready, snapshot = capacity.ready()
+                self._send(200 if ready else 503, {"ready": ready, **snapshot})
+            elif self.path == "/load":
+                self._send(200, capacity.snapshot)
+            else:
+                self._send(404, {"error": "not found"})
+
+        def _send(self, status: int, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Readiness probes would flood the worker log
+            pass
+
+    return Handler
+
+
+_model: CapacityModel | None = None
+
+
+def model() -> CapacityModel:
+    """This process's model, configured from the environment."""
+    global _model
+    if _model is None:
+        _model = CapacityModel.from_env()
+    return _model
+
+
+def load(worker: Any) -> float:
+    # A module-level function, so the options still pickle for the dev reloader
+    return model().load(worker)
+
+
+def worker_options() -> dict[str, Any]:
+    """Extra `WorkerOptions`: the load function and admission threshold."""
+    return {"load_fnc": load, "load_threshold": model().threshold}
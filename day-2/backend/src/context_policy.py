@@ -0,0 +1,174 @@
+"""Bounded chat context for long calls: recent turns verbatim, older ones summarized.
+
+Every LLM request carries the whole chat context, so on a long call the
+prompt, and with it the LLM's time to first token, grows every turn.
+`ContextPolicy.apply` builds the context for one request from the
+session's full history:
+
+- the system messages (the agent's instructions)
+- a running summary of the older turns, as one system message
+- the function calls and outputs of `state_tools` from older turns (the
+  saved order, lead or check-in), since a summary may not keep their exact
+  values
+- the last `keep_turns` user turns verbatim (a turn starts at a user
+  message), including anything added for this request
+
+Summaries are made off the critical path. Once `fold_turns` turns have
+fallen out of the window, `apply` starts a background summarization of
+them and returns at once. Until it finishes, those turns stay in the
+prompt verbatim, so they are only compressed late, never lost. A failed
+summary is retried on the next request. The session's own history is never
+modified.
+
+`CONTEXT_KEEP_TURNS` sets the window (0 sends the full history).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable, Iterable
+
+from livekit.agents import llm
+
+logger = logging.getLogger("agent")
+
+DEFAULT_KEEP_TURNS = 6
+# Turns folded into the summary at a time, so it is not rewritten every turn
+DEFAULT_FOLD_TURNS = 3
+# Tool outputs longer than this are cut in the text sent for summarizing
+MAX_TOOL_OUTPUT_CHARS = 300
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a voice call with the new part of the conversation.\n"
+    "Keep the user's goals, constraints, decisions, names and numbers, and open questions.\n"
+    "Drop greetings and small talk. Reply with the updated summary only, in a few short sentences."
+)
+
+# summarizer(summary so far, transcript of the turns to add) -> new summary
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+
+def llm_summarizer(llm_v: llm.LLM) -> Summarizer:
+    """A summarizer that asks `llm_v` to fold the new turns into the summary."""
+
+    async def summarize(summary: str, transcript: str) -> str:
+        chat_ctx = llm.ChatContext()
+        chat_ctx.add_message(role="system", content=SUMMARY_PROMPT)
+        chat_ctx.add_message(
+            role="user",
+            content=f"Summary so far:\n{summary or '(none)'}\n\nNew conversation:\n{transcript}",
+        )
+        chunks: list[str] = []
+        async with llm_v.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    chunks.append(chunk.delta.content)
+        return "".join(chunks).strip()
+
+    return summarize
+
+
+def _is_message(item: llm.ChatItem, *roles: str) -> bool:
+    return item.type == "message" and item.role in roles
+
+
+def _transcript(items: Iterable[llm.ChatItem]) -> str:
+    lines = []
+    for item in items:
+        if item.type == "message":
+            text = (item.text_content or "").strip()
+            if text:
+                lines.append(f"{item.role}: {text}")
+        elif item.type == "function_call_output":
+            output = item.output[:MAX_TOOL_OUTPUT_CHARS]
+            lines.append(f"tool {item.name}: {output}")
+    return "\n".join(lines)
+
+
+class ContextPolicy:
+    """Per-agent view of the chat context that stays bounded on long calls."""
+
+    def __init__(
+        self,
+        *,
+        keep_turns: int = DEFAULT_KEEP_TURNS,
+        fold_turns: int = DEFAULT_FOLD_TURNS,
+        state_tools: Iterable[str] = (),
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.keep_turns = keep_turns
+        self.fold_turns = fold_turns
+        self.state_tools = frozenset(state_tools)
+        self._summarizer = summarizer
+        self.summary = ""
+        # Ids of the items the summary covers
+        self._summarized: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self.summaries = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls, state_tools: Iterable[str] = ()) -> ContextPolicy:
+        keep_turns = int(os.getenv("CONTEXT_KEEP_TURNS", DEFAULT_KEEP_TURNS))
+        return cls(keep_turns=keep_turns, state_tools=state_tools)
+
+    def apply(self, chat_ctx: llm.ChatContext, summary_llm: llm.LLM | None = None) -> llm.ChatContext:
+        """The context to send for this request.
+
+        `summary_llm` summarizes the older turns unless a summarizer was
+        given; with neither, they are sent verbatim.
+        """
+        items = chat_ctx.items
+        turns = [i for i, item in enumerate(items) if _is_message(item, "user")]
+        if self.keep_turns <= 0 or len(turns) <= self.keep_turns:
+            return chat_ctx
+        cut = turns[-self.keep_turns]
+
+        system: list[llm.ChatItem] = []
+        # Older items still sent as they are, in their original order
+        older: list[llm.ChatItem] = []
+        pending: list[llm.ChatItem] = []
+        for item in items[:cut]:
+            if _is_message(item, "system", "developer"):
+                system.append(item)
+            elif item.type in ("function_call", "function_call_output") and item.name in self.state_tools:
+                older.append(item)
+            elif item.id not in self._summarized:
+                # A turn's function call and its output are always folded together
+                older.append(item)
+                pending.append(item)
+
+        if sum(_is_message(item, "user") for item in pending) >= self.fold_turns:
+            self._summarize(pending, summary_llm)
+
+        if self.summary:
+            system.append(
+                llm.ChatMessage(
+                    role="system", content=[f"Summary of the earlier conversation:\n{self.summary}"]
+                )
+            )
+        return llm.ChatContext(items=[*system, *older, *items[cut:]])
+
+    def _summarize(self, pending: list[llm.ChatItem], summary_llm: llm.LLM | None) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        summarizer = self._summarizer
+        if summarizer is None:
+            if summary_llm is None:
+                return
+            summarizer = llm_summarizer(summary_llm)
+        self._task = asyncio.create_task(self._run(summarizer, pending), name="context_summary")
+
+    async def _run(self, summarizer: Summarizer, items: list[llm.ChatItem]) -> None:
+        try:
+            summary = await summarizer(self.summary, _transcript(items))
+        except Exception:
+            self.failed += 1
+            logger.exception("Chat context summary failed; keeping %d item(s) verbatim", len(items))
+            return
+        if summary:
+            self.summary = summary
+            self._summarized.update(item.id for item in items)
+            self.summaries += 1
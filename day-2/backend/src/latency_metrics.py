@@ -0,0 +1,227 @@
+"""Per-turn latency histograms for voice sessions.
+
+`SessionLatency` is fed from the session's `metrics_collected` events. It
+aggregates four per-turn latencies:
+
+- `eou`: end of speech to end-of-turn decision (`EOUMetrics.end_of_utterance_delay`)
+- `stt`: end of speech to final transcript (`EOUMetrics.transcription_delay`)
+- `llm_ttft`: LLM time to first token (`LLMMetrics.ttft`)
+- `tts_ttfb`: TTS time to first audio byte (`TTSMetrics.ttfb`)
+
+It also tracks how long a session takes to start, from job dispatch:
+
+- `providers_warm`: the provider connections opened at dispatch are up
+  (see `provider_pool.warm_up`)
+- `ready`: the session is started and listening
+- `first_audio`: the agent's first audio starts playing (for agents that
+  wait for the user to speak first, this includes the user's first turn)
+
+Each stage is aggregated into fixed-bucket histograms per room (the session)
+and per worker process, and reported as p50/p95/p99. Observing a value is a
+bisect plus a counter increment, so it stays cheap with hundreds of
+concurrent sessions.
+
+The worker-level histograms are also Prometheus metrics
+(`agent_turn_latency_seconds{agent,stage}` and
+`agent_start_latency_seconds{agent,stage}`), served by the worker's own
+`/metrics` endpoint when `PROMETHEUS_PORT` is set (see `worker_options`).
+Jobs run in child processes, so also export `PROMETHEUS_MULTIPROC_DIR` (an
+empty directory) before starting the worker; otherwise only main-process
+metrics are visible. Rooms are not a Prometheus label, to keep the series
+count bounded; per-room numbers are logged at shutdown.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from livekit.agents import AgentStateChangedEvent, metrics
+from livekit.protocol import agent as agent_proto
+from prometheus_client import Histogram
+
+STAGES = ("eou", "stt", "llm_ttft", "tts_ttfb")
+START_STAGES = ("providers_warm", "ready", "first_audio")
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Geometric bucket bounds from 5 ms to ~60 s (about 10% apart), shared by
+# every histogram. Quantiles are read off the bucket's upper bound.
+BUCKETS = tuple(round(0.005 * 1.1**i, 6) for i in range(100))
+
+TURN_LATENCY = Histogram(
+    "agent_turn_latency_seconds",
+    "Per-turn latency of each voice pipeline stage",
+    ["agent", "stage"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+START_LATENCY = Histogram(
+    "agent_start_latency_seconds",
+    "Time from job dispatch to the session being ready and to the agent's first audio",
+    ["agent", "stage"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0),
+)
+
+
+class LatencyHistogram:
+    """Streaming histogram over `BUCKETS`; memory is fixed per instance."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                # The overflow bucket has no upper bound: report the max
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> dict[str, Any]:
+        """Count, mean and quantiles in milliseconds."""
+        result: dict[str, Any] = {"count": self.count}
+        if self.count:
+            result["mean_ms"] = round(self.total / self.count * 1000, 1)
+            for q in QUANTILES:
+                result[f"p{int(q * 100)}_ms"] = round(self.quantile(q) * 1000, 1)
+        return result
+
+
+class StageHistograms:
+    """One `LatencyHistogram` per stage."""
+
+    def __init__(self, stages: Sequence[str] = STAGES) -> None:
+        self.stages = {stage: LatencyHistogram() for stage in stages}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.stages[stage].observe(seconds)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        return {stage: hist.summary() for stage, hist in self.stages.items()}
+
+
+# Every session in this process, aggregated
+WORKER = StageHistograms()
+WORKER_START = StageHistograms(START_STAGES)
+
+
+def dispatched_at(job: agent_proto.Job) -> float:
+    """Wall-clock time `job` was dispatched, or now if the server did not say.
+
+    `job.state.started_at` is a Unix timestamp in nanoseconds (milliseconds
+    on older servers).
+    """
+    started_at = job.state.started_at
+    if started_at <= 0:
+        return time.time()
+    seconds = started_at / 1e9 if started_at > 1e17 else started_at / 1e3
+    # A server clock ahead of ours would give a negative latency
+    return min(seconds, time.time())
+
+
+class SessionLatency:
+    """Latency histograms for one session (room), rolled up into `WORKER`.
+
+    Args:
+        agent: label for the Prometheus series, e.g. "barista".
+        room: room name, used in the shutdown breakdown.
+        dispatched_at: wall-clock dispatch time the start stages are
+            measured from (see `dispatched_at`); defaults to now.
+    """
+
+    def __init__(
+        self,
+        agent: str,
+        room: str,
+        worker: StageHistograms = WORKER,
+        worker_start: StageHistograms = WORKER_START,
+        dispatched_at: float | None = None,
+    ) -> None:
+        self.agent = agent
+        self.room = room
+        self.room_histograms = StageHistograms()
+        self._worker = worker
+        self._worker_start = worker_start
+        self.dispatched_at = dispatched_at if dispatched_at is not None else time.time()
+        # Seconds from dispatch to each start stage reached so far
+        self.start: dict[str, float] = {}
+        # Bind the labelled children once, not per event
+        self._prometheus = {stage: TURN_LATENCY.labels(agent, stage) for stage in STAGES}
+        self._start_prometheus = {stage: START_LATENCY.labels(agent, stage) for stage in START_STAGES}
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        self.room_histograms.observe(stage, seconds)
+        self._worker.observe(stage, seconds)
+        self._prometheus[stage].observe(seconds)
+
+    def observe(self, ev: metrics.AgentMetrics) -> None:
+        """Record the latencies carried by one `metrics_collected` event."""
+        if isinstance(ev, metrics.EOUMetrics):
+            # 0.0 means the end of speech was not detected
+            if ev.end_of_utterance_delay > 0:
+                self._observe("eou", ev.end_of_utterance_delay)
+            if ev.transcription_delay > 0:
+                self._observe("stt", ev.transcription_delay)
+        elif isinstance(ev, metrics.LLMMetrics):
+            if not ev.cancelled and ev.ttft >= 0:
+                self._observe("llm_ttft", ev.ttft)
+        elif isinstance(ev, metrics.TTSMetrics):
+            # ttfb is -1 when no audio was produced
+            if ev.ttfb >= 0:
+                self._observe("tts_ttfb", ev.ttfb)
+
+    def mark(self, stage: str) -> None:
+        """Record that the session reached start `stage`; later calls are ignored."""
+        if stage in self.start:
+            return
+        seconds = max(0.0, time.time() - self.dispatched_at)
+        self.start[stage] = seconds
+        self._worker_start.observe(stage, seconds)
+        self._start_prometheus[stage].observe(seconds)
+
+    def on_agent_state(self, ev: AgentStateChangedEvent) -> None:
+        """Feed from the session's `agent_state_changed` events."""
+        if ev.new_state == "speaking":
+            self.mark("first_audio")
+
+    def summary(self) -> dict[str, Any]:
+        """Per-session breakdown, with the worker-wide numbers for comparison."""
+        return {
+            "room": self.room,
+            "start_ms": {stage: round(s * 1000, 1) for stage, s in self.start.items()},
+            "session": self.room_histograms.summary(),
+            "worker": self._worker.summary(),
+            "worker_start": self._worker_start.summary(),
+        }
+
+
+def worker_options() -> dict[str, Any]:
+    """Extra `WorkerOptions` enabling the Prometheus endpoint from `PROMETHEUS_PORT`."""
+    port = os.getenv("PROMETHEUS_PORT")
+    return {"prometheus_port": int(port)} if port else {}
@@ -0,0 +1,290 @@
+"""Menu catalog for the Everbean barista.
+
+`menu.json` lists every drink, size, milk and extra with the phrases
+customers (and the speech-to-text) use for it. `MenuCatalog` compiles those
+phrases once into lookup tables so a transcript fragment can be mapped to a
+canonical item in microseconds:
+
+- exact phrases ("oat milk" -> oat),
+- phonetic keys, so "cappucino" and "expresso" still find their drink,
+- prefixes, for cut-off words ("cappu"),
+- character trigrams, scored by overlap, for everything else.
+
+The catalog validates orders before they are saved and also feeds the
+slot-filling lexicon in `order_state`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+MENU_PATH = Path(__file__).with_name("menu.json")
+
+# Order fields that must name a menu item, and where to look them up.
+FIELD_CATEGORIES = {
+    "drinkType": "drinks",
+    "size": "sizes",
+    "milk": "milks",
+    "extras": "extras",
+}
+
+EXACT_SCORE = 1.0
+PHONETIC_SCORE = 0.9
+PREFIX_SCORE = 0.85
+MIN_SCORE = 0.5  # trigram similarity below this is not a match
+
+MAX_SPAN_WORDS = 3
+_CACHE_SIZE = 4096
+
+_SOUNDEX = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    return " ".join(re.sub(r"[^a-z' ]+", " ", text).split())
+
+
+@lru_cache(maxsize=8192)
+def _word_key(word: str) -> str:
+    code, last = word[0], _SOUNDEX.get(word[0], "")
+    for ch in word[1:]:
+        digit = _SOUNDEX.get(ch, "")
+        if digit and digit != last:
+            code += digit
+        if ch not in "hw":
+            last = digit
+    return code
+
+
+def phonetic_key(text: str) -> str:
+    """Soundex per word, without the usual four-character cut-off."""
+    return " ".join(_word_key(word) for word in text.replace("'", "").split())
+
+
+def _sounds_alike_start(a: str, b: str) -> bool:
+    """Same first letter, or first letters that sound alike ("sinnamon")."""
+    return a[:1] == b[:1] or _SOUNDEX.get(a[:1], a[:1]) == _SOUNDEX.get(b[:1], b[:1])
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class MenuMatch:
+    category: str
+    item: str  # canonical name
+    score: float
+    phrase: str  # the part of the query that matched
+
+
+class _Index:
+    """Lookup tables from phrase keys to entry ids."""
+
+    def __init__(self) -> None:
+        self.exact: dict[str, list[int]] = {}
+        self.phonetic: dict[str, list[int]] = {}
+        self.prefix: dict[str, list[int]] = {}
+        self.trigrams: dict[str, list[int]] = {}
+
+    def add(self, entry: int, phrase: str, grams: set[str]) -> None:
+        self.exact.setdefault(phrase, []).append(entry)
+        self.phonetic.setdefault(phonetic_key(phrase), []).append(entry)
+        for end in range(3, len(phrase)):
+            self.prefix.setdefault(phrase[:end], []).append(entry)
+        for gram in grams:
+            self.trigrams.setdefault(gram, []).append(entry)
+
+
+class MenuCatalog:
+    """Canonical menu items plus a compiled index over their phrases."""
+
+    def __init__(self, menu: dict[str, dict[str, list[str]]]) -> None:
+        self.categories = {
+            category: list(items) for category, items in menu.items()
+        }
+        # One entry per (category, canonical, phrase). Each category gets its
+        # own index, so a lookup never has to filter other categories out.
+        self._entries: list[tuple[str, str, str]] = []
+        self._gram_counts: list[int] = []
+        self._indexes: dict[str | None, _Index] = {None: _Index()}
+        self._cache: dict[tuple[str, str | None], MenuMatch | None] = {}
+
+        for category, items in menu.items():
+            for canonical, phrases in items.items():
+                for phrase in dict.fromkeys([canonical, *phrases]):
+                    self._add(category, canonical, normalize(phrase))
+
+    @classmethod
+    def load(cls, path: str | Path = MENU_PATH) -> MenuCatalog:
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _add(self, category: str, canonical: str, phrase: str) -> None:
+        entry = len(self._entries)
+        self._entries.append((category, canonical, phrase))
+        grams = trigrams(phrase)
+        self._gram_counts.append(len(grams))
+        self._indexes[None].add(entry, phrase, grams)
+        self._indexes.setdefault(category, _Index()).add(entry, phrase, grams)
+
+    def lexicon(self, category: str) -> dict[str, str]:
+        """Every known phrase in `category`, mapped to its canonical item."""
+        return {
+            phrase: canonical
+            for cat, canonical, phrase in self._entries
+            if cat == category
+        }
+
+    def match(self, text: str, category: str | None = None) -> MenuMatch | None:
+        """Best canonical item for a transcript fragment, or None.
+
+        Every run of up to three words in `text` is tried, so "a large oat
+        milk please" still finds "oat milk". Results are cached per query.
+        """
+        key = (text, category)
+        if key not in self._cache:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = self._match(normalize(text), category)
+        return self._cache[key]
+
+    def suggest(
+        self, text: str, category: str | None = None, limit: int = 3
+    ) -> list[str]:
+        """Closest canonical items by spelling, best first (may be empty)."""
+        index = self._indexes.get(category)
+        if index is None:
+            return []
+        scores: dict[str, float] = {}
+        for span in self._spans(normalize(text)):
+            for entry, score in self._trigram_scores(span, index):
+                item = self._entries[entry][1]
+                scores[item] = max(score, scores.get(item, 0.0))
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def match_list(self, text: str, category: str) -> tuple[list[str], list[str]]:
+        """Split a spoken list ("caramel and an extra shot") into items.
+
+        Returns the canonical items found (deduplicated, in order) and the
+        parts that did not match anything in `category`.
+        """
+        known, unknown = [], []
+        for part in re.split(r",|&|\band\b|\bplus\b", text):
+            if not part.strip():
+                continue
+            found = self.match(part, category)
+            if found is None:
+                unknown.append(part.strip())
+            elif found.item not in known:
+                known.append(found.item)
+        return known, unknown
+
+    def canonicalize_order(self, order: dict) -> tuple[dict, list[str]]:
+        """Map every menu field of `order` to canonical items.
+
+        Returns the canonical order and a list of problems (values that are
+        not on the menu); the order should only be saved if that list is
+        empty.
+        """
+        result = dict(order)
+        problems = []
+        for field, category in FIELD_CATEGORIES.items():
+            value = order.get(field)
+            if field == "extras":
+                items = value if isinstance(value, list) else [value or ""]
+                extras = []
+                for item in items:
+                    if not str(item).strip() or normalize(str(item)) == "none":
+                        continue
+                    found = self.match(str(item), category)
+                    if found is None:
+                        problems.append(f"{field}: {item!r} is not on the menu")
+                    elif found.item not in extras:
+                        extras.append(found.item)
+                result[field] = extras
+                continue
+            found = self.match(str(value or ""), category)
+            if found is None:
+                problems.append(f"{field}: {value!r} is not on the menu")
+            else:
+                result[field] = found.item
+        return result, problems
+
+    def _spans(self, text: str) -> list[str]:
+        words = text.split()
+        spans = [text] if text else []
+        for size in range(min(MAX_SPAN_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                span = " ".join(words[start : start + size])
+                if span != text:
+                    spans.append(span)
+        return spans
+
+    def _trigram_scores(self, span: str, index: _Index):
+        grams = trigrams(span)
+        shared = Counter()
+        for gram in grams:
+            shared.update(index.trigrams.get(gram, ()))
+        for entry, count in shared.items():
+            yield entry, 2 * count / (len(grams) + self._gram_counts[entry])
+
+    def _match(self, text: str, category: str | None) -> MenuMatch | None:
+        index = self._indexes.get(category)
+        if not text or index is None:
+            return None
+        entries = self._entries
+        best: tuple[float, int, int, str] | None = None  # (score, length, entry, span)
+
+        def consider(score: float, found, span: str) -> None:
+            nonlocal best
+            for entry in found:
+                # Ties go to the longer phrase ("oat milk" over "oat")
+                rank = (score, len(entries[entry][2]), entry, span)
+                if best is None or rank[:2] > best[:2]:
+                    best = rank
+
+        spans = self._spans(text)
+        for span in spans:
+            consider(EXACT_SCORE, index.exact.get(span, ()), span)
+        if best is None:
+            for span in spans:
+                # Short words collide too easily ("oat"/"out")
+                if len(span) >= 4:
+                    consider(PHONETIC_SCORE, index.phonetic.get(phonetic_key(span), ()), span)
+        if best is None:
+            for span in spans:
+                found = index.prefix.get(span, ()) if len(span) >= 4 else ()
+                if len({entries[e][1] for e in found}) == 1:
+                    consider(PREFIX_SCORE, found, span)
+        if best is None:
+            for span in spans:
+                for entry, score in self._trigram_scores(span, index):
+                    # A different-sounding start is a different item, however
+                    # much else is shared ("frappuccino" is not a cappuccino)
+                    if score >= MIN_SCORE and _sounds_alike_start(span, entries[entry][2]):
+                        consider(round(score * PREFIX_SCORE, 3), (entry,), span)
+        if best is None:
+            return None
+        score, _, entry, span = best
+        category_, canonical, _ = entries[entry]
+        return MenuMatch(category=category_, item=canonical, score=score, phrase=span)
+
+
+@lru_cache(maxsize=None)
+def load_menu(path: str | Path = MENU_PATH) -> MenuCatalog:
+    """The compiled catalog for `path`, built once per process."""
+    return MenuCatalog.load(path)
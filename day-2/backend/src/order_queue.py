@@ -0,0 +1,263 @@
+"""Live order feed for kitchen/barista displays.
+
+`OrderQueue` is an in-process pub/sub: `save_order` publishes each placed
+order and displays subscribe to a stream of events (new orders and status
+changes). Every event gets a monotonically increasing offset and the most
+recent events are retained, so a display that reconnects can resume from
+the last offset it saw.
+
+`OrderStreamServer` exposes the queue over HTTP with Server-Sent Events:
+
+    GET  /orders/stream?offset=N     stream events from offset N (or live);
+                                     a `Last-Event-ID` header takes precedence
+    GET  /orders?since=&status=      current orders from the order store
+    POST /orders/{id}/status         {"status": "ready"} updates and publishes
+
+The queue lives in the job process that saved the order. Set
+`ORDER_STREAM_PORT` to have the agent serve it on 127.0.0.1.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+from aiohttp import web
+
+from order_store import OrderRepository
+
+logger = logging.getLogger("agent")
+
+
+class Subscription:
+    """A display's view of an `OrderQueue`: replayed events, then live ones.
+
+    Iterate with `async for`, or call `get()` (safe to wrap in
+    `asyncio.wait_for`). Iteration ends when the subscription is closed,
+    either explicitly or because the subscriber fell too far behind.
+    """
+
+    def __init__(self, queue: OrderQueue, backlog: list[dict], buffer: int) -> None:
+        self._queue = queue
+        self._backlog = deque(backlog)
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self._last = backlog[-1]["offset"] if backlog else -1
+        self.closed = False
+
+    async def get(self) -> dict | None:
+        """Return the next event, or None once the subscription is closed."""
+        if self._backlog:
+            return self._backlog.popleft()
+        while not self.closed or not self._inbox.empty():
+            event = await self._inbox.get()
+            if event is None:
+                break
+            if event["offset"] > self._last:
+                self._last = event["offset"]
+                return event
+        self.closed = True
+        return None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._queue._subscribers.discard(self)
+        while not self._inbox.empty():
+            self._inbox.get_nowait()
+        self._inbox.put_nowait(None)
+
+    def _deliver(self, event: dict) -> None:
+        try:
+            self._inbox.put_nowait(event)
+        except asyncio.QueueFull:
+            # Never let a stalled display block the agent; it can reconnect
+            # and replay from the last offset it saw.
+            logger.warning("Order stream subscriber is too slow; disconnecting it")
+            self.close()
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> dict:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class OrderQueue:
+    """In-process order event bus with bounded replay.
+
+    Args:
+        retention: number of recent events kept for replay.
+        subscriber_buffer: events buffered per subscriber before it is
+            considered too slow and disconnected.
+        first_offset: offset of the first event. Defaults to the current
+            time in microseconds, so offsets keep increasing across job
+            processes and a display resuming from an older process's offset
+            gets a "gap" event instead of silently missing orders.
+    """
+
+    def __init__(
+        self,
+        retention: int = 10_000,
+        subscriber_buffer: int = 1_000,
+        first_offset: int | None = None,
+    ) -> None:
+        self._events: deque[dict] = deque(maxlen=retention)
+        self._next_offset = first_offset if first_offset is not None else time.time_ns() // 1000
+        self._subscriber_buffer = subscriber_buffer
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def next_offset(self) -> int:
+        return self._next_offset
+
+    def publish(self, event_type: str, order: dict) -> int:
+        """Publish an event (e.g. "placed", "status") and return its offset."""
+        event = {
+            "offset": self._next_offset,
+            "type": event_type,
+            "ts": time.time(),
+            "order": order,
+        }
+        self._next_offset += 1
+        self._events.append(event)
+        for subscription in list(self._subscribers):
+            subscription._deliver(event)
+        return event["offset"]
+
+    def replay(self, offset: int) -> list[dict]:
+        """Return retained events with `offset` or later."""
+        if not self._events or offset >= self._next_offset:
+            return []
+        first = self._events[0]["offset"]
+        return list(self._events)[max(0, offset - first) :]
+
+    def subscribe(self, offset: int | None = None) -> Subscription:
+        """Subscribe from `offset` (default: only new events), then live.
+
+        If `offset` is older than the retained window, a single
+        `{"type": "gap", ...}` event comes first so the display knows to
+        reload the full order list.
+        """
+        backlog = []
+        if offset is not None:
+            oldest = self._events[0]["offset"] if self._events else self._next_offset
+            if offset < oldest:
+                backlog.append({"offset": oldest - 1, "type": "gap", "ts": time.time(), "order": None})
+            backlog.extend(self.replay(offset))
+        subscription = Subscription(self, backlog, self._subscriber_buffer)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def close(self) -> None:
+        """End every open subscription."""
+        for subscription in list(self._subscribers):
+            subscription.close()
+
+
+class OrderStreamServer:
+    """Serve an `OrderQueue` (and optionally the order store) over HTTP/SSE."""
+
+    def __init__(
+        self,
+        queue: OrderQueue,
+        repo: OrderRepository | None = None,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        heartbeat: float = 15.0,
+    ) -> None:
+        self.queue = queue
+        self.repo = repo
+        self.host = host
+        self.port = port
+        self.heartbeat = heartbeat
+        self._runner: web.AppRunner | None = None
+        self._streams: set[Subscription] = set()
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/orders/stream", self._stream)
+        app.router.add_get("/orders", self._list)
+        app.router.add_post("/orders/{order_id}/status", self._set_status)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve the real port when an ephemeral one (0) was requested.
+        self.port = self._runner.addresses[0][1]
+        logger.info("Order stream listening on http://%s:%d/orders/stream", self.host, self.port)
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            # End open streams so the runner doesn't wait on them.
+            for subscription in list(self._streams):
+                subscription.close()
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        # A reconnecting EventSource sends Last-Event-ID; it wins over ?offset=.
+        offset = request.query.get("offset")
+        if "Last-Event-ID" in request.headers:
+            offset = int(request.headers["Last-Event-ID"]) + 1
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+        )
+        await response.prepare(request)
+        subscription = self.queue.subscribe(int(offset) if offset is not None else None)
+        self._streams.add(subscription)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies open and detects gone clients.
+                    await response.write(b": keepalive\n\n")
+                    continue
+                if event is None:
+                    break
+                payload = json.dumps(event, ensure_ascii=False)
+                await response.write(
+                    f"id: {event['offset']}\nevent: {event['type']}\ndata: {payload}\n\n".encode()
+                )
+        except ConnectionResetError:
+            pass
+        finally:
+            self._streams.discard(subscription)
+            subscription.close()
+        return response
+
+    async def _list(self, request: web.Request) -> web.Response:
+        if self.repo is None:
+            raise web.HTTPNotFound(text="no order store configured")
+        orders = await asyncio.to_thread(
+            self.repo.list_orders,
+            since=request.query.get("since"),
+            status=request.query.get("status"),
+        )
+        return web.json_response({"next_offset": self.queue.next_offset, "orders": orders})
+
+    async def _set_status(self, request: web.Request) -> web.Response:
+        if self.repo is None:
+            raise web.HTTPNotFound(text="no order store configured")
+        body = await request.json()
+        try:
+            record = await asyncio.to_thread(
+                self.repo.set_status, request.match_info["order_id"], body.get("status", "")
+            )
+        except KeyError:
+            raise web.HTTPNotFound(text="unknown order") from None
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e)) from None
+        offset = self.queue.publish("status", record)
+        return web.json_response({"offset": offset, "order": record})
@@ -0,0 +1,247 @@
+"""Typed barista order state and a rule-based slot extractor.
+
+The schema and prompts are shared by the voice agent and `scripts/barista_cli.py`.
+`extract_slots` runs on each final transcript and fills the obvious slots
+("large oat latte" -> size, milk, drinkType) from the menu lexicon, so the
+agent can ask the next question itself instead of waiting on the LLM.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field, replace
+
+from menu import MenuCatalog, load_menu
+
+ORDER_SCHEMA = ["drinkType", "size", "milk", "extras", "name"]
+
+PROMPTS = {
+    "drinkType": "What would you like to drink? (e.g. latte, cappuccino, americano)",
+    "size": "What size? (small/medium/large)",
+    "milk": "Which milk? (dairy/oat/almond/soy)",
+    "extras": "Any extras? (comma-separated, or 'none')",
+    "name": "What's the name for the order?",
+}
+
+# Spoken versions of PROMPTS, used when the agent asks on its own.
+QUESTIONS = {
+    "drinkType": "What would you like to drink?",
+    "size": "What size would you like: small, medium or large?",
+    "milk": "Which milk would you like: dairy, oat, almond or soy?",
+    "extras": "Any extras, like an extra shot or syrup?",
+    "name": "And what name should I put on the order?",
+}
+
+NO_EXTRAS = ("no extras", "nothing else", "no thanks", "none", "nope", "no")
+
+# phrase -> canonical value, from the menu catalog; longer phrases are
+# matched first. "none" is left out of the milks because it usually answers
+# the extras question.
+MENU = load_menu()
+DRINKS = MENU.lexicon("drinks")
+SIZES = MENU.lexicon("sizes")
+MILKS = {p: v for p, v in MENU.lexicon("milks").items() if p not in NO_EXTRAS}
+EXTRAS = MENU.lexicon("extras")
+
+# Words that carry no slot information ("can I get a ...").
+FILLER = set(
+    """
+    a an the and with some please thanks thank you i i'd id like would want can could get
+    have me my make it its it's just go for of one cup size milk um uh er yeah yes sure ok
+    okay let's lets do be that will that'll also plus add in to on hi hello hey then
+    """.split()
+)
+
+# Things that follow "for"/"it's" but are not names ("a latte for here").
+NOT_NAMES = {"me", "here", "now", "today", "takeaway", "take away", "to go", "there", "you"}
+
+NAME_PATTERNS = [
+    re.compile(r"\b(?:my name is|name is|name's|it's for|its for|under|for)\s+([a-z][a-z' -]{0,40})$"),
+    re.compile(r"^(?:i'm|i am|this is|it's|its)\s+([a-z][a-z' -]{0,40})$"),
+]
+
+
+def _compile(lexicon: dict[str, str]) -> re.Pattern:
+    phrases = sorted(lexicon, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(p) for p in phrases) + r")\b")
+
+
+_DRINK_RE = _compile(DRINKS)
+_SIZE_RE = _compile(SIZES)
+_MILK_RE = _compile(MILKS)
+_EXTRA_RE = _compile(EXTRAS)
+_QUESTION_RE = re.compile(r"^(?:what|which|how|why|when|where|who|do you|does|is there|are there|is it)\b")
+_NO_EXTRAS_RE = re.compile(r"^(?:" + "|".join(re.escape(p) for p in NO_EXTRAS) + r")\b")
+
+
+def _looks_like_name(candidate: str) -> bool:
+    words = candidate.split()
+    return (
+        0 < len(words) <= 3
+        and candidate.strip() not in NOT_NAMES
+        and not any(w in FILLER or w in NOT_NAMES for w in words)
+    )
+
+
+def normalize_extras(text: str, menu: MenuCatalog | None = None) -> list[str]:
+    """Parse an extras answer ('none' means no extras) into canonical items.
+
+    Items that are not on the menu are dropped; use `MenuCatalog.match_list`
+    to find out which ones those were.
+    """
+    if not text:
+        return []
+    t = text.strip()
+    if t.lower() == "none":
+        return []
+    return (menu or MENU).match_list(t, "extras")[0]
+
+
+@dataclass
+class Extraction:
+    """Slots found in one utterance.
+
+    `understood` is true when every word was either a slot value or filler,
+    i.e. there is nothing in the utterance the LLM would need to handle.
+    """
+
+    slots: dict = field(default_factory=dict)
+    understood: bool = False
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    return re.sub(r"[^a-z' ]+", " ", text).strip()
+
+
+def extract_slots(text: str, expecting: str | None = None) -> Extraction:
+    """Fill order slots from a transcript using the lexicon.
+
+    Args:
+        text: final user transcript.
+        expecting: the field the agent just asked about; lets short answers
+            such as "no" (extras) or "Jordan" (name) be interpreted.
+    """
+    t = _normalize(text)
+    if not t:
+        return Extraction()
+    slots: dict = {}
+    leftover = t
+
+    for key, regex, lexicon in (
+        ("drinkType", _DRINK_RE, DRINKS),
+        ("size", _SIZE_RE, SIZES),
+        ("milk", _MILK_RE, MILKS),
+    ):
+        match = regex.search(leftover)
+        if match:
+            slots[key] = lexicon[match.group(1)]
+            leftover = leftover[: match.start()] + " " + leftover[match.end() :]
+
+    extras = []
+    for match in _EXTRA_RE.finditer(leftover):
+        value = EXTRAS[match.group(1)]
+        if value not in extras:
+            extras.append(value)
+    if extras:
+        slots["extras"] = extras
+        leftover = _EXTRA_RE.sub(" ", leftover)
+    elif expecting == "extras" and _NO_EXTRAS_RE.match(leftover.strip()):
+        slots["extras"] = []
+        leftover = _NO_EXTRAS_RE.sub(" ", leftover.strip())
+
+    for pattern in NAME_PATTERNS:
+        match = pattern.search(leftover.strip())
+        if match and _looks_like_name(match.group(1)):
+            slots["name"] = match.group(1).strip().title()
+            leftover = leftover[: leftover.find(match.group(0))]
+            break
+
+    words = [w for w in leftover.split() if w not in FILLER]
+    question = bool(_QUESTION_RE.match(t))
+    if expecting == "name" and not slots and not question and _looks_like_name(" ".join(words)):
+        slots["name"] = " ".join(words).title()
+        words = []
+
+    # Questions ("what milks do you have?") always go to the LLM, even if
+    # they mention menu items; requests ("can I get a latte?") do not.
+    return Extraction(slots=slots, understood=bool(slots) and not words and not question)
+
+
+@dataclass
+class OrderState:
+    """The order being collected; `extras` is None until the customer answers."""
+
+    drinkType: str = ""
+    size: str = ""
+    milk: str = ""
+    extras: list[str] | None = None
+    name: str = ""
+
+    def apply(self, slots: dict) -> list[str]:
+        """Set the given slots (idempotently) and return the fields changed."""
+        changed = []
+        for key in ORDER_SCHEMA:
+            if key not in slots:
+                continue
+            value = list(slots[key]) if key == "extras" else slots[key]
+            if getattr(self, key) != value:
+                setattr(self, key, value)
+                changed.append(key)
+        return changed
+
+    def missing(self) -> list[str]:
+        return [
+            key
+            for key in ORDER_SCHEMA
+            if (self.extras is None if key == "extras" else not getattr(self, key))
+        ]
+
+    def next_field(self) -> str | None:
+        missing = self.missing()
+        return missing[0] if missing else None
+
+    def next_question(self) -> str | None:
+        key = self.next_field()
+        return QUESTIONS[key] if key else None
+
+    def is_complete(self) -> bool:
+        return not self.missing()
+
+    def copy(self) -> OrderState:
+        return replace(self, extras=list(self.extras) if self.extras is not None else None)
+
+    def as_order(self) -> dict:
+        return {
+            "drinkType": self.drinkType,
+            "size": self.size,
+            "milk": self.milk,
+            "extras": list(self.extras or []),
+            "name": self.name,
+        }
+
+
+@dataclass
+class TurnPlan:
+    """What the agent should do after a user turn."""
+
+    text: str
+    state: OrderState
+    extraction: Extraction
+    reply: str | None = None  # set when the LLM can be skipped
+
+
+def plan_turn(state: OrderState, text: str) -> TurnPlan:
+    """Apply `text` to a copy of `state` and decide whether the LLM is needed.
+
+    The reply is fully determined (no LLM) when the utterance was completely
+    understood, filled at least one slot, and the order is still incomplete:
+    the next thing to say is simply the question for the next missing field.
+    """
+    extraction = extract_slots(text, expecting=state.next_field())
+    new_state = state.copy()
+    changed = new_state.apply(extraction.slots)
+    reply = None
+    if extraction.understood and changed and not new_state.is_complete():
+        reply = new_state.next_question()
+    return TurnPlan(text=text, state=new_state, extraction=extraction, reply=reply)
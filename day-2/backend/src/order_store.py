@@ -0,0 +1,272 @@
+"""Order repository for the Everbean barista.
+
+Orders are appended as JSON lines to date-sharded segment files
+(`orders/YYYY/MM/DD.jsonl`), one line per order snapshot. A status change
+appends a fresh snapshot of the order to the shard it was created in, and the
+latest snapshot wins. Every order gets a monotonic, collision-free ID, and an
+in-memory index by name, status and creation time answers `list_orders`
+without re-reading or re-parsing any shard.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+logger = logging.getLogger("agent")
+
+STATUSES = ("placed", "preparing", "ready", "collected", "cancelled")
+
+
+def _utc_iso(ms: int) -> str:
+    dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+def _to_ms(dt: datetime) -> int:
+    """Milliseconds since the epoch; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+class OrderIdGenerator:
+    """Monotonic order IDs: `<UTC ms timestamp>-<sequence>-<process>`.
+
+    IDs sort by creation time. The sequence breaks ties within a millisecond
+    (and absorbs clock steps backwards), and the process component keeps IDs
+    from concurrent worker processes apart.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._seq = 0
+        self._node = f"{os.getpid():x}"
+
+    def next(self) -> tuple[str, int]:
+        """Return a new `(order_id, created_ms)` pair."""
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms, self._seq = now_ms, 0
+            else:
+                self._seq += 1
+            ms, seq = self._last_ms, self._seq
+        stamp = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y%m%dT%H%M%S")
+        return f"{stamp}{ms % 1000:03d}Z-{seq:04d}-{self._node}", ms
+
+
+def normalize_order(order: dict) -> dict:
+    """Coerce an order state object into the stored schema."""
+    return {
+        "drinkType": str(order.get("drinkType", "")).strip(),
+        "size": str(order.get("size", "")).strip(),
+        "milk": str(order.get("milk", "")).strip(),
+        "extras": [str(e).strip() for e in order.get("extras") or [] if str(e).strip()],
+        "name": str(order.get("name", "")).strip(),
+    }
+
+
+class OrderRepository:
+    """Date-sharded, append-only order store with an in-memory index.
+
+    `prepare` is cheap and safe to call on the event loop; `append` does the
+    disk write and is meant to run off-loop (it doubles as a write-behind
+    sink). `add` does both for synchronous callers such as the CLI.
+    """
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        self.root = Path(root) if root is not None else Path(os.getcwd()) / "orders"
+        self._ids = OrderIdGenerator()
+        self._lock = threading.Lock()
+        self._offsets: dict[Path, int] = {}
+        self._orders: dict[str, dict] = {}
+        self._by_name: dict[str, set[str]] = defaultdict(set)
+        self._by_status: dict[str, set[str]] = defaultdict(set)
+        self._created: list[tuple[str, str]] = []  # sorted (created_at, id)
+
+    def prepare(self, order: dict, status: str = "placed") -> dict:
+        """Return a stored-schema copy of `order` with a fresh ID and timestamps."""
+        order_id, ms = self._ids.next()
+        created_at = _utc_iso(ms)
+        return {
+            "id": order_id,
+            **normalize_order(order),
+            "status": status,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def append(self, records: list, sync: bool = False) -> None:
+        """Persist prepared order snapshots and index them."""
+        by_shard: dict[Path, list[bytes]] = defaultdict(list)
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            by_shard[self.shard_path(record["created_at"])].append(line.encode("utf-8"))
+        for shard, lines in by_shard.items():
+            shard.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(shard, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, b"".join(lines))
+                if sync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.refresh()
+
+    def add(self, order: dict, sync: bool = True) -> dict:
+        """Prepare and persist `order` synchronously; returns the stored record."""
+        record = self.prepare(order)
+        self.append([record], sync=sync)
+        return record
+
+    def status_update(self, order_id: str, status: str) -> dict:
+        """Return a new snapshot of `order_id` with `status`, ready to `append`."""
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {STATUSES}, got {status!r}")
+        current = self.get(order_id)
+        if current is None:
+            raise KeyError(order_id)
+        return {**current, "status": status, "updated_at": _utc_iso(time.time_ns() // 1_000_000)}
+
+    def set_status(self, order_id: str, status: str, sync: bool = True) -> dict:
+        record = self.status_update(order_id, status)
+        self.append([record], sync=sync)
+        return record
+
+    def get(self, order_id: str) -> dict | None:
+        self.refresh()
+        order = self._orders.get(order_id)
+        return dict(order) if order is not None else None
+
+    def list_orders(
+        self,
+        since: str | datetime | None = None,
+        status: str | None = None,
+        name: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Return orders created at or after `since`, oldest first.
+
+        Args:
+            since: ISO timestamp/date string or datetime; None for all orders.
+            status: only orders whose latest status matches.
+            name: only orders for this customer name (case-insensitive).
+            limit: return at most this many of the newest matches.
+        """
+        self.refresh()
+        with self._lock:
+            start = 0
+            if since is not None:
+                if isinstance(since, datetime):
+                    since = _utc_iso(_to_ms(since))
+                start = bisect.bisect_left(self._created, (since, ""))
+            candidates = [order_id for _, order_id in self._created[start:]]
+            if status is not None:
+                wanted = self._by_status.get(status, set())
+                candidates = [i for i in candidates if i in wanted]
+            if name is not None:
+                wanted = self._by_name.get(name.strip().lower(), set())
+                candidates = [i for i in candidates if i in wanted]
+            if limit is not None:
+                candidates = candidates[-limit:] if limit > 0 else []
+            return [dict(self._orders[i]) for i in candidates]
+
+    def shard_path(self, created_at: str) -> Path:
+        return self.root / created_at[:4] / created_at[5:7] / f"{created_at[8:10]}.jsonl"
+
+    def refresh(self) -> None:
+        """Index snapshot lines appended since the last scan, by any process."""
+        with self._lock:
+            if not self.root.exists():
+                return
+            for shard in sorted(self.root.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]/[0-9][0-9].jsonl")):
+                self._scan_shard(shard)
+
+    def _scan_shard(self, shard: Path) -> None:
+        indexed_to = self._offsets.get(shard, 0)
+        if shard.stat().st_size <= indexed_to:
+            return
+        with open(shard, "rb") as f:
+            f.seek(indexed_to)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # another process is mid-write
+                indexed_to += len(raw)
+                try:
+                    self._index(json.loads(raw))
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning("Skipping corrupt order line in %s", shard)
+        self._offsets[shard] = indexed_to
+
+    def _index(self, record: dict) -> None:
+        order_id = record["id"]
+        previous = self._orders.get(order_id)
+        if previous is not None:
+            if previous["updated_at"] > record["updated_at"]:
+                return
+            self._by_status[previous["status"]].discard(order_id)
+            self._by_name[previous["name"].lower()].discard(order_id)
+        else:
+            bisect.insort(self._created, (record["created_at"], order_id))
+        self._orders[order_id] = record
+        self._by_status[record["status"]].add(order_id)
+        self._by_name[record["name"].lower()].add(order_id)
+
+
+def import_legacy_orders(repo: OrderRepository) -> int:
+    """Move flat `orders/order_*.json` files into the repository, once.
+
+    Each file is renamed to `<name>.migrated` before it is imported, so
+    concurrent workers never import the same order twice.
+    """
+    imported = 0
+    for legacy in sorted(repo.root.glob("order_*.json")):
+        migrated = legacy.with_name(legacy.name + ".migrated")
+        try:
+            legacy.rename(migrated)
+        except FileNotFoundError:
+            continue
+        try:
+            with open(migrated, encoding="utf-8") as f:
+                order = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning("Legacy order %s is corrupt; skipping", legacy)
+            continue
+        record = repo.prepare(order)
+        try:
+            # Keep the original time so the order lands in the right shard.
+            saved_at = datetime.fromisoformat(str(order["saved_at"]).rstrip("Z"))
+            record["created_at"] = record["updated_at"] = _utc_iso(_to_ms(saved_at))
+        except (KeyError, ValueError):
+            pass
+        repo.append([record])
+        imported += 1
+    if imported:
+        logger.info("Imported %d legacy order file(s) from %s", imported, repo.root)
+    return imported
+
+
+def open_repository(root: str | Path | None = None) -> OrderRepository:
+    """Open the order repository under `root` (default: `./orders`).
+
+    Legacy one-file-per-order JSON files found there are imported on open.
+    """
+    repo = OrderRepository(root)
+    import_legacy_orders(repo)
+    return repo
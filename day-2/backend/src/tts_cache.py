@@ -0,0 +1,412 @@
+"""Synthesized-audio cache for the barista's fixed lines.
+
+Most of what the barista says comes from a small set of sentences (the
+`order_state.QUESTIONS`, the greeting, confirmations), yet every session
+used to pay Murf latency and quota to synthesize them again. `CachedTTS`
+wraps a TTS and keys each sentence on (voice, style, sample rate,
+normalized text). The PCM is kept in `AudioCache`: a size-bounded LRU
+directory of raw PCM files, read through mmap, with a smaller in-memory
+tier for the hottest sentences. A cached sentence is streamed straight
+from the cache with no request to the provider.
+
+Like `StreamAdapter`, `CachedTTS.stream()` splits the LLM text into
+sentences and synthesizes each one with the wrapped TTS's `synthesize`, so
+misses still stream from the provider and are stored once they complete.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterable, Iterable
+from pathlib import Path
+from typing import Any
+
+from livekit.agents import tokenize, utils
+from livekit.agents.tts import (
+    TTS,
+    AudioEmitter,
+    ChunkedStream,
+    SentenceStreamPacer,
+    SynthesizedAudio,
+    SynthesizeStream,
+    TTSCapabilities,
+)
+from livekit.agents.tts.stream_adapter import DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+logger = logging.getLogger("agent")
+
+DEFAULT_CACHE_DIR = "tts_cache"
+
+
+def normalize_text(text: str) -> str:
+    """Case and whitespace do not change the audio; punctuation can."""
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(voice: str, style: str | None, sample_rate: int, text: str) -> str:
+    raw = f"{voice}\x1f{style or ''}\x1f{sample_rate}\x1f{normalize_text(text)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Two-tier LRU of PCM audio: memory, then disk.
+
+    Args:
+        directory: where `<key>.pcm` files are kept; created on demand.
+        max_disk_bytes: disk budget; least recently used files are removed.
+        max_memory_bytes: budget for the in-memory hot tier.
+
+    File access times are tracked with mtime, so the LRU order survives a
+    restart. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike = DEFAULT_CACHE_DIR,
+        *,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        max_memory_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pcm"
+
+    def _load_index(self) -> None:
+        if not self.directory.is_dir():
+            return
+        files = []
+        for path in self.directory.glob("*.pcm"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._disk.keys() | self._memory.keys())
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+            if key not in self._disk:
+                return None
+            try:
+                with open(self._path(key), "rb") as f, mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                ) as mapped:
+                    data = mapped[:]
+                os.utime(self._path(key))
+            except (FileNotFoundError, ValueError):
+                # Removed behind our back (or empty): forget it
+                self._disk_bytes -= self._disk.pop(key)
+                return None
+            self._disk.move_to_end(key)
+            self._remember(key, data)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{key}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._remember(key, data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._forget(old)
+                try:
+                    self._path(old).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _forget(self, key: str) -> None:
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+
+
+class CacheStats:
+    """Hit rate and time to first audio, split by cache hits and misses."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        # Recent samples only, so a long-lived worker does not grow them forever
+        self.hit_ttfa: deque[float] = deque(maxlen=1000)
+        self.miss_ttfa: deque[float] = deque(maxlen=1000)
+
+    def record(self, hit: bool, ttfa: float) -> None:
+        if hit:
+            self.hits += 1
+            self.hit_ttfa.append(ttfa)
+        else:
+            self.misses += 1
+            self.miss_ttfa.append(ttfa)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        def p50_ms(values: deque[float]) -> float | None:
+            return round(statistics.median(values) * 1000, 2) if values else None
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "hit_ttfa_ms_p50": p50_ms(self.hit_ttfa),
+            "miss_ttfa_ms_p50": p50_ms(self.miss_ttfa),
+        }
+
+
+class CachedTTS(TTS):
+    """Serve repeated sentences from an `AudioCache` instead of the provider.
+
+    Args:
+        tts: the TTS to wrap, e.g. the `murf.TTS` built in `entrypoint`.
+        cache: where synthesized audio is kept.
+        voice, style: the wrapped TTS's voice settings; part of the cache key.
+        sentence_tokenizer: splits streamed LLM text into cacheable sentences.
+        text_pacing: passed through as in `StreamAdapter`.
+    """
+
+    def __init__(
+        self,
+        *,
+        tts: TTS,
+        cache: AudioCache,
+        voice: str,
+        style: str | None = None,
+        sentence_tokenizer: tokenize.SentenceTokenizer | None = None,
+        text_pacing: SentenceStreamPacer | bool = False,
+    ) -> None:
+        super().__init__(
+            capabilities=TTSCapabilities(streaming=True, aligned_transcript=True),
+            sample_rate=tts.sample_rate,
+            num_channels=tts.num_channels,
+        )
+        self._wrapped_tts = tts
+        self._cache = cache
+        self._voice = voice
+        self._style = style
+        self._sentence_tokenizer = sentence_tokenizer or tokenize.basic.SentenceTokenizer(
+            min_sentence_len=2
+        )
+        self._stream_pacer: SentenceStreamPacer | None = None
+        if text_pacing is True:
+            self._stream_pacer = SentenceStreamPacer()
+        elif isinstance(text_pacing, SentenceStreamPacer):
+            self._stream_pacer = text_pacing
+        self.stats = CacheStats()
+        self._wrapped_tts.on("metrics_collected", self._on_metrics_collected)
+
+    @property
+    def model(self) -> str:
+        return self._wrapped_tts.model
+
+    @property
+    def provider(self) -> str:
+        return self._wrapped_tts.provider
+
+    @property
+    def cache(self) -> AudioCache:
+        return self._cache
+
+    def key(self, text: str) -> str:
+        return cache_key(self._voice, self._style, self.sample_rate, text)
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CachedChunkedStream:
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CachedSynthesizeStream:
+        return CachedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self._wrapped_tts.prewarm()
+
+    async def warm(self, phrases: Iterable[str]) -> int:
+        """Synthesize every sentence of `phrases` not cached yet; returns the count."""
+        synthesized = 0
+        for phrase in phrases:
+            for sentence in self._sentence_tokenizer.tokenize(phrase):
+                if not sentence.strip() or self.key(sentence) in self._cache:
+                    continue
+                await self._emit_sentence(sentence, None, DEFAULT_API_CONNECT_OPTIONS)
+                synthesized += 1
+        return synthesized
+
+    async def _emit_sentence(
+        self,
+        text: str,
+        output_emitter: AudioEmitter | None,
+        conn_options: APIConnectOptions,
+    ) -> float:
+        """Push the audio for one sentence, from cache or the wrapped TTS.
+
+        Returns the sentence's duration in seconds.
+        """
+        start = time.perf_counter()
+        key = self.key(text)
+        # mmap reads of a few hundred KB are cheap enough for the event loop
+        data = self._cache.get(key)
+        if data is not None:
+            if output_emitter is not None:
+                output_emitter.push(data)
+            self.stats.record(True, time.perf_counter() - start)
+            return len(data) / (2 * self.sample_rate * self.num_channels)
+
+        chunks = []
+        ttfa = None
+        async with self._wrapped_tts.synthesize(text, conn_options=conn_options) as stream:
+            async for audio in stream:
+                if ttfa is None:
+                    ttfa = time.perf_counter() - start
+                chunk = audio.frame.data.tobytes()
+                chunks.append(chunk)
+                if output_emitter is not None:
+                    output_emitter.push(chunk)
+        data = b"".join(chunks)
+        self.stats.record(False, ttfa if ttfa is not None else time.perf_counter() - start)
+        await asyncio.to_thread(self._cache.put, key, data)
+        return len(data) / (2 * self.sample_rate * self.num_channels)
+
+    def _on_metrics_collected(self, *args: Any, **kwargs: Any) -> None:
+        self.emit("metrics_collected", *args, **kwargs)
+
+    async def aclose(self) -> None:
+        self._wrapped_tts.off("metrics_collected", self._on_metrics_collected)
+
+
+class CachedChunkedStream(ChunkedStream):
+    def __init__(self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions) -> None:
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._tts: CachedTTS = tts
+
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=self._tts.num_channels,
+            mime_type="audio/pcm",
+        )
+        await self._tts._emit_sentence(self._input_text, output_emitter, self._conn_options)
+        output_emitter.flush()
+
+
+class CachedSynthesizeStream(SynthesizeStream):
+    def __init__(self, *, tts: CachedTTS, conn_options: APIConnectOptions) -> None:
+        # Retries happen in the wrapped TTS's synthesize, as in StreamAdapter
+        super().__init__(tts=tts, conn_options=DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS)
+        self._tts: CachedTTS = tts
+        self._wrapped_tts_conn_options = conn_options
+
+    async def _metrics_monitor_task(self, event_aiter: AsyncIterable[SynthesizedAudio]) -> None:
+        pass  # the wrapped TTS reports metrics for real synthesis
+
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        from livekit.agents.voice.io import TimedString
+
+        sent_stream = self._tts._sentence_tokenizer.stream()
+        if self._tts._stream_pacer:
+            sent_stream = self._tts._stream_pacer.wrap(
+                sent_stream=sent_stream, audio_emitter=output_emitter
+            )
+
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=self._tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+
+        async def _forward_input() -> None:
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    sent_stream.flush()
+                    continue
+                sent_stream.push_text(data)
+            sent_stream.end_input()
+
+        async def _synthesize() -> None:
+            duration = 0.0
+            async for ev in sent_stream:
+                output_emitter.push_timed_transcript(
+                    TimedString(text=ev.token, start_time=duration)
+                )
+                if not (text := ev.token.strip()):
+                    continue
+                duration += await self._tts._emit_sentence(
+                    text, output_emitter, self._wrapped_tts_conn_options
+                )
+                output_emitter.flush()
+
+        tasks = [
+            asyncio.create_task(_forward_input()),
+            asyncio.create_task(_synthesize()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await sent_stream.aclose()
+            await utils.aio.cancel_and_wait(*tasks)
@@ -0,0 +1,48 @@
+import json
+import pickle
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import capacity
+from capacity import CapacityModel
+
+
+def test_reserved_budget_counts_before_cpu_shows_it() -> None:
+    model = CapacityModel(session_cpu_cores=0.5, session_memory_mb=100, threshold=0.7)
+    cores = model._cpu_monitor.cpu_count()
+    snapshot = model.compute(active_jobs=1, cpu=0.0, memory=(0.0, 10_000.0))
+    assert snapshot["load"] == round(0.5 / cores, 4)
+    assert snapshot["capacity_sessions"] == int(min(cores / 0.5, 100) * 0.7)
+
+
+def test_load_is_the_worst_part_capped_at_one() -> None:
+    model = CapacityModel(session_cpu_cores=0.1, session_memory_mb=100)
+    assert model.compute(0, cpu=0.9, memory=(0.0, 1000.0))["load"] == 0.9
+    assert model.compute(0, cpu=0.1, memory=(800.0, 1000.0))["load"] == 0.8
+    assert model.compute(50, cpu=0.1, memory=(0.0, 1000.0))["load"] == 1.0
+
+
+def test_ready_endpoint_follows_the_threshold() -> None:
+    model = CapacityModel(session_cpu_cores=1000, threshold=0.5, port=0)
+    worker = SimpleNamespace(active_jobs=[])
+    model.load(worker)
+    url = f"http://127.0.0.1:{model._server.server_address[1]}"
+    with urllib.request.urlopen(f"{url}/ready") as response:
+        assert json.load(response)["ready"] is True
+
+    worker.active_jobs = [object()]
+    model.load(worker)
+    try:
+        urllib.request.urlopen(f"{url}/ready")
+        raise AssertionError("expected 503")
+    except urllib.error.HTTPError as e:
+        assert e.code == 503
+    with urllib.request.urlopen(f"{url}/load") as response:
+        assert json.load(response)["active_jobs"] == 1
+    model._server.shutdown()
+
+
+def test_worker_options_pickle_for_the_dev_reloader() -> None:
+    options = capacity.worker_options()
+    assert pickle.loads(pickle.dumps(options["load_fnc"])) is capacity.load
@@ -0,0 +1,90 @@
+import asyncio
+
+from livekit.agents import llm
+
+from context_policy import ContextPolicy
+
+
+def _call(turns: int) -> llm.ChatContext:
+    """Instructions, then `turns` turns; every third saves the order."""
+    ctx = llm.ChatContext()
+    ctx.add_message(role="system", content="You are a barista.")
+    for turn in range(1, turns + 1):
+        ctx.add_message(role="user", content=f"user {turn}")
+        if turn % 3 == 0:
+            name = "save_order" if turn % 6 == 0 else "match_menu_item"
+            ctx.items.append(llm.FunctionCall(call_id=f"c{turn}", name=name, arguments="{}"))
+            ctx.items.append(
+                llm.FunctionCallOutput(call_id=f"c{turn}", name=name, output=f"ok {turn}", is_error=False)
+            )
+        ctx.add_message(role="assistant", content=f"assistant {turn}")
+    return ctx
+
+
+def _texts(ctx: llm.ChatContext) -> list[str]:
+    return [
+        item.text_content if item.type == "message" else f"{item.type}:{item.call_id}"
+        for item in ctx.items
+    ]
+
+
+class Summarizer:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.transcripts: list[str] = []
+
+    async def __call__(self, summary: str, transcript: str) -> str:
+        self.transcripts.append(transcript)
+        if self.fail:
+            raise RuntimeError("summary LLM down")
+        return f"summary of {len(self.transcripts)} batch(es)"
+
+
+async def test_short_calls_are_sent_unchanged() -> None:
+    ctx = _call(4)
+    assert ContextPolicy(keep_turns=4, summarizer=Summarizer()).apply(ctx) is ctx
+
+
+async def test_older_turns_fold_into_a_summary_off_the_critical_path() -> None:
+    summarizer = Summarizer()
+    policy = ContextPolicy(keep_turns=4, fold_turns=3, state_tools=("save_order",), summarizer=summarizer)
+    ctx = _call(12)
+
+    # The summary is not ready yet: the old turns are still sent verbatim
+    first = policy.apply(ctx)
+    assert len(first.items) == len(ctx.items)
+    await asyncio.sleep(0)
+
+    sent = _texts(policy.apply(ctx))
+    assert sent[:2] == ["You are a barista.", "Summary of the earlier conversation:\nsummary of 1 batch(es)"]
+    # Saved orders stay; the menu lookup of turn 3 is folded
+    assert "function_call:c6" in sent and "function_call_output:c6" in sent
+    assert "function_call:c3" not in sent and "user 8" not in sent
+    assert sent[sent.index("user 9") :][:3] == ["user 9", "function_call:c9", "function_call_output:c9"]
+    assert "tool match_menu_item: ok 3" in summarizer.transcripts[0]
+
+    # The history itself is untouched
+    assert len(ctx.items) == 12 * 2 + 4 * 2 + 1
+
+
+async def test_failed_summary_keeps_turns_and_retries() -> None:
+    summarizer = Summarizer(fail=True)
+    policy = ContextPolicy(keep_turns=2, fold_turns=1, summarizer=summarizer)
+    ctx = _call(5)
+
+    policy.apply(ctx)
+    await asyncio.sleep(0)
+    assert policy.failed == 1
+
+    summarizer.fail = False
+    assert len(policy.apply(ctx).items) == len(ctx.items)
+    await asyncio.sleep(0)
+    assert _texts(policy.apply(ctx)) == [
+        "You are a barista.",
+        "Summary of the earlier conversation:\nsummary of 2 batch(es)",
+        "user 4",
+        "assistant 4",
+        "user 5",
+        "assistant 5",
+    ]
+    assert policy.summaries == 1
@@ -0,0 +1,87 @@
+import random
+
+from livekit.agents import AgentStateChangedEvent, metrics
+from livekit.protocol import agent as agent_proto
+
+import latency_metrics
+from latency_metrics import (
+    BUCKETS,
+    START_STAGES,
+    LatencyHistogram,
+    SessionLatency,
+    StageHistograms,
+    dispatched_at,
+)
+
+
+def llm_metrics(ttft: float, cancelled: bool = False) -> metrics.LLMMetrics:
+    return metrics.LLMMetrics(
+        label="llm", request_id="r", timestamp=0.0, duration=1.0, ttft=ttft,
+        cancelled=cancelled, completion_tokens=1, prompt_tokens=1,
+        prompt_cached_tokens=0, total_tokens=2, tokens_per_second=1.0,
+    )
+
+
+def tts_metrics(ttfb: float) -> metrics.TTSMetrics:
+    return metrics.TTSMetrics(
+        label="tts", request_id="r", timestamp=0.0, ttfb=ttfb, duration=1.0,
+        audio_duration=1.0, cancelled=False, characters_count=10, streamed=True,
+    )
+
+
+def test_quantiles_are_within_one_bucket() -> None:
+    rng = random.Random(1)
+    values = sorted(rng.lognormvariate(-1, 0.8) for _ in range(5000))
+    hist = LatencyHistogram()
+    for v in values:
+        hist.observe(v)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert exact <= hist.quantile(q) <= exact * 1.1 + 1e-9
+    assert hist.count == 5000
+    assert len(hist.counts) == len(BUCKETS) + 1
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_session_routes_events_to_stages_and_worker() -> None:
+    worker = StageHistograms()
+    a = SessionLatency("test", "room-a", worker=worker)
+    b = SessionLatency("test", "room-b", worker=worker)
+
+    a.observe(metrics.EOUMetrics(timestamp=0.0, end_of_utterance_delay=0.4,
+                                 transcription_delay=0.2, on_user_turn_completed_delay=0.0))
+    a.observe(llm_metrics(0.6))
+    a.observe(llm_metrics(5.0, cancelled=True))
+    a.observe(tts_metrics(0.3))
+    b.observe(tts_metrics(-1))  # no audio produced
+    b.observe(tts_metrics(0.5))
+
+    session = a.summary()["session"]
+    assert {stage: s["count"] for stage, s in session.items()} == {
+        "eou": 1, "stt": 1, "llm_ttft": 1, "tts_ttfb": 1,
+    }
+    assert 400 <= session["eou"]["p50_ms"] <= 440
+    assert b.summary()["session"]["llm_ttft"] == {"count": 0}
+    assert a.summary()["worker"]["tts_ttfb"]["count"] == 2
+
+
+def test_start_stages_are_measured_from_dispatch(monkeypatch) -> None:
+    worker_start = StageHistograms(START_STAGES)
+    now = 1_700_000_010.0
+    monkeypatch.setattr(latency_metrics.time, "time", lambda: now)
+    job = agent_proto.Job(state=agent_proto.JobState(started_at=int((now - 1.5) * 1e9)))
+    session = SessionLatency("test", "room-a", worker_start=worker_start, dispatched_at=dispatched_at(job))
+
+    session.mark("ready")
+    now += 2.0
+    session.on_agent_state(AgentStateChangedEvent(old_state="listening", new_state="thinking"))
+    session.on_agent_state(AgentStateChangedEvent(old_state="thinking", new_state="speaking"))
+    now += 5.0
+    session.on_agent_state(AgentStateChangedEvent(old_state="listening", new_state="speaking"))
+
+    assert session.summary()["start_ms"] == {"ready": 1500.0, "first_audio": 3500.0}
+    assert worker_start.summary()["first_audio"]["count"] == 1
+    # Millisecond timestamps, and none at all
+    assert dispatched_at(agent_proto.Job(state=agent_proto.JobState(started_at=int(now * 1000)))) == now
+    assert dispatched_at(agent_proto.Job()) == now
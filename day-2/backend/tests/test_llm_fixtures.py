@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from livekit.agents import llm, utils
+
+from llm_fixtures import FixtureStore, MissingRecording, RecordReplayLLM, fixture_key
+
+
+class ScriptedLLM(llm.LLM):
+    """Stands in for the hosted LLM while recording."""
+
+    def __init__(self, words: list[str]) -> None:
+        super().__init__()
+        self.words = words
+        self.calls = 0
+
+    def chat(self, *, chat_ctx, tools=None, **kwargs):
+        self.calls += 1
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=kwargs["conn_options"])
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        for word in self._llm.words:
+            await asyncio.sleep(0.02)
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=utils.shortuuid(), delta=llm.ChoiceDelta(role="assistant", content=word))
+            )
+
+
+def chat_ctx(today: str) -> llm.ChatContext:
+    ctx = llm.ChatContext()
+    ctx.add_message(role="system", content=f"You are a barista. Today is {today}.")
+    ctx.add_message(role="user", content="Hello  there")
+    return ctx
+
+
+async def collect(model: llm.LLM, ctx: llm.ChatContext) -> str:
+    async with model.chat(chat_ctx=ctx) as stream:
+        return "".join([chunk.delta.content async for chunk in stream if chunk.delta])
+
+
+async def test_records_then_replays_offline_with_timing(tmp_path) -> None:
+    store = FixtureStore(tmp_path)
+    real = ScriptedLLM(["Hi! ", "What ", "can I get you?"])
+    recorder = RecordReplayLLM(lambda: real, model="m", store=store, mode="auto")
+    assert await collect(recorder, chat_ctx("Friday, October 16, 2026")) == "Hi! What can I get you?"
+    assert real.calls == 1
+
+    def unavailable() -> llm.LLM:
+        raise AssertionError("replay must not build the real LLM")
+
+    # A different day still hits the same recording
+    replayer = RecordReplayLLM(unavailable, model="m", store=store, mode="replay", speed=1.0)
+    start = time.perf_counter()
+    assert await collect(replayer, chat_ctx("Monday, October 19, 2026")) == "Hi! What can I get you?"
+    assert time.perf_counter() - start >= 0.05
+
+    instant = RecordReplayLLM(unavailable, model="m", store=store, mode="replay", speed=0)
+    assert await collect(instant, chat_ctx("Monday, October 19, 2026")) == "Hi! What can I get you?"
+
+
+async def test_replay_mode_fails_on_missing_recording(tmp_path) -> None:
+    replayer = RecordReplayLLM(ScriptedLLM, model="m", store=FixtureStore(tmp_path), mode="replay")
+    try:
+        await collect(replayer, chat_ctx("Friday, October 16, 2026"))
+    except MissingRecording as e:
+        assert "LLM_FIXTURES=record" in str(e)
+    else:
+        raise AssertionError("expected MissingRecording")
+
+
+def test_key_ignores_ids_and_whitespace_but_not_content() -> None:
+    a, _ = fixture_key(chat_ctx("Friday, October 16, 2026"), [], None, "m")
+    b, _ = fixture_key(chat_ctx("Sunday, March 1, 2026"), [], None, "m")
+    c, _ = fixture_key(chat_ctx("Friday, October 16, 2026"), [], None, "other")
+    ctx = chat_ctx("Friday, October 16, 2026")
+    ctx.add_message(role="user", content="A latte please")
+    d, _ = fixture_key(ctx, [], None, "m")
+    assert a == b
+    assert len({a, c, d}) == 3
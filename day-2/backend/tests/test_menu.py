@@ -0,0 +1,61 @@
+import pytest
+
+from menu import MenuCatalog, load_menu
+from order_state import normalize_extras
+
+
+@pytest.fixture
+def menu() -> MenuCatalog:
+    return load_menu()
+
+
+@pytest.mark.parametrize(
+    "text, category, item",
+    [
+        ("Cappuccino", "drinks", "cappuccino"),
+        ("cappucino", "drinks", "cappuccino"),  # phonetic
+        ("expresso", "drinks", "espresso"),
+        ("cappu", "drinks", "cappuccino"),  # prefix
+        ("sinnamon", "extras", "cinnamon"),  # trigram
+        ("oat milk please", "milks", "oat"),
+        ("a large oat milk please", None, "oat"),
+        ("venti", "sizes", "large"),
+    ],
+)
+def test_matches_noisy_transcripts(menu: MenuCatalog, text, category, item) -> None:
+    found = menu.match(text, category)
+    assert found is not None and found.item == item
+
+
+def test_rejects_items_not_on_the_menu(menu: MenuCatalog) -> None:
+    assert menu.match("frappuccino", "drinks") is None
+    assert menu.match("unicorn dust", "extras") is None
+    assert menu.match("latte", "milks") is None
+    assert menu.match("", None) is None
+
+
+def test_canonicalize_order_reports_unknown_items(menu: MenuCatalog) -> None:
+    order = {"drinkType": "Cappucino", "size": "Large", "milk": "oat milk",
+             "extras": ["Carmel", "extra shot", "caramel"], "name": "Sam"}
+    result, problems = menu.canonicalize_order(order)
+    assert problems == []
+    assert result == {"drinkType": "cappuccino", "size": "large", "milk": "oat",
+                      "extras": ["caramel", "extra shot"], "name": "Sam"}
+
+    _, problems = menu.canonicalize_order({**order, "drinkType": "frappuccino", "extras": ["glitter"]})
+    assert len(problems) == 2
+
+
+def test_normalize_extras_uses_the_menu() -> None:
+    assert normalize_extras("carmel and an extra shot, unicorn dust") == ["caramel", "extra shot"]
+    assert normalize_extras("none") == []
+
+
+def test_custom_catalog(tmp_path) -> None:
+    path = tmp_path / "menu.json"
+    path.write_text('{"drinks": {"matcha latte": ["matcha", "green tea latte"]}}')
+    menu = MenuCatalog.load(path)
+    assert menu.match("matcha please", "drinks").item == "matcha latte"
+    assert menu.lexicon("drinks") == {
+        "matcha latte": "matcha latte", "matcha": "matcha latte", "green tea latte": "matcha latte",
+    }
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import aiohttp
+
+from order_queue import OrderQueue, OrderStreamServer
+from order_store import OrderRepository
+
+
+async def _take(subscription, n: int) -> list[dict]:
+    events = []
+    async for event in subscription:
+        events.append(event)
+        if len(events) == n:
+            break
+    return events
+
+
+async def test_subscriber_receives_new_events() -> None:
+    queue = OrderQueue(first_offset=0)
+    queue.publish("placed", {"id": "before"})
+    task = asyncio.create_task(_take(queue.subscribe(), 2))
+    await asyncio.sleep(0)
+    queue.publish("placed", {"id": "a"})
+    queue.publish("status", {"id": "a", "status": "ready"})
+
+    events = await asyncio.wait_for(task, 1)
+    assert [(e["offset"], e["type"]) for e in events] == [(1, "placed"), (2, "status")]
+
+
+async def test_replay_from_offset_then_live() -> None:
+    queue = OrderQueue(first_offset=0)
+    for i in range(3):
+        queue.publish("placed", {"id": i})
+    task = asyncio.create_task(_take(queue.subscribe(offset=1), 3))
+    await asyncio.sleep(0)
+    queue.publish("placed", {"id": 3})
+
+    events = await asyncio.wait_for(task, 1)
+    assert [e["order"]["id"] for e in events] == [1, 2, 3]
+
+
+async def test_replay_past_retention_reports_gap() -> None:
+    queue = OrderQueue(retention=2, first_offset=0)
+    for i in range(5):
+        queue.publish("placed", {"id": i})
+
+    events = await asyncio.wait_for(_take(queue.subscribe(offset=0), 3), 1)
+    assert events[0]["type"] == "gap"
+    assert [e["order"]["id"] for e in events[1:]] == [3, 4]
+
+
+async def test_slow_subscriber_is_disconnected_without_blocking() -> None:
+    queue = OrderQueue(subscriber_buffer=2, first_offset=0)
+    subscription = queue.subscribe()
+    for i in range(5):
+        queue.publish("placed", {"id": i})
+
+    assert subscription.closed
+    assert [e async for e in subscription] == []
+    assert [e["order"]["id"] for e in queue.replay(0)] == [0, 1, 2, 3, 4]
+
+
+async def test_sse_stream_and_status_updates(tmp_path) -> None:
+    repo = OrderRepository(tmp_path)
+    record = repo.add({"drinkType": "latte", "name": "Ana"})
+    queue = OrderQueue(first_offset=0)
+    queue.publish("placed", record)
+    server = OrderStreamServer(queue, repo, port=0)
+    await server.start()
+    base = f"http://127.0.0.1:{server.port}"
+    try:
+        async with aiohttp.ClientSession() as http:
+            async with http.get(f"{base}/orders/stream", headers={"Last-Event-ID": "-1"}) as stream:
+                first = await stream.content.readuntil(b"\n\n")
+                assert first.startswith(b"id: 0\nevent: placed\n")
+
+                async with http.post(f"{base}/orders/{record['id']}/status", json={"status": "ready"}) as resp:
+                    assert resp.status == 200
+
+                second = await asyncio.wait_for(stream.content.readuntil(b"\n\n"), 1)
+                data = json.loads(second.split(b"data: ", 1)[1])
+                assert data["type"] == "status"
+                assert data["order"]["status"] == "ready"
+
+            async with http.get(f"{base}/orders", params={"status": "ready"}) as resp:
+                body = await resp.json()
+                assert [o["id"] for o in body["orders"]] == [record["id"]]
+    finally:
+        await server.aclose()
@@ -0,0 +1,56 @@
+import pytest
+
+from order_state import OrderState, extract_slots, plan_turn
+
+
+@pytest.mark.parametrize(
+    "text, slots",
+    [
+        ("Large oat latte please", {"size": "large", "milk": "oat", "drinkType": "latte"}),
+        ("Can I get a medium flat white with almond milk?", {"size": "medium", "milk": "almond", "drinkType": "flat white"}),
+        ("a cappuccino with caramel and an extra shot", {"drinkType": "cappuccino", "extras": ["caramel", "extra shot"]}),
+        ("small mocha for Jordan", {"size": "small", "drinkType": "mocha", "name": "Jordan"}),
+        ("My name is Priya", {"name": "Priya"}),
+    ],
+)
+def test_extracts_obvious_slots(text: str, slots: dict) -> None:
+    result = extract_slots(text)
+    assert result.slots == slots
+    assert result.understood
+
+
+def test_short_answers_use_the_expected_field() -> None:
+    assert extract_slots("no thanks", expecting="extras").slots == {"extras": []}
+    assert extract_slots("Jordan", expecting="name").slots == {"name": "Jordan"}
+    assert extract_slots("no thanks").slots == {}
+    assert extract_slots("Jordan").slots == {}
+
+
+def test_unhandled_words_defer_to_the_llm() -> None:
+    result = extract_slots("what milks do you have for the latte")
+    assert result.slots == {"drinkType": "latte"}
+    assert not result.understood
+    assert extract_slots("a latte for here").slots == {"drinkType": "latte"}
+
+
+def test_plan_skips_llm_only_when_next_question_is_determined() -> None:
+    state = OrderState()
+    plan = plan_turn(state, "large oat latte")
+    assert plan.reply == "Any extras, like an extra shot or syrup?"
+    assert state.drinkType == ""  # planning never mutates the committed state
+
+    plan = plan_turn(plan.state, "no")
+    assert plan.reply == "And what name should I put on the order?"
+
+    plan = plan_turn(plan.state, "Jordan")
+    assert plan.state.is_complete()
+    assert plan.reply is None  # confirmation and save_order go through the LLM
+    assert plan.state.as_order() == {
+        "drinkType": "latte",
+        "size": "large",
+        "milk": "oat",
+        "extras": [],
+        "name": "Jordan",
+    }
+
+    assert plan_turn(OrderState(), "hi, what's good today?").reply is None
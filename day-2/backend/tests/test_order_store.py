@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from order_store import OrderIdGenerator, OrderRepository, open_repository
+
+
+def _order(name: str = "Jordan", drink: str = "latte") -> dict:
+    return {"drinkType": drink, "size": "large", "milk": "oat", "extras": ["caramel"], "name": name}
+
+
+def test_ids_are_unique_and_monotonic() -> None:
+    gen = OrderIdGenerator()
+    ids = [gen.next()[0] for _ in range(5000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_same_name_same_second_orders_do_not_collide(tmp_path) -> None:
+    repo = OrderRepository(tmp_path)
+    first = repo.add(_order())
+    second = repo.add(_order(drink="mocha"))
+
+    assert first["id"] != second["id"]
+    assert [o["drinkType"] for o in repo.list_orders(name="jordan")] == ["latte", "mocha"]
+
+
+def test_orders_are_sharded_by_creation_date(tmp_path) -> None:
+    repo = OrderRepository(tmp_path)
+    record = repo.add(_order())
+    shard = repo.shard_path(record["created_at"])
+
+    assert shard.relative_to(tmp_path).parts == (
+        record["created_at"][:4],
+        record["created_at"][5:7],
+        record["created_at"][8:10] + ".jsonl",
+    )
+    assert json.loads(shard.read_text().splitlines()[0])["id"] == record["id"]
+
+
+def test_list_orders_filters_by_status_and_since(tmp_path) -> None:
+    repo = OrderRepository(tmp_path)
+    old = repo.prepare(_order("Ana"))
+    old["created_at"] = old["updated_at"] = "2025-01-01T08:00:00.000Z"
+    repo.append([old])
+    new = repo.add(_order("Ben"))
+    repo.set_status(new["id"], "ready")
+
+    assert [o["name"] for o in repo.list_orders()] == ["Ana", "Ben"]
+    assert [o["name"] for o in repo.list_orders(since="2025-06-01")] == ["Ben"]
+    assert [o["name"] for o in repo.list_orders(since=datetime(2025, 6, 1))] == ["Ben"]
+    assert [o["name"] for o in repo.list_orders(status="placed")] == ["Ana"]
+    assert [o["name"] for o in repo.list_orders(status="ready")] == ["Ben"]
+    assert [o["name"] for o in repo.list_orders(limit=1)] == ["Ben"]
+    with pytest.raises(ValueError):
+        repo.set_status(new["id"], "teleported")
+
+
+def test_index_picks_up_other_writers(tmp_path) -> None:
+    writer = OrderRepository(tmp_path)
+    reader = OrderRepository(tmp_path)
+    record = writer.add(_order())
+    writer.set_status(record["id"], "preparing")
+
+    orders = reader.list_orders()
+    assert len(orders) == 1
+    assert orders[0]["status"] == "preparing"
+
+
+def test_legacy_order_files_are_imported_once(tmp_path) -> None:
+    legacy = tmp_path / "order_20251124T161521Z_Tarun.json"
+    legacy.write_text(json.dumps({**_order("Tarun"), "saved_at": "2025-11-24T16:15:21.797881Z"}))
+
+    repo = open_repository(tmp_path)
+    orders = repo.list_orders()
+    assert [o["name"] for o in orders] == ["Tarun"]
+    assert orders[0]["created_at"] == "2025-11-24T16:15:21.797Z"
+    assert (tmp_path / "2025" / "11" / "24.jsonl").exists()
+    assert not legacy.exists()
+    assert len(open_repository(tmp_path).list_orders()) == 1
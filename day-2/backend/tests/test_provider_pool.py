@@ -0,0 +1,57 @@
+import aiohttp
+from aiohttp import web
+
+import provider_pool
+
+
+async def _server() -> tuple[web.AppRunner, str, set[int]]:
+    """A local server that records the connections its requests arrive on."""
+    connections: set[int] = set()
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        connections.add(id(request.transport))
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.close()
+            return ws
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}", connections
+
+
+async def test_http_session_is_shared_on_a_loop() -> None:
+    session = provider_pool.http_session()
+    assert provider_pool.http_session() is session
+    await provider_pool.aclose()
+    assert session.closed
+    assert provider_pool.http_session() is not session
+    await provider_pool.aclose()
+
+
+async def test_websocket_reuses_the_preconnected_connection() -> None:
+    runner, url, connections = await _server()
+    try:
+        session = provider_pool.http_session()
+        timings = await provider_pool.preconnect([url, "http://127.0.0.1:9/unreachable"], timeout=1.0)
+        # The unreachable host is logged and left out
+        assert list(timings) == [url]
+        assert len(connections) == 1
+
+        ws = await session.ws_connect(f"{url}/v1/listen")
+        await ws.close()
+        assert len(connections) == 1
+    finally:
+        await provider_pool.aclose()
+        await runner.cleanup()
+
+
+async def test_warm_llm_skips_llms_without_a_client() -> None:
+    assert await provider_pool.warm_llm(object()) is None
@@ -0,0 +1,128 @@
+import gzip
+import json
+import threading
+from types import SimpleNamespace
+
+from livekit.agents import llm
+
+import session_journal
+from session_journal import SessionJournal, read_index, read_segments
+
+
+def _journal(tmp_path, **kwargs) -> SessionJournal:
+    return SessionJournal(tmp_path, agent="barista", room="room-1", job_id="job-1", **kwargs)
+
+
+async def test_events_are_written_in_gzip_segments(tmp_path) -> None:
+    journal = _journal(tmp_path, segment_events=4)
+    for i in range(9):
+        journal.record("user", text=f"line {i}")
+    await journal.aclose()
+
+    segments = list(read_segments(journal.path))
+    assert [len(events) for events, _ in segments] == [4, 4, 2]
+    assert segments[-1][1] == journal.path.stat().st_size
+    events = [event for batch, _ in segments for event in batch]
+    assert events[0]["kind"] == "start"
+    assert [e["text"] for e in events[1:]] == [f"line {i}" for i in range(9)]
+    # The whole file is also plain (multi-member) gzip
+    assert len(gzip.decompress(journal.path.read_bytes()).splitlines()) == 10
+
+    sessions, _ = read_index(tmp_path)
+    entry = sessions[journal.session_id]
+    assert entry["agent"] == "barista"
+    assert entry["events"] == 10 and entry["dropped"] == 0
+
+
+async def test_segments_are_written_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    threads = set()
+    append = session_journal._append
+
+    def recording_append(path, data):
+        threads.add(threading.get_ident())
+        append(path, data)
+
+    monkeypatch.setattr(session_journal, "_append", recording_append)
+    journal = _journal(tmp_path)
+    journal.record("agent", text="Hi!", interrupted=False)
+    await journal.aclose()
+    assert threads and threading.get_ident() not in threads
+
+
+async def test_pending_events_are_bounded(tmp_path) -> None:
+    # No loop turn between records, so nothing is written until the flush
+    journal = _journal(tmp_path, segment_events=1000, max_pending=5)
+    for i in range(20):
+        journal.record("metrics", n=i)
+    await journal.aclose()
+
+    events = [e for batch, _ in read_segments(journal.path) for e in batch]
+    assert len(events) == 5
+    assert journal.dropped == 16
+    assert read_index(tmp_path)[0][journal.session_id]["dropped"] == 16
+
+
+async def test_a_segment_being_written_is_not_read(tmp_path) -> None:
+    journal = _journal(tmp_path, segment_events=2)
+    for i in range(3):
+        journal.record("user", text=str(i))
+    await journal.aclose()
+    data = journal.path.read_bytes()
+    complete = next(read_segments(journal.path))[1]
+    journal.path.write_bytes(data[: len(data) - 5])
+
+    segments = list(read_segments(journal.path))
+    assert [offset for _, offset in segments] == [complete]
+    # Reading resumes from an offset once the segment is complete
+    journal.path.write_bytes(data)
+    assert [len(events) for events, _ in read_segments(journal.path, complete)] == [2]
+
+
+async def test_attach_records_conversation_and_tools(tmp_path) -> None:
+    handlers = {}
+    session = SimpleNamespace(on=lambda event, callback: handlers.setdefault(event, callback))
+    journal = _journal(tmp_path)
+    journal.attach(session)
+
+    handlers["conversation_item_added"](
+        SimpleNamespace(item=llm.ChatMessage(role="user", content=["A large latte"]))
+    )
+    handlers["conversation_item_added"](
+        SimpleNamespace(item=llm.ChatMessage(role="assistant", content=["Sure!"], interrupted=True))
+    )
+    call = llm.FunctionCall(call_id="c1", name="add_item", arguments='{"drink": "latte"}')
+    output = llm.FunctionCallOutput(call_id="c1", name="add_item", output="added", is_error=False)
+    handlers["function_tools_executed"](
+        SimpleNamespace(function_calls=[call], function_call_outputs=[output])
+    )
+    await journal.aclose()
+
+    events = [e for batch, _ in read_segments(journal.path) for e in batch]
+    assert [(e["kind"], e.get("text")) for e in events[1:3]] == [
+        ("user", "A large latte"),
+        ("agent", "Sure!"),
+    ]
+    assert events[2]["interrupted"] is True
+    assert events[3]["name"] == "add_item" and events[3]["output"] == "added"
+
+
+async def test_cli_filters_and_tails_across_sessions(tmp_path, capsys) -> None:
+    for agent, room in (("barista", "cafe-1"), ("wellness", "checkin-1"), ("barista", "cafe-2")):
+        journal = SessionJournal(tmp_path, agent=agent, room=room)
+        journal.record("user", text=f"hello from {room}")
+        journal.record("metrics", type="llm_metrics", ttft=0.3)
+        journal.record("agent", text="Latte coming up" if agent == "barista" else "How are you?")
+        await journal.aclose()
+
+    session_journal.main(["--dir", str(tmp_path), "sessions", "--agent", "barista"])
+    rows = capsys.readouterr().out.splitlines()
+    assert len(rows) == 2 and all("barista" in row for row in rows)
+
+    argv = ["--dir", str(tmp_path), "events", "--kind", "user,agent", "--grep", "LATTE", "--json"]
+    session_journal.main(argv)
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [e["text"] for e in events] == ["Latte coming up", "Latte coming up"]
+
+    session_journal.main(["--dir", str(tmp_path), "events", "--kind", "user", "--tail", "1"])
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1 and out[0].endswith("user: hello from cafe-2")
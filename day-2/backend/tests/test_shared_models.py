@@ -0,0 +1,12 @@
+import shared_models
+
+
+def test_vad_is_loaded_once_per_process() -> None:
+    assert shared_models.vad() is shared_models.vad()
+    assert shared_models.preloaded()
+
+
+def test_memory_usage_reports_megabytes() -> None:
+    usage = shared_models.memory_usage()
+    assert usage["rss_mb"] > 0
+    assert usage.get("uss_mb", 0) <= usage["rss_mb"]
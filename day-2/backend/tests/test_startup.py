@@ -0,0 +1,30 @@
+import sys
+
+import agent
+from startup import STEPS, parse_importtime, startup_step
+
+
+def test_agent_import_does_not_load_provider_plugins() -> None:
+    assert agent.PLUGINS
+    # Only the worker's main process (or the job using them) imports these
+    assert "livekit.plugins.noise_cancellation" not in sys.modules
+    assert "noise_cancellation" not in agent.PLUGINS
+
+
+def test_parse_importtime_keeps_top_level_modules() -> None:
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     _io",
+            "import time:       300 |        420 |   io",
+            "import time:      1000 |       2500 | livekit.agents",
+            "import time:        80 |         80 | dotenv",
+        ]
+    )
+    assert parse_importtime(stderr) == [("livekit.agents", 0.0025), ("dotenv", 0.00008)]
+
+
+def test_startup_step_records_duration() -> None:
+    with startup_step("test_step"):
+        pass
+    assert 0 <= STEPS.pop("test_step") < 1
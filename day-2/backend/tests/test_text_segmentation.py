@@ -0,0 +1,83 @@
+import asyncio
+
+from livekit.agents import tokenize
+
+from text_segmentation import AdaptiveSentenceTokenizer, tts_tokenizer
+
+
+async def _segments(tokenizer: AdaptiveSentenceTokenizer, chunks: list[str], pause: float = 0.0) -> list[str]:
+    """Stream `chunks` as an LLM would, `pause` seconds apart."""
+    stream = tokenizer.stream()
+    for chunk in chunks:
+        stream.push_text(chunk)
+        await asyncio.sleep(pause)
+    stream.end_input()
+    segments = [ev.token async for ev in stream]
+    await stream.aclose()
+    return segments
+
+
+def _words(text: str) -> list[str]:
+    return [word + " " for word in text.split()]
+
+
+async def test_first_clause_is_sent_before_the_sentence_ends() -> None:
+    text = "Great choice today, one large oat latte coming up. What name should I put on it?"
+    segments = await _segments(AdaptiveSentenceTokenizer(deadline=0), _words(text))
+    assert segments == [
+        "Great choice today,",
+        "one large oat latte coming up.",
+        "What name should I put on it?",
+    ]
+
+
+async def test_short_openers_and_titles_do_not_cut() -> None:
+    text = "Sure, Dr. Patel is here. Anything else?"
+    segments = await _segments(AdaptiveSentenceTokenizer(deadline=0), _words(text))
+    assert segments[0] == "Sure, Dr. Patel is here."
+
+
+async def test_long_first_clause_is_cut_at_max_words_on_a_phrase_boundary() -> None:
+    text = "I would recommend our seasonal maple latte with a shot of vanilla syrup today."
+    segments = await _segments(AdaptiveSentenceTokenizer(max_words=8, deadline=0), _words(text))
+    # Word 8 is "with", which cannot end a phrase
+    assert segments[0] == "I would recommend our seasonal maple latte"
+    assert " ".join(segments) == text
+
+
+async def test_deadline_cuts_a_slow_stream() -> None:
+    tokenizer = AdaptiveSentenceTokenizer(deadline=0.05)
+    stream = tokenizer.stream()
+    for word in _words("Let me check the menu"):
+        stream.push_text(word)
+    first = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+    assert first.token == "Let me check the menu"
+    stream.push_text("for you.")
+    stream.end_input()
+    assert [ev.token async for ev in stream] == ["for you."]
+    await stream.aclose()
+
+
+async def test_deadline_prefers_a_short_clause_to_a_cut_phrase() -> None:
+    tokenizer = AdaptiveSentenceTokenizer(deadline=0.05)
+    stream = tokenizer.stream()
+    stream.push_text("Great choice, a large ")
+    first = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+    assert first.token == "Great choice,"
+    stream.push_text("oat latte coming up.")
+    stream.end_input()
+    assert [ev.token async for ev in stream] == ["a large oat latte coming up."]
+    await stream.aclose()
+
+
+def test_tokenize_splits_like_a_fast_stream(monkeypatch) -> None:
+    tokenizer = AdaptiveSentenceTokenizer()
+    assert tokenizer.tokenize("Great choice today, one large oat latte coming up. Anything else?") == [
+        "Great choice today,",
+        "one large oat latte coming up.",
+        "Anything else?",
+    ]
+    assert tokenizer.tokenize("Hi!") == ["Hi!"]
+
+    monkeypatch.setenv("TTS_FIRST_CHUNK", "0")
+    assert isinstance(tts_tokenizer(), tokenize.basic.SentenceTokenizer)
@@ -0,0 +1,100 @@
+from livekit.agents import utils
+from livekit.agents.tts import TTS, AudioEmitter, ChunkedStream, TTSCapabilities
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+from tts_cache import AudioCache, CachedTTS, cache_key
+
+SAMPLE_RATE = 16000
+
+
+class StubTTS(TTS):
+    """Offline TTS: 10 ms of PCM per character, counting every request."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            capabilities=TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.requests: list[str] = []
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> ChunkedStream:
+        self.requests.append(text)
+        return StubStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class StubStream(ChunkedStream):
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        sample = (sum(map(ord, self._input_text)) % 256).to_bytes(2, "little")
+        output_emitter.push(sample * (SAMPLE_RATE // 100) * len(self._input_text))
+        output_emitter.flush()
+
+
+def make_tts(tmp_path, **cache_kwargs) -> tuple[CachedTTS, StubTTS]:
+    stub = StubTTS()
+    cache = AudioCache(tmp_path / "tts", **cache_kwargs)
+    return CachedTTS(tts=stub, cache=cache, voice="en-US-matthew", style="Conversation"), stub
+
+
+async def pcm(stream) -> bytes:
+    async with stream:
+        return b"".join([ev.frame.data.tobytes() async for ev in stream])
+
+
+async def test_synthesize_serves_repeats_from_cache(tmp_path) -> None:
+    cached, stub = make_tts(tmp_path)
+    first = await pcm(cached.synthesize("What size would you like?"))
+    again = await pcm(cached.synthesize("  what size would you  LIKE?"))
+
+    assert first == again and len(first) > 0
+    assert stub.requests == ["What size would you like?"]
+    assert cached.stats.hits == 1 and cached.stats.misses == 1
+
+
+async def test_stream_caches_per_sentence(tmp_path) -> None:
+    cached, stub = make_tts(tmp_path)
+    await cached.warm(["Any extras, like an extra shot or syrup?"])
+    assert len(stub.requests) == 1
+
+    stream = cached.stream()
+    for token in ["Great choice. ", "Any extras, like ", "an extra shot or syrup?"]:
+        stream.push_text(token)
+    stream.end_input()
+    audio = await pcm(stream)
+
+    assert stub.requests[1:] == ["Great choice."]
+    assert cached.stats.hits == 1
+    assert len(audio) >= 2 * (SAMPLE_RATE // 100) * len("Great choice.Any extras, like an extra shot or syrup?")
+
+
+async def test_disk_tier_survives_restart_and_is_size_bounded(tmp_path) -> None:
+    cached, _ = make_tts(tmp_path)
+    await cached.warm(["Hello there.", "What would you like to drink?"])
+
+    # A new process starts with an empty memory tier but finds the files
+    restarted, stub = make_tts(tmp_path)
+    assert await pcm(restarted.synthesize("Hello there.")) == await pcm(cached.synthesize("Hello there."))
+    assert stub.requests == []
+
+    cache = AudioCache(tmp_path / "small", max_disk_bytes=3000, max_memory_bytes=1000)
+    for i in range(5):
+        cache.put(cache_key("v", None, SAMPLE_RATE, f"line {i}"), bytes(1000))
+    assert cache.disk_bytes <= 3000 and cache.memory_bytes <= 1000
+    assert len(list((tmp_path / "small").glob("*.pcm"))) == 3
+    assert cache.get(cache_key("v", None, SAMPLE_RATE, "line 0")) is None
+    assert cache.get(cache_key("v", None, SAMPLE_RATE, "line 4")) == bytes(1000)
+
+
+def test_key_depends_on_voice_and_style() -> None:
+    assert cache_key("a", "x", 24000, "Hi") == cache_key("a", "x", 24000, " hi ")
+    assert cache_key("a", "x", 24000, "Hi") != cache_key("b", "x", 24000, "Hi")
+    assert cache_key("a", "x", 24000, "Hi") != cache_key("a", "y", 24000, "Hi")
+    assert cache_key("a", "x", 24000, "Hi") != cache_key("a", "x", 24000, "Hi?")
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from turn_batching import MicroBatcher, TurnDetectionService
+
+
+class FakeRunner:
+    INFERENCE_METHOD = "lk_end_of_utterance_multilingual"
+
+    def __init__(self, cost: float = 0.01) -> None:
+        self.cost = cost
+        self.batches: list[int] = []
+
+    def initialize(self) -> None:
+        pass
+
+    def run_batch(self, requests: list[bytes]) -> list[bytes]:
+        self.batches.append(len(requests))
+        time.sleep(self.cost)
+        return [
+            json.dumps({"eou_probability": len(json.loads(r)["chat_ctx"]) / 10}).encode()
+            for r in requests
+        ]
+
+
+def eou_request(turns: int) -> bytes:
+    return json.dumps({"chat_ctx": [{"role": "user", "content": "hi"}] * turns}).encode()
+
+
+async def test_concurrent_sessions_share_batches_and_get_their_own_results() -> None:
+    runner = FakeRunner()
+    svc = TurnDetectionService(runner, max_wait=0.005)
+    results = await asyncio.gather(
+        *(svc.do_inference(runner.INFERENCE_METHOD, eou_request(n)) for n in range(1, 21))
+    )
+    svc.batcher.close()
+    assert [json.loads(r)["eou_probability"] for r in results] == [n / 10 for n in range(1, 21)]
+    assert sum(runner.batches) == 20
+    assert len(runner.batches) < 20
+
+
+async def test_lone_session_is_not_delayed() -> None:
+    runner = FakeRunner(cost=0)
+    svc = TurnDetectionService(runner, max_wait=0.5)
+    start = time.perf_counter()
+    for _ in range(3):
+        await svc.do_inference(runner.INFERENCE_METHOD, eou_request(1))
+    svc.batcher.close()
+    assert time.perf_counter() - start < 0.5
+    assert runner.batches == [1, 1, 1]
+
+
+async def test_errors_reach_every_request_in_the_batch() -> None:
+    def fail(items: list[int]) -> list[int]:
+        raise RuntimeError("onnx failed")
+
+    batcher = MicroBatcher(fail)
+    with pytest.raises(RuntimeError):
+        await batcher.submit(1)
+    batcher.close()
+
+
+async def test_unknown_method_is_rejected() -> None:
+    svc = TurnDetectionService(FakeRunner())
+    with pytest.raises(ValueError):
+        await svc.do_inference("lk_end_of_utterance_en", eou_request(1))
+
+
+def test_requests_from_several_event_loops() -> None:
+    batcher = MicroBatcher(lambda items: [i * 2 for i in items], max_wait=0.01)
+    results: list[int] = []
+
+    def session(i: int) -> None:
+        results.append(asyncio.run(batcher.submit(i)))
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    assert sorted(results) == [i * 2 for i in range(8)]
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from write_behind import WriteBehindWriter
+
+
+class RecordingSink:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.batches: list[tuple[list, bool]] = []
+        self.threads: set[int] = set()
+
+    def __call__(self, records: list, sync: bool) -> None:
+        time.sleep(self.delay)
+        self.threads.add(threading.get_ident())
+        self.batches.append((list(records), sync))
+
+    @property
+    def records(self) -> list:
+        return [r for batch, _ in self.batches for r in batch]
+
+
+async def test_records_are_written_off_loop_and_flushed_on_close() -> None:
+    sink = RecordingSink()
+    writer = WriteBehindWriter(sink)
+    for i in range(10):
+        await writer.submit(i)
+    await writer.aclose()
+
+    assert sink.records == list(range(10))
+    assert threading.get_ident() not in sink.threads
+    assert writer.written == 10
+
+
+async def test_submit_does_not_wait_for_slow_sink() -> None:
+    sink = RecordingSink(delay=0.2)
+    writer = WriteBehindWriter(sink)
+    start = time.perf_counter()
+    await writer.submit("order")
+    assert time.perf_counter() - start < 0.05
+    await writer.aclose()
+    assert sink.records == ["order"]
+
+
+async def test_batches_pending_records() -> None:
+    sink = RecordingSink(delay=0.05)
+    writer = WriteBehindWriter(sink, max_batch=8)
+    for i in range(17):
+        await writer.submit(i)
+    await writer.flush()
+
+    assert sink.records == list(range(17))
+    assert max(len(batch) for batch, _ in sink.batches) == 8
+    await writer.aclose()
+
+
+async def test_fsync_policies() -> None:
+    always = RecordingSink()
+    writer = WriteBehindWriter(always, fsync="always")
+    for i in range(3):
+        await writer.submit(i)
+    await writer.aclose()
+    assert always.batches == [([0], True), ([1], True), ([2], True)]
+
+    never = RecordingSink()
+    writer = WriteBehindWriter(never, fsync="never")
+    await writer.submit(0)
+    await writer.aclose()
+    assert never.batches == [([0], False)]
+
+    with pytest.raises(ValueError):
+        WriteBehindWriter(never, fsync="sometimes")
+
+
+async def test_sink_failure_is_logged_and_writer_keeps_going() -> None:
+    calls = []
+
+    def flaky(records: list, sync: bool) -> None:
+        calls.append(records)
+        if len(calls) == 1:
+            raise OSError("disk full")
+
+    writer = WriteBehindWriter(flaky)
+    await writer.submit("lost")
+    await writer.flush()
+    await writer.submit("kept")
+    await writer.aclose()
+
+    assert writer.failed == 1
+    assert writer.written == 1
+    with pytest.raises(RuntimeError):
+        await writer.submit("late")
+
+
+async def test_submit_applies_backpressure_when_queue_is_full() -> None:
+    sink = RecordingSink(delay=0.05)
+    writer = WriteBehindWriter(sink, max_queue=1, max_batch=1)
+    await writer.submit(0)
+    await asyncio.sleep(0.01)  # let the writer pick up the first record
+    await writer.submit(1)
+    start = time.perf_counter()
+    await writer.submit(2)
+    assert time.perf_counter() - start > 0.02
+    await writer.aclose()
+    assert sink.records == [0, 1, 2]
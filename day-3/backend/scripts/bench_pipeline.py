@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark of the wellness agent with stub providers.
+
+Runs `--sessions` concurrent `AgentSession`s of the day-3 `Assistant`
+through a scripted check-in (including the `save_wellness_log` tool call)
+using the stub STT/LLM/TTS in `pipeline_bench.py`, and prints one JSON
+object with per-turn latency, framework overhead (latency minus stub
+provider time), event-loop lag and memory per session. Check-ins go to a
+temporary directory.
+
+Usage: python scripts/bench_pipeline.py [--sessions 10] [--llm-ttft 0.4] [--output result.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline_bench import (  # noqa: E402
+    ToolCall,
+    add_profile_arguments,
+    profile_from_args,
+    run_benchmark,
+)
+
+CHECK_IN = {
+    "mood": "tired but okay",
+    "energy": "low",
+    "objectives": ["finish the report", "go for a walk"],
+    "summary": "Tired after a short night; two small goals for today.",
+}
+
+CONVERSATION = [
+    {"user": "Hey, I'm here for my check-in.", "llm": ["Welcome back! How are you feeling today?"]},
+    {"user": "Pretty tired, I didn't sleep well.", "llm": ["I'm sorry to hear that. How is your energy?"]},
+    {"user": "Low, honestly.", "llm": ["That makes sense. What would you like to get done today?"]},
+    {"user": "Finish the report and go for a walk.", "llm": ["Two good goals. A short walk may help your energy. Shall I save today's check-in?"]},
+    {"user": "Yes please.", "llm": [ToolCall("save_wellness_log", CHECK_IN), "Saved. Take it easy today!"]},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    from agent import Assistant
+    from history_context import WellnessHistory
+    from wellness_store import open_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WellnessHistory(open_store(tmp))
+
+        def make_agent():
+            return Assistant(history=history)
+
+        result = asyncio.run(
+            run_benchmark("day-3 wellness", make_agent, CONVERSATION, profile_from_args(args), args.sessions)
+        )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
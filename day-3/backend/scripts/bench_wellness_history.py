@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark `Assistant` construction with many users and a long history.
+
+Builds the same history (`--users` users, `--entries` check-ins in total)
+in two layouts and times constructing the wellness `Assistant` for a user,
+which is what every job does before the call starts:
+
+- single journal, new store per job: what the entrypoint did before; the
+  first read indexes the whole journal
+- single journal, shared store: the index is already built
+- per-user shards, cold cache: reads the user's digest and shard
+- per-user shards, warm cache: the history was built in prewarm; no I/O
+
+Digests are built before timing in every layout, as they would be after
+the first session of each user.
+
+Usage: python scripts/bench_wellness_history.py [--users 10000] [--entries 1000000] [--samples 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agent import Assistant  # noqa: E402
+from history_context import WellnessHistory  # noqa: E402
+from wellness_store import JsonlWellnessStore, ShardedWellnessStore  # noqa: E402
+
+MOODS = ["great", "ok", "tired", "anxious", "calm"]
+ENERGY = ["low", "medium", "high"]
+
+
+def make_entry(i, users):
+    return {
+        "user": f"user-{i % users:05d}",
+        "date": f"2025-{1 + i // users // 28 % 12:02d}-{1 + i // users % 28:02d}T09:00:00Z",
+        "mood": MOODS[i % len(MOODS)],
+        "energy": ENERGY[i % len(ENERGY)],
+        "objectives": ["go for a walk", "finish the report"],
+        "summary": "Feeling fine, planning a walk and some focused work.",
+    }
+
+
+def time_construction(make_history, users, samples):
+    times = []
+    for user in users[:samples]:
+        history = make_history()
+        start = time.perf_counter()
+        Assistant(history=history, user=user)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "samples": len(times),
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[max(0, int(len(times) * 0.95) - 1)], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--cold-journal-samples", type=int, default=3,
+                        help="samples for the full-journal scan (slow)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sample = rng.sample([f"user-{u:05d}" for u in range(args.users)], min(args.samples, args.users))
+    results = {"users": args.users, "entries": args.entries}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        start = time.perf_counter()
+        journal_path = tmp / "single" / "wellness_log.jsonl"
+        journal_path.parent.mkdir()
+        with open(journal_path, "w", encoding="utf-8") as f:
+            for i in range(args.entries):
+                f.write(json.dumps(make_entry(i, args.users)) + "\n")
+        shards = ShardedWellnessStore(tmp / "sharded" / "wellness_users")
+        shards.import_entries(make_entry(i, args.users) for i in range(args.entries))
+        results["setup_s"] = round(time.perf_counter() - start, 1)
+
+        journal = JsonlWellnessStore(journal_path)
+        shared = WellnessHistory(journal)
+        for user in sample:
+            shared.digest(user)
+            WellnessHistory(shards).digest(user)
+
+        results["single journal, new store per job"] = time_construction(
+            lambda: WellnessHistory(JsonlWellnessStore(journal_path)), sample, args.cold_journal_samples
+        )
+        results["single journal, shared store"] = time_construction(
+            lambda: WellnessHistory(journal, cache_size=0), sample, args.samples
+        )
+        results["shards, cold cache"] = time_construction(
+            lambda: WellnessHistory(shards, cache_size=0), sample, args.samples
+        )
+        warm = WellnessHistory(shards)
+        start = time.perf_counter()
+        shards.users(limit=256)
+        results["list_recent_users_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        start = time.perf_counter()
+        warm.warm(sample)
+        results["prewarm_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results["shards, warm cache"] = time_construction(lambda: warm, sample, args.samples)
+        results["warm cache hits/misses"] = f"{warm.hits}/{warm.misses}"
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark wellness check-in save latency as the log grows.
+
+Compares the append-only journal (`wellness_store.JsonlWellnessStore`) with
+the old read-modify-write of a single JSON array. The journal's per-save cost
+should stay flat from 10 to 100k entries; the legacy cost grows with history.
+
+Usage: python scripts/bench_wellness_store.py [--saves 200] [--legacy-max 10000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from wellness_store import JsonlWellnessStore  # noqa: E402
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+
+def make_entry(i):
+    return {
+        "user": f"user{i % 50}",
+        "date": f"2025-11-{1 + i % 28:02d}T09:00:00Z",
+        "mood": "good",
+        "energy": "medium",
+        "objectives": ["go for a walk", "finish the report"],
+        "summary": "Feeling good, planning a walk and some focused work.",
+    }
+
+
+def prefill_journal(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps(make_entry(i)) + "\n")
+
+
+def legacy_save(path, entry):
+    entries = []
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    entries.append(entry)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+
+
+def time_saves(save, saves):
+    samples = []
+    for i in range(saves):
+        start = time.perf_counter()
+        save(make_entry(i))
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} | {'journal p50 ms':>14} {'p95 ms':>8} | {'legacy p50 ms':>13} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            journal = Path(tmp) / f"journal_{n}.jsonl"
+            prefill_journal(journal, n)
+            store = JsonlWellnessStore(journal)
+            len(store)  # build the index before timing, as the agent does at startup
+            j50, j95 = time_saves(store.append, args.saves)
+
+            legacy = "-"
+            if n <= args.legacy_max:
+                legacy_path = Path(tmp) / f"legacy_{n}.json"
+                with open(legacy_path, "w", encoding="utf-8") as f:
+                    json.dump([make_entry(i) for i in range(n)], f)
+                l50, l95 = time_saves(lambda e, p=legacy_path: legacy_save(p, e), min(args.saves, 50))
+                legacy = f"{l50:>13.3f} {l95:>8.3f}"
+            print(f"{n:>8} | {j50:>14.3f} {j95:>8.3f} | {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""Offline voice pipeline benchmark: stub STT/LLM/TTS plugins and a driver.
+
+The stubs stand in for deepgram/google/murf with configurable latency and
+streaming profiles (`Profile`), so a real `AgentSession` can run an
+`Assistant` end to end with no network:
+
+- `StubSTT` streams: it consumes the session's audio input, "hears" the next
+  scripted utterance after `speech_seconds` of audio, then emits the final
+  transcript and end of speech `stt_delay` later (turn_detection="stt").
+- `StubLLM` answers after `llm_ttft`, streaming `llm_chunk_words` words every
+  `llm_chunk_interval`. Replies come from the conversation script and can be
+  tool calls, so tool turns are exercised too.
+- `StubTTS` returns silence after `tts_ttfb`; the session wraps it in a
+  `StreamAdapter`, as it would any non-streaming TTS.
+
+Each turn is timed from the end of the user's (simulated) speech to the
+first agent audio frame. The time the stubs spent on that critical path is
+recorded as they run. What remains, less the session's endpointing delay
+(a deliberate wait), is framework and agent overhead: turn handling,
+`on_user_turn_completed`, `llm_node`, tools, sentence tokenization and
+audio plumbing.
+
+Used by each day's `scripts/bench_pipeline.py`; keep the copies in sync.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any, Union
+
+import psutil
+from livekit import rtc
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    Agent,
+    AgentSession,
+    APIConnectOptions,
+    llm,
+    stt,
+    tts,
+    utils,
+)
+from livekit.agents.voice import io
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+
+
+@dataclass
+class Profile:
+    """Latency and streaming behaviour of the stub providers (seconds)."""
+
+    speech_seconds: float = 1.0  # how long the user speaks per turn
+    stt_delay: float = 0.15  # end of speech -> final transcript
+    llm_ttft: float = 0.40
+    llm_chunk_words: int = 3
+    llm_chunk_interval: float = 0.02
+    tts_ttfb: float = 0.20
+    tts_seconds_per_word: float = 0.3  # length of the synthesized audio
+    endpointing_delay: float = 0.5  # AgentSession min_endpointing_delay
+
+
+@dataclass
+class Turn:
+    user: str
+    speech_end: float = 0.0
+    first_audio: float | None = None
+    provider: dict[str, float] = field(default_factory=dict)
+    llm_calls: int = 0
+
+    @property
+    def latency(self) -> float | None:
+        return None if self.first_audio is None else self.first_audio - self.speech_end
+
+    def overhead(self, endpointing_delay: float) -> float | None:
+        """Latency not spent in the stubs or in the deliberate endpointing wait."""
+        latency = self.latency
+        if latency is None:
+            return None
+        return latency - sum(self.provider.values()) - endpointing_delay
+
+
+class Clock:
+    """Per-session turn timeline shared by the stubs and the audio sink."""
+
+    def __init__(self) -> None:
+        self.turns: list[Turn] = []
+
+    @property
+    def current(self) -> Turn | None:
+        return self.turns[-1] if self.turns else None
+
+    def on_critical_path(self) -> bool:
+        turn = self.current
+        return turn is not None and turn.speech_end > 0 and turn.first_audio is None
+
+    def add_provider_time(self, stage: str, seconds: float) -> None:
+        if self.on_critical_path():
+            turn = self.current
+            turn.provider[stage] = turn.provider.get(stage, 0.0) + seconds
+
+
+# -- STT ---------------------------------------------------------------------
+
+
+class StubSTT(stt.STT):
+    def __init__(self, profile: Profile, clock: Clock) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.profile = profile
+        self.clock = clock
+        self.utterances: asyncio.Queue[str] = asyncio.Queue()
+
+    def say(self, text: str) -> None:
+        self.utterances.put_nowait(text)
+
+    async def _recognize_impl(self, buffer, *, language=None, conn_options=None) -> stt.SpeechEvent:
+        raise NotImplementedError("StubSTT only streams")
+
+    def stream(self, *, language=None, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return StubSpeechStream(stt=self, conn_options=conn_options)
+
+
+class StubSpeechStream(stt.RecognizeStream):
+    def __init__(self, *, stt: StubSTT, conn_options: APIConnectOptions) -> None:
+        super().__init__(stt=stt, conn_options=conn_options)
+        self._stub = stt
+
+    async def _run(self) -> None:
+        profile, clock = self._stub.profile, self._stub.clock
+        text: str | None = None
+        heard = 0.0
+        pending: set[asyncio.Task] = set()
+
+        async def finish(text: str) -> None:
+            start = time.perf_counter()
+            await asyncio.sleep(profile.stt_delay)
+            clock.add_provider_time("stt", time.perf_counter() - start)
+            data = stt.SpeechData(language="en", text=text, confidence=1.0)
+            self._event_ch.send_nowait(
+                stt.SpeechEvent(type=stt.SpeechEventType.FINAL_TRANSCRIPT, alternatives=[data])
+            )
+            self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH))
+
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                continue
+            if text is None:
+                if self._stub.utterances.empty():
+                    continue
+                text = self._stub.utterances.get_nowait()
+                heard = 0.0
+                clock.turns.append(Turn(user=text))
+                self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH))
+            heard += frame.duration
+            if heard >= profile.speech_seconds:
+                clock.current.speech_end = time.perf_counter()
+                task = asyncio.create_task(finish(text))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                text = None
+        await asyncio.gather(*pending)
+
+
+# -- LLM ---------------------------------------------------------------------
+
+
+@dataclass
+class ToolCall:
+    name: str
+    arguments: dict
+
+
+Reply = Union[str, ToolCall]
+
+
+class ScriptedReplies:
+    """LLM replies keyed by the user message they answer.
+
+    Each user turn of the conversation lists the replies the LLM gives, in
+    order (a tool call is followed by another LLM call for the answer).
+    Turns the agent answers without the LLM simply leave theirs unused.
+    """
+
+    def __init__(self, conversation: list[dict], default: str = "Okay, got it.") -> None:
+        self._replies = {turn["user"]: list(turn.get("llm", [])) for turn in conversation}
+        self._default = default
+
+    def __call__(self, chat_ctx: llm.ChatContext) -> Reply:
+        for item in reversed(chat_ctx.items):
+            if isinstance(item, llm.ChatMessage) and item.role == "user":
+                queue = self._replies.get(item.text_content or "")
+                return queue.pop(0) if queue else self._default
+        return self._default
+
+
+class StubLLM(llm.LLM):
+    def __init__(self, profile: Profile, clock: Clock, replies: Callable[[llm.ChatContext], Reply]) -> None:
+        super().__init__()
+        self.profile = profile
+        self.clock = clock
+        self.replies = replies
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> llm.LLMStream:
+        return StubLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class StubLLMStream(llm.LLMStream):
+    async def _run(self) -> None:
+        stub: StubLLM = self._llm
+        profile, clock = stub.profile, stub.clock
+        critical = clock.on_critical_path()
+        if critical:
+            clock.current.llm_calls += 1
+        reply = stub.replies(self._chat_ctx)
+        request_id = utils.shortuuid()
+        start = time.perf_counter()
+        await asyncio.sleep(profile.llm_ttft)
+
+        if isinstance(reply, ToolCall):
+            call = llm.FunctionToolCall(
+                name=reply.name, arguments=json.dumps(reply.arguments), call_id=utils.shortuuid()
+            )
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", tool_calls=[call]))
+            )
+            if critical:
+                clock.add_provider_time("llm", time.perf_counter() - start)
+            return
+
+        words = reply.split()
+        sentence_done = False
+        for i in range(0, len(words), profile.llm_chunk_words):
+            if i:
+                await asyncio.sleep(profile.llm_chunk_interval)
+            chunk = " ".join(words[i : i + profile.llm_chunk_words]) + " "
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=chunk))
+            )
+            # The first sentence is what the TTS is waiting for
+            if critical and not sentence_done and any(p in chunk for p in ".?!"):
+                sentence_done = True
+                clock.add_provider_time("llm", time.perf_counter() - start)
+        if critical and not sentence_done:
+            clock.add_provider_time("llm", time.perf_counter() - start)
+
+
+# -- TTS ---------------------------------------------------------------------
+
+
+class StubTTS(tts.TTS):
+    def __init__(self, profile: Profile, clock: Clock) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False), sample_rate=SAMPLE_RATE, num_channels=1
+        )
+        self.profile = profile
+        self.clock = clock
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return StubChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class StubChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        stub: StubTTS = self._tts
+        critical = stub.clock.on_critical_path()
+        start = time.perf_counter()
+        await asyncio.sleep(stub.profile.tts_ttfb)
+        if critical:
+            stub.clock.add_provider_time("tts", time.perf_counter() - start)
+        output_emitter.initialize(
+            request_id=utils.shortuuid(), sample_rate=SAMPLE_RATE, num_channels=1, mime_type="audio/pcm"
+        )
+        seconds = stub.profile.tts_seconds_per_word * max(1, len(self._input_text.split()))
+        output_emitter.push(bytes(2 * int(SAMPLE_RATE * seconds)))
+        output_emitter.flush()
+
+
+# -- audio I/O ---------------------------------------------------------------
+
+
+class SilenceInput(io.AudioInput):
+    """Microphone stand-in: real-time paced frames of silence."""
+
+    def __init__(self) -> None:
+        super().__init__(label="bench-silence")
+        self._samples = SAMPLE_RATE * FRAME_MS // 1000
+        self._next = time.perf_counter()
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        self._next += FRAME_MS / 1000
+        await asyncio.sleep(max(0.0, self._next - time.perf_counter()))
+        return rtc.AudioFrame(bytes(2 * self._samples), SAMPLE_RATE, 1, self._samples)
+
+
+class TimingOutput(io.AudioOutput):
+    """Speaker stand-in: notes the first frame of each reply, plays instantly."""
+
+    def __init__(self, clock: Clock) -> None:
+        super().__init__(label="bench-sink", capabilities=io.AudioOutputCapabilities(pause=False))
+        self._clock = clock
+        self._pushed = 0.0
+        self._capturing = False
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        turn = self._clock.current
+        if turn is not None and turn.speech_end and turn.first_audio is None:
+            turn.first_audio = time.perf_counter()
+        self._capturing = True
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        if self._capturing:
+            self._finish(interrupted=False)
+
+    def clear_buffer(self) -> None:
+        if self._capturing:
+            self._finish(interrupted=True)
+
+    def _finish(self, interrupted: bool) -> None:
+        self._capturing = False
+        pushed, self._pushed = self._pushed, 0.0
+        self.on_playback_finished(playback_position=pushed, interrupted=interrupted)
+
+
+# -- driver ------------------------------------------------------------------
+
+
+async def probe_loop_lag(lags: list[float], stop: asyncio.Event, interval: float = 0.005) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def _wait_until_listening(session: AgentSession, turn: Turn, timeout: float) -> bool:
+    """Wait for the reply's audio, then for the agent to go back to listening."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if turn.first_audio is not None and session.agent_state == "listening":
+            await asyncio.sleep(0.05)  # a tool call may start another reply
+            if session.agent_state == "listening":
+                return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def run_session(
+    make_agent: Callable[[], Agent],
+    conversation: list[dict],
+    profile: Profile,
+    turn_timeout: float = 15.0,
+) -> Clock:
+    clock = Clock()
+    stub_stt = StubSTT(profile, clock)
+    session = AgentSession(
+        stt=stub_stt,
+        llm=StubLLM(profile, clock, ScriptedReplies(conversation)),
+        tts=StubTTS(profile, clock),
+        turn_detection="stt",
+        min_endpointing_delay=profile.endpointing_delay,
+        resume_false_interruption=False,
+    )
+    session.input.audio = SilenceInput()
+    session.output.audio = TimingOutput(clock)
+    await session.start(make_agent())
+    try:
+        for script in conversation:
+            stub_stt.say(script["user"])
+            while clock.current is None or clock.current.user != script["user"]:
+                await asyncio.sleep(0.01)
+            await _wait_until_listening(session, clock.current, turn_timeout)
+    finally:
+        await session.aclose()
+    return clock
+
+
+def _ms_summary(values: list[float]) -> dict[str, float] | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        "p50": round(statistics.median(values) * 1000, 2),
+        "p95": round(values[max(0, int(len(values) * 0.95) - 1)] * 1000, 2),
+        "max": round(values[-1] * 1000, 2),
+        "mean": round(statistics.fmean(values) * 1000, 2),
+    }
+
+
+async def run_benchmark(
+    name: str,
+    make_agent: Callable[[], Agent],
+    conversation: list[dict],
+    profile: Profile,
+    sessions: int = 1,
+) -> dict[str, Any]:
+    """Run `sessions` concurrent scripted sessions and summarize them."""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    peak_rss = rss_before
+
+    async def sample_rss() -> None:
+        nonlocal peak_rss
+        while not stop.is_set():
+            peak_rss = max(peak_rss, process.memory_info().rss)
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(sample_rss())
+    start = time.perf_counter()
+    clocks = await asyncio.gather(
+        *(run_session(make_agent, conversation, profile) for _ in range(sessions))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(probe, sampler)
+
+    turns = [turn for clock in clocks for turn in clock.turns]
+    answered = [t for t in turns if t.first_audio is not None]
+    return {
+        "benchmark": name,
+        "sessions": sessions,
+        "turns": len(turns),
+        "answered_turns": len(answered),
+        "turns_without_llm": sum(1 for t in answered if t.llm_calls == 0),
+        "elapsed_s": round(elapsed, 2),
+        "latency_ms": _ms_summary([t.latency for t in answered]),
+        "overhead_ms": _ms_summary([t.overhead(profile.endpointing_delay) for t in answered]),
+        "provider_ms": _ms_summary([sum(t.provider.values()) for t in answered]),
+        "loop_lag_ms": _ms_summary(lags),
+        "rss_per_session_kib": round((peak_rss - rss_before) / sessions / 1024, 1),
+        "profile": asdict(profile),
+    }
+
+
+def add_profile_arguments(parser) -> None:
+    for name, value in asdict(Profile()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+
+def profile_from_args(args) -> Profile:
+    return Profile(**{name: getattr(args, name) for name in asdict(Profile())})
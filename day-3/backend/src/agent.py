@@ -1,8 +1,8 @@
+import asyncio
 import logging
-import json
 import os
 from datetime import datetime
-from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -14,40 +14,35 @@ from livekit.agents import (
     RoomInputOptions,
     RoomOutputOptions,
     WorkerOptions,
-    cli,
     metrics,
-    tokenize,
     function_tool,
+    llm,
     RunContext,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+import capacity
+import provider_pool
+import shared_models
+import turn_batching
+from context_policy import ContextPolicy
+from history_context import WellnessHistory
+from latency_metrics import SessionLatency, dispatched_at, worker_options
+from session_journal import SessionJournal
+from startup import run_app, startup_step
+from text_segmentation import tts_tokenizer
+from wellness_store import DEFAULT_USER, open_store
+from write_behind import WriteBehindWriter
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+# Provider plugins used by the pipeline, imported lazily where they are
+# used; the worker process registers exactly these (see startup.py)
+PLUGINS = ("deepgram", "google", "murf", "silero", "turn_detector.multilingual")
 
-
-class Assistant(Agent):
-    def __init__(self) -> None:
-        # Get current date and time for the assistant
-        current_date = datetime.now().strftime("%B %d, %Y")
-        current_time = datetime.now().strftime("%I:%M %p")
-        day_of_week = datetime.now().strftime("%A")
-
-        # Read the wellness log
-        wellness_log_path = Path(os.getcwd()) / "wellness_log.json"
-        past_sessions = []
-        if wellness_log_path.exists():
-            with open(wellness_log_path, "r", encoding="utf-8") as f:
-                try:
-                    past_sessions = json.load(f)
-                except json.JSONDecodeError:
-                    past_sessions = []
-
-        super().__init__(
-            instructions=f"""You are a friendly and supportive health and wellness companion. Your goal is to conduct a short daily check-in with the user.
+# Built once per process; `build_instructions` fills in the date, time and history
+INSTRUCTIONS = """You are a friendly and supportive health and wellness companion. Your goal is to conduct a short daily check-in with the user.
 
             **Conversation Flow:**
 
@@ -75,13 +70,68 @@ class Assistant(Agent):
             *   Keep conversations brief and focused.
             *   **Do not** provide medical advice or diagnosis.
             *   Today is {day_of_week}, {current_date}. The current time is {current_time}.
-            *   Here are the past sessions to reference: {json.dumps(past_sessions, indent=2)}
-            """,
+            *   Here is what you know about past sessions:
+            {past_sessions}
+            """
+
+
+def build_instructions(past_sessions: str, now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    return INSTRUCTIONS.format(
+        current_date=now.strftime("%B %d, %Y"),
+        current_time=now.strftime("%I:%M %p"),
+        day_of_week=now.strftime("%A"),
+        past_sessions=past_sessions,
+    )
+
+
+# Most recently active users whose history is built in prewarm
+WARM_USERS = int(os.getenv("WELLNESS_WARM_USERS", "256"))
+
+
+
+def history_writer(history: WellnessHistory) -> WriteBehindWriter:
+    """Write-behind writer that records check-ins into `history`."""
+
+    def sink(records: list, sync: bool) -> None:
+        for record in records:
+            history.record(record, sync=sync)
+
+    return WriteBehindWriter(sink)
+
+
+class Assistant(Agent):
+    def __init__(
+        self,
+        history: Optional[WellnessHistory] = None,
+        user: str = DEFAULT_USER,
+        writer: Optional[WriteBehindWriter] = None,
+        summary_llm: Optional[llm.LLM] = None,
+        past_sessions: Optional[str] = None,
+    ) -> None:
+        # Bounded history: last few sessions plus a rolling digest
+        self._history = history if history is not None else WellnessHistory(open_store())
+        self._user = user
+        # Check-ins are persisted off the event loop
+        self._writer = writer if writer is not None else history_writer(self._history)
+        if past_sessions is None:
+            past_sessions = self._history.build_context(user)
+        # Long calls send recent turns verbatim and a summary of the rest;
+        # saved check-ins are always kept
+        self._context = ContextPolicy.from_env(state_tools=("save_wellness_log",))
+        self._summary_llm = summary_llm
+
+        super().__init__(
+            instructions=build_instructions(past_sessions),
         )
 
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        chat_ctx = self._context.apply(chat_ctx, self._summary_llm or self.session.llm)
+        return Agent.default.llm_node(self, chat_ctx, tools, model_settings)
+
     @function_tool
     async def save_wellness_log(self, context: RunContext, mood: str, energy: str, objectives: list[str], summary: str):
-        """Saves the user's wellness check-in data to a JSON file.
+        """Saves the user's wellness check-in data to the wellness journal.
 
         Args:
             mood: The user's self-reported mood.
@@ -90,32 +140,19 @@ class Assistant(Agent):
             summary: A short summary of the session.
         """
         try:
-            log_path = Path(os.getcwd()) / "wellness_log.json"
-            
             new_entry = {
+                "user": self._user,
                 "date": datetime.utcnow().isoformat() + "Z",
                 "mood": mood,
                 "energy": energy,
                 "objectives": objectives,
                 "summary": summary,
             }
-            
-            # Read existing data and append the new entry
-            all_entries = []
-            if log_path.exists():
-                with open(log_path, "r", encoding="utf-8") as f:
-                    try:
-                        all_entries = json.load(f)
-                    except json.JSONDecodeError:
-                        all_entries = [] # Start fresh if file is corrupted
-
-            all_entries.append(new_entry)
-
-            # Write data back to the file
-            with open(log_path, "w", encoding="utf-8") as f:
-                json.dump(all_entries, f, indent=2, ensure_ascii=False)
-                
-            return {"status": "ok", "path": str(log_path)}
+
+            # Append-only: one line per check-in, written off the event loop
+            await self._writer.submit(new_entry)
+
+            return {"status": "ok", "path": str(self._history.store.path)}
         except Exception as e:
             logger.exception("Failed to save wellness log")
             return {"status": "error", "error": str(e)}
@@ -123,33 +160,81 @@ class Assistant(Agent):
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    # Inherited from the forkserver unless SHARE_MODELS=0 (see shared_models.py)
+    with startup_step("silero_vad"):
+        proc.userdata["vad"] = shared_models.vad()
+    if turn_batching.enabled():
+        # One batched turn detector for every session in the process
+        with startup_step("turn_detector"):
+            turn_batching.service()
+    # Worker-level history cache: sessions of these users start without disk reads
+    with startup_step("wellness_history"):
+        history = WellnessHistory(open_store())
+        history.warm(history.store.users(limit=WARM_USERS))
+        proc.userdata["history"] = history
+    logger.info(f"Job process memory: {shared_models.memory_usage()}")
+
+
+async def prepare_agent(ctx: JobContext, summary_llm: llm.LLM) -> Assistant:
+    """Set up the agent while the providers warm up; blocking file I/O runs in a thread."""
+    history = ctx.proc.userdata.get("history")
+    if history is None:
+        history = await asyncio.to_thread(lambda: WellnessHistory(open_store()))
+    # Flush queued check-ins before the job exits
+    writer = history_writer(history)
+    ctx.add_shutdown_callback(writer.aclose)
+
+    # History is kept per participant identity, so wait to learn who it is
+    await ctx.connect()
+    participant = await ctx.wait_for_participant()
+    user = participant.identity or DEFAULT_USER
+    # Cached for users warmed in prewarm; otherwise reads their digest and journal
+    past_sessions = await asyncio.to_thread(history.build_context, user)
+    return Assistant(
+        history=history,
+        user=user,
+        writer=writer,
+        summary_llm=summary_llm,
+        past_sessions=past_sessions,
+    )
 
 
 async def entrypoint(ctx: JobContext):
+    from livekit.plugins import deepgram, google, murf
+
     logger.info("agent starting....")
     # Logging setup
     # Add any other context you want in all log entries here
     ctx.log_context_fields = {
         "room": ctx.room.name,
     }
+    latency = SessionLatency(agent="wellness", room=ctx.room.name, dispatched_at=dispatched_at(ctx.job))
+
+    # Join the room while the session and the agent are set up
+    connecting = asyncio.create_task(ctx.connect())
+    # Kept alive for the whole process rather than per job
+    http_session = provider_pool.http_session()
 
     #- Temporarily disabled to debug
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(model="nova-3", http_session=http_session),
         llm=google.LLM(
                 model="gemini-2.5-flash",
             ),
         tts=murf.TTS(
                 voice="en-US-matthew", 
                 style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+                http_session=http_session,
+                tokenizer=tts_tokenizer(),
                 text_pacing=True
             ),
-        turn_detection=MultilingualModel(),
+        turn_detection=turn_batching.turn_detector(),
         vad=ctx.proc.userdata["vad"],
         preemptive_generation=True,
     )
+    # Open the provider connections before the participant joins
+    warming = provider_pool.warm_up(session)
+    warming.add_done_callback(lambda _: latency.mark("providers_warm"))
 
     usage_collector = metrics.UsageCollector()
 
@@ -157,21 +242,41 @@ async def entrypoint(ctx: JobContext):
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        latency.observe(ev.metrics)
+
+    session.on("agent_state_changed", latency.on_agent_state)
+
+    # Transcripts, tool calls and metrics, for debugging the session later
+    journal = SessionJournal.from_env(agent="wellness", room=ctx.room.name, job_id=ctx.job.id)
+    if journal is not None:
+        journal.attach(session)
+        ctx.add_shutdown_callback(journal.aclose)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        logger.info(f"Turn latency: {latency.summary()}")
 
     ctx.add_shutdown_callback(log_usage)
 
-    agent = Assistant()
+    # A separate instance, so summaries stay out of the turn metrics
+    agent = await prepare_agent(ctx, summary_llm=google.LLM(model="gemini-2.5-flash-lite"))
+    await connecting
     await session.start(
         room=ctx.room,
         agent=agent,
     )
-
-    await ctx.connect()
+    latency.mark("ready")
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            **worker_options(),
+            **turn_batching.worker_options(),
+            **capacity.worker_options(),
+        ),
+        PLUGINS,
+    )
@@ -0,0 +1,284 @@
+"""Bounded wellness history for the Assistant prompt.
+
+Instead of pasting every past check-in into the system instructions, the
+prompt gets the last few sessions plus a compact digest (session count, mood
+mix, energy trend, objectives carried over). The digest is stored per user
+and updated incrementally on every save, so building the prompt costs the
+same on day 2 as on day 200.
+
+The built history is kept in a per-process LRU cache, warmed in `prewarm`
+with the most recently active users. A warm `build_context` does no I/O at
+all. `record` drops the user's entry, and entries expire after
+`cache_ttl` seconds so check-ins saved by other worker processes show up.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from wellness_store import DEFAULT_USER, WellnessStore
+
+logger = logging.getLogger("agent")
+
+DIGEST_DIRNAME = "wellness_digests"
+
+ENERGY_SCORES = {"low": 0.0, "medium": 1.0, "high": 2.0}
+MAX_MOODS = 8
+RECENT_WINDOW = 5
+MAX_OBJECTIVES = 5
+SUMMARY_CHARS = 160
+CACHE_SIZE = 4096
+CACHE_TTL = 300.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _energy_label(score: float) -> str:
+    return min(ENERGY_SCORES, key=lambda label: abs(ENERGY_SCORES[label] - score))
+
+
+@dataclass
+class HistoryDigest:
+    """Rolling, fixed-size summary of a user's check-ins."""
+
+    sessions: int = 0
+    first_date: str = ""
+    last_date: str = ""
+    mood_counts: dict[str, int] = field(default_factory=dict)
+    recent_moods: deque = field(default_factory=lambda: deque(maxlen=RECENT_WINDOW))
+    energy_total: float = 0.0
+    energy_samples: int = 0
+    recent_energy: deque = field(default_factory=lambda: deque(maxlen=RECENT_WINDOW))
+    carried_objectives: list[str] = field(default_factory=list)
+
+    def update(self, entry: dict) -> None:
+        """Fold one new check-in into the digest."""
+        self.sessions += 1
+        date = str(entry.get("date", ""))[:10]
+        if date:
+            self.first_date = self.first_date or date
+            self.last_date = date
+
+        mood = str(entry.get("mood", "")).strip().lower()
+        if mood:
+            self.mood_counts[mood] = self.mood_counts.get(mood, 0) + 1
+            if len(self.mood_counts) > MAX_MOODS:
+                # Keep the digest bounded: drop the rarest mood.
+                del self.mood_counts[min(self.mood_counts, key=self.mood_counts.get)]
+            self.recent_moods.append(mood)
+
+        score = ENERGY_SCORES.get(str(entry.get("energy", "")).strip().lower())
+        if score is not None:
+            self.energy_total += score
+            self.energy_samples += 1
+            self.recent_energy.append(score)
+
+        objectives = [str(o).strip() for o in entry.get("objectives") or [] if str(o).strip()]
+        if objectives:
+            self.carried_objectives = objectives[:MAX_OBJECTIVES]
+
+    def energy_trend(self) -> str:
+        if not self.recent_energy or not self.energy_samples:
+            return "unknown"
+        overall = self.energy_total / self.energy_samples
+        recent = sum(self.recent_energy) / len(self.recent_energy)
+        if recent - overall > 0.25:
+            return "rising"
+        if overall - recent > 0.25:
+            return "falling"
+        return "steady"
+
+    def render(self) -> str:
+        if not self.sessions:
+            return "No previous check-ins."
+        lines = [f"Check-ins so far: {self.sessions} (first {self.first_date}, last {self.last_date})."]
+        if self.mood_counts:
+            moods = sorted(self.mood_counts.items(), key=lambda kv: -kv[1])
+            lines.append("Common moods: " + ", ".join(f"{m} ({n})" for m, n in moods) + ".")
+            lines.append("Recent moods: " + ", ".join(self.recent_moods) + ".")
+        if self.energy_samples:
+            recent = ", ".join(_energy_label(s) for s in self.recent_energy)
+            average = _energy_label(self.energy_total / self.energy_samples)
+            lines.append(f"Energy trend: {self.energy_trend()} (recent: {recent}; usually {average}).")
+        if self.carried_objectives:
+            lines.append("Objectives from last time: " + "; ".join(self.carried_objectives) + ".")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "first_date": self.first_date,
+            "last_date": self.last_date,
+            "mood_counts": self.mood_counts,
+            "recent_moods": list(self.recent_moods),
+            "energy_total": self.energy_total,
+            "energy_samples": self.energy_samples,
+            "recent_energy": list(self.recent_energy),
+            "carried_objectives": self.carried_objectives,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HistoryDigest:
+        return cls(
+            sessions=data.get("sessions", 0),
+            first_date=data.get("first_date", ""),
+            last_date=data.get("last_date", ""),
+            mood_counts=dict(data.get("mood_counts", {})),
+            recent_moods=deque(data.get("recent_moods", []), maxlen=RECENT_WINDOW),
+            energy_total=data.get("energy_total", 0.0),
+            energy_samples=data.get("energy_samples", 0),
+            recent_energy=deque(data.get("recent_energy", []), maxlen=RECENT_WINDOW),
+            carried_objectives=list(data.get("carried_objectives", [])),
+        )
+
+
+def _format_session(entry: dict) -> str:
+    objectives = "; ".join(entry.get("objectives") or []) or "none"
+    summary = str(entry.get("summary", "")).strip()
+    if len(summary) > SUMMARY_CHARS:
+        summary = summary[: SUMMARY_CHARS - 3].rstrip() + "..."
+    return (
+        f"- {str(entry.get('date', ''))[:10]}: mood {entry.get('mood', '?')}, "
+        f"energy {entry.get('energy', '?')}, objectives: {objectives}. {summary}"
+    )
+
+
+class WellnessHistory:
+    """Records check-ins and builds the bounded history section of the prompt.
+
+    Args:
+        store: journal the check-ins are appended to.
+        digest_dir: where per-user digests are kept (default: next to the journal).
+        recent_sessions: how many of the latest sessions are quoted verbatim.
+        token_budget: upper bound on the estimated tokens of the history section.
+        cache_size: users whose history is kept built in memory (0 disables).
+        cache_ttl: seconds a cached history is trusted.
+    """
+
+    def __init__(
+        self,
+        store: WellnessStore,
+        digest_dir: str | Path | None = None,
+        recent_sessions: int = 3,
+        token_budget: int = 400,
+        cache_size: int = CACHE_SIZE,
+        cache_ttl: float = CACHE_TTL,
+    ) -> None:
+        self.store = store
+        self.digest_dir = Path(digest_dir) if digest_dir is not None else store.path.parent / DIGEST_DIRNAME
+        self.recent_sessions = recent_sessions
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Bumped on every write, so a build that raced a save is not cached
+        self._generation = 0
+        # `record` runs on a write-behind thread
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, entry: dict, sync: bool = False) -> dict:
+        """Append a check-in to the journal and fold it into the user's digest."""
+        user = entry.get("user") or DEFAULT_USER
+        # Load (or seed) the digest before appending so the new entry is
+        # folded in exactly once.
+        digest = self.digest(user)
+        record = self.store.append(entry, sync=sync)
+        digest.update(record)
+        self._save_digest(user, digest)
+        self.invalidate(user)
+        return record
+
+    def invalidate(self, user: str = DEFAULT_USER) -> None:
+        with self._cache_lock:
+            self._cache.pop(user, None)
+            self._generation += 1
+
+    def warm(self, users: Iterable[str]) -> int:
+        """Build and cache the history of `users`; returns how many were built."""
+        count = 0
+        for user in users:
+            if count >= self.cache_size:
+                break
+            self.build_context(user)
+            count += 1
+        return count
+
+    def digest(self, user: str = DEFAULT_USER) -> HistoryDigest:
+        path = self._digest_path(user)
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                try:
+                    return HistoryDigest.from_dict(json.load(f))
+                except json.JSONDecodeError:
+                    logger.warning("Wellness digest %s is corrupt; rebuilding", path)
+        # First use for this user (e.g. right after migrating a legacy log):
+        # seed the digest from the journal once and persist it.
+        digest = HistoryDigest()
+        for entry in self.store.history(user):
+            digest.update(entry)
+        if digest.sessions:
+            self._save_digest(user, digest)
+        return digest
+
+    def build_context(self, user: str = DEFAULT_USER) -> str:
+        """Return the digest plus the last sessions, trimmed to the token budget."""
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(user)
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(user)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            generation = self._generation
+
+        text = self._build_context(user)
+        with self._cache_lock:
+            if self.cache_size > 0 and generation == self._generation:
+                self._cache[user] = (now, text)
+                self._cache.move_to_end(user)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return text
+
+    def _build_context(self, user: str) -> str:
+        digest_text = self.digest(user).render()
+        sessions = [_format_session(e) for e in self.store.recent(user, self.recent_sessions)]
+        while True:
+            text = digest_text
+            if sessions:
+                text += "\nMost recent sessions:\n" + "\n".join(sessions)
+            if estimate_tokens(text) <= self.token_budget or not sessions:
+                break
+            sessions.pop(0)
+        max_chars = self.token_budget * 4
+        if len(text) > max_chars:
+            text = text[: max_chars - 3] + "..."
+        return text
+
+    def _digest_path(self, user: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", user) or DEFAULT_USER
+        return self.digest_dir / f"{safe}.json"
+
+    def _save_digest(self, user: str, digest: HistoryDigest) -> None:
+        path = self._digest_path(user)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(digest.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
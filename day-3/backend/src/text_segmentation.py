@@ -0,0 +1,210 @@
+"""Adaptive text segmentation between the LLM stream and the TTS.
+
+The TTS sentence tokenizer holds text back until a sentence ends (and the
+next one has started), so the first audio of a reply waits for the LLM to
+stream its whole first sentence. `AdaptiveSentenceTokenizer` sends a short
+first chunk as soon as it can be spoken as a phrase, then full sentences:
+
+- at the first clause boundary (`,` `;` `:` a dash or a sentence end)
+  with at least `min_words` words before it
+- otherwise once `max_words` words have arrived, or `deadline` seconds
+  after the first text, whichever comes first
+
+Word-count and deadline cuts prefer an earlier, shorter clause ("Sure,").
+Failing that they fall between words, never right after a word that
+cannot end a phrase ("the", "to", "would", ...), and only once `min_words`
+words are in, so the first chunk still sounds like a phrase.
+Everything after it goes through the wrapped sentence tokenizer as before.
+`tokenize` splits the first sentence by the same rules, so cached lines
+(see `tts_cache`) match what a fast LLM stream produces.
+
+`TTS_FIRST_CHUNK=0` turns it off (see `tts_tokenizer`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+
+from livekit.agents import tokenize, utils
+
+DEFAULT_MIN_WORDS = 3
+DEFAULT_MAX_WORDS = 10
+# Seconds after the first text of a reply
+DEFAULT_DEADLINE = 0.4
+
+# Clause punctuation, possibly closed by a quote or bracket, then a space
+_CLAUSE_END = re.compile(r"(?:[,;:.!?…]|\s[—–-])[\"'’”)\]]*\s")
+# A word is complete once whitespace follows it
+_WORD = re.compile(r"\S+(?=\s)")
+# Titles whose period does not end a clause
+_ABBREVIATIONS = frozenset({"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "e.g.", "i.e."})
+_NO_CUT_AFTER = frozenset(
+    "a an the and or but nor so to of in on at by for with from into about as than "
+    "that which who if is are was were be been am i you we they he she it my your our "
+    "their his her its this these those some any no not very just like more "
+    "really quite can will would could should may might must do does did have has had".split()
+)
+
+
+def _first_cut(text: str, *, min_words: int, max_words: int, force: bool) -> int | None:
+    """Where the first chunk of `text` ends, or None to wait for more text.
+
+    `force` (the deadline passed) allows a cut with fewer than `max_words`.
+    """
+    # The last clause boundary, however short, is the best forced cut
+    clause = None
+    for match in _CLAUSE_END.finditer(text):
+        words = text[: match.end()].split()
+        if len(words) > max_words:
+            break
+        if words[-1].lower() in _ABBREVIATIONS:
+            continue
+        if len(words) >= min_words:
+            return match.end()
+        clause = match.end()
+    complete = list(_WORD.finditer(text))
+    if not force and len(complete) < max_words:
+        return None
+    if clause is not None:
+        return clause
+    for word in reversed(complete[min_words - 1 : max_words]):
+        if word.group().lower().strip("\"'’”(),") not in _NO_CUT_AFTER:
+            return word.end()
+    return None
+
+
+class AdaptiveSentenceTokenizer(tokenize.SentenceTokenizer):
+    """Sentences, except that each stream's first chunk is cut early.
+
+    Args:
+        sentence_tokenizer: splits everything after the first chunk; by
+            default `tokenize.basic.SentenceTokenizer(min_sentence_len=2)`.
+        min_words: fewest words in the first chunk.
+        max_words: most words in the first chunk.
+        deadline: seconds after the first text before the first chunk is
+            cut at the next word boundary; 0 waits for a clause or
+            `max_words`.
+    """
+
+    def __init__(
+        self,
+        *,
+        sentence_tokenizer: tokenize.SentenceTokenizer | None = None,
+        min_words: int = DEFAULT_MIN_WORDS,
+        max_words: int = DEFAULT_MAX_WORDS,
+        deadline: float = DEFAULT_DEADLINE,
+    ) -> None:
+        self._sentence_tokenizer = sentence_tokenizer or tokenize.basic.SentenceTokenizer(
+            min_sentence_len=2
+        )
+        self.min_words = min_words
+        self.max_words = max_words
+        self.deadline = deadline
+
+    def first_cut(self, text: str, *, force: bool = False) -> int | None:
+        return _first_cut(text, min_words=self.min_words, max_words=self.max_words, force=force)
+
+    def tokenize(self, text: str, *, language: str | None = None) -> list[str]:
+        cut = self.first_cut(text.strip() + " ")
+        if cut is None:
+            return self._sentence_tokenizer.tokenize(text, language=language)
+        first, rest = text.strip()[:cut].strip(), text.strip()[cut:]
+        return [first, *self._sentence_tokenizer.tokenize(rest, language=language)]
+
+    def stream(self, *, language: str | None = None) -> AdaptiveSentenceStream:
+        return AdaptiveSentenceStream(
+            tokenizer=self, sentences=self._sentence_tokenizer.stream(language=language)
+        )
+
+
+class AdaptiveSentenceStream(tokenize.SentenceStream):
+    """Emits the first chunk itself, then forwards the wrapped sentence stream."""
+
+    def __init__(
+        self, *, tokenizer: AdaptiveSentenceTokenizer, sentences: tokenize.SentenceStream
+    ) -> None:
+        super().__init__()
+        self._tokenizer = tokenizer
+        self._sentences = sentences
+        self._buf = ""
+        self._first = True
+        self._deadline_passed = False
+        self._timer: asyncio.TimerHandle | None = None
+        self._segment_id = utils.shortuuid()
+        self._forward_task = asyncio.create_task(self._forward())
+
+    def push_text(self, text: str) -> None:
+        self._check_not_closed()
+        if not self._first:
+            self._sentences.push_text(text)
+            return
+        self._buf += text
+        if self._timer is None and self._tokenizer.deadline > 0:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._tokenizer.deadline, self._on_deadline
+            )
+        self._try_cut()
+
+    def flush(self) -> None:
+        self._check_not_closed()
+        self._end_first(self._buf)
+        self._sentences.flush()
+
+    def end_input(self) -> None:
+        self._check_not_closed()
+        self._end_first(self._buf)
+        self._sentences.end_input()
+
+    async def aclose(self) -> None:
+        self._cancel_timer()
+        await self._sentences.aclose()
+        await utils.aio.cancel_and_wait(self._forward_task)
+        self._do_close()
+
+    def _try_cut(self) -> None:
+        cut = self._tokenizer.first_cut(self._buf, force=self._deadline_passed)
+        if cut is not None:
+            rest = self._buf[cut:].lstrip()
+            self._end_first(self._buf[:cut])
+            if rest:
+                self._sentences.push_text(rest)
+
+    def _end_first(self, text: str) -> None:
+        """Send `text` as the first chunk and hand further text to the sentences."""
+        if not self._first:
+            return
+        self._first = False
+        self._buf = ""
+        self._cancel_timer()
+        if text.strip():
+            self._event_ch.send_nowait(
+                tokenize.TokenData(segment_id=self._segment_id, token=text.strip())
+            )
+
+    def _on_deadline(self) -> None:
+        self._timer = None
+        self._deadline_passed = True
+        if self._first and not self.closed:
+            self._try_cut()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _forward(self) -> None:
+        try:
+            async for ev in self._sentences:
+                self._event_ch.send_nowait(ev)
+        finally:
+            self._do_close()
+
+
+def tts_tokenizer() -> tokenize.SentenceTokenizer:
+    """The agents' TTS sentence tokenizer, with the early first chunk unless `TTS_FIRST_CHUNK=0`."""
+    sentences = tokenize.basic.SentenceTokenizer(min_sentence_len=2)
+    if os.getenv("TTS_FIRST_CHUNK", "1") == "0":
+        return sentences
+    return AdaptiveSentenceTokenizer(sentence_tokenizer=sentences)
@@ -0,0 +1,331 @@
+"""Append-only storage for wellness check-ins.
+
+Each check-in is appended as a single JSON line to a journal file, so a save
+costs the same whether the log holds ten entries or a hundred thousand. An
+in-memory index (per user and per user/date) is built by scanning the journal
+once and then kept current by reading only the bytes appended since the last
+scan, which also picks up entries written by other worker processes.
+
+`open_store` keeps one such journal per user (`wellness_users/`), so a
+session only reads its own participant's check-ins, however many other
+users there are.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+logger = logging.getLogger("agent")
+
+DEFAULT_USER = "default"
+
+USERS_DIRNAME = "wellness_users"
+JOURNAL_FILENAME = "wellness_log.jsonl"
+LEGACY_FILENAME = "wellness_log.json"
+# Lines buffered per bulk import before they are written out
+IMPORT_BATCH = 100_000
+
+
+def _record(entry: dict) -> dict:
+    record = dict(entry)
+    record["user"] = record.get("user") or DEFAULT_USER
+    record.setdefault("date", datetime.utcnow().isoformat() + "Z")
+    return record
+
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _append(path: Path, data: bytes, sync: bool = False) -> None:
+    """Append whole lines with one write, under an exclusive `flock`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        os.write(fd, data)
+        if sync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WellnessStore(ABC):
+    """Interface every wellness store backend implements."""
+
+    path: Path
+
+    @abstractmethod
+    def append(self, entry: dict, sync: bool = False) -> dict:
+        """Persist one check-in (fsync'd if `sync`) and return the stored entry."""
+
+    @abstractmethod
+    def history(self, user: str = DEFAULT_USER) -> list[dict]:
+        """Return all check-ins for `user`, oldest first."""
+
+    @abstractmethod
+    def recent(self, user: str = DEFAULT_USER, limit: int = 5) -> list[dict]:
+        """Return the last `limit` check-ins for `user`, oldest first."""
+
+    @abstractmethod
+    def for_date(self, date: str, user: str = DEFAULT_USER) -> list[dict]:
+        """Return the check-ins `user` made on `date` (YYYY-MM-DD)."""
+
+    @abstractmethod
+    def users(self, limit: int | None = None) -> list[str]:
+        """Return the users with check-ins, most recently active first."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Total number of check-ins across all users."""
+
+
+class JsonlWellnessStore(WellnessStore):
+    """Wellness store backed by an append-only JSONL journal.
+
+    Appends take an exclusive `flock` on the journal (where available) and
+    write the whole line with a single `write` on an `O_APPEND` descriptor,
+    so concurrent jobs never interleave or drop each other's entries.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._by_user: dict[str, list[int]] = defaultdict(list)
+        self._by_date: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._count = 0
+        self._indexed_to = 0
+        # Guards the index; appends may run on a write-behind thread.
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict, sync: bool = False) -> dict:
+        record = _record(entry)
+        _append(self.path, _encode(record), sync=sync)
+        self._refresh()
+        return record
+
+    def history(self, user: str = DEFAULT_USER) -> list[dict]:
+        self._refresh()
+        return self._read_offsets(list(self._by_user.get(user, [])))
+
+    def recent(self, user: str = DEFAULT_USER, limit: int = 5) -> list[dict]:
+        self._refresh()
+        if limit <= 0:
+            return []
+        return self._read_offsets(self._by_user.get(user, [])[-limit:])
+
+    def for_date(self, date: str, user: str = DEFAULT_USER) -> list[dict]:
+        self._refresh()
+        return self._read_offsets(list(self._by_date.get((user, date), [])))
+
+    def users(self, limit: int | None = None) -> list[str]:
+        self._refresh()
+        with self._lock:
+            users = sorted(self._by_user, key=lambda u: self._by_user[u][-1], reverse=True)
+        return users[:limit]
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._count
+
+    def _refresh(self) -> None:
+        """Index any complete lines appended since the last scan."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._indexed_to:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_to)
+            offset = self._indexed_to
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Another process is mid-write; pick it up next time.
+                    break
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt wellness journal line at %d", offset)
+                else:
+                    self._index(record, offset)
+                offset += len(raw)
+            self._indexed_to = offset
+
+    def _index(self, record: dict, offset: int) -> None:
+        user = record.get("user") or DEFAULT_USER
+        self._by_user[user].append(offset)
+        self._by_date[(user, str(record.get("date", ""))[:10])].append(offset)
+        self._count += 1
+
+    def _read_offsets(self, offsets: list[int]) -> list[dict]:
+        if not offsets:
+            return []
+        entries = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        return entries
+
+
+class ShardedWellnessStore(WellnessStore):
+    """Wellness store with one `JsonlWellnessStore` journal per user.
+
+    Shards live in `<path>/<xx>/<user>-<hash>.jsonl`, where `xx` comes from a
+    hash of the user, so no directory holds more than a few hundred files.
+    Nothing is cached here; callers that read the same user often keep
+    what they build from it (see `history_context.WellnessHistory`).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def shard_path(self, user: str) -> Path:
+        digest = hashlib.sha1(user.encode("utf-8")).hexdigest()
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", user)[:48]
+        return self.path / digest[:2] / f"{safe}-{digest[:10]}.jsonl"
+
+    def shard(self, user: str = DEFAULT_USER) -> JsonlWellnessStore:
+        return JsonlWellnessStore(self.shard_path(user))
+
+    def append(self, entry: dict, sync: bool = False) -> dict:
+        record = _record(entry)
+        _append(self.shard_path(record["user"]), _encode(record), sync=sync)
+        return record
+
+    def import_entries(self, entries: Iterable[dict]) -> int:
+        """Append many check-ins with one write per shard per batch; returns the count."""
+        count = 0
+        batch: dict[Path, list[bytes]] = defaultdict(list)
+        for entry in entries:
+            record = _record(entry)
+            batch[self.shard_path(record["user"])].append(_encode(record))
+            count += 1
+            if count % IMPORT_BATCH == 0:
+                self._write_batch(batch)
+        self._write_batch(batch)
+        return count
+
+    def _write_batch(self, batch: dict[Path, list[bytes]]) -> None:
+        for path, lines in batch.items():
+            _append(path, b"".join(lines))
+        batch.clear()
+
+    def history(self, user: str = DEFAULT_USER) -> list[dict]:
+        return self.shard(user).history(user)
+
+    def recent(self, user: str = DEFAULT_USER, limit: int = 5) -> list[dict]:
+        return self.shard(user).recent(user, limit)
+
+    def for_date(self, date: str, user: str = DEFAULT_USER) -> list[dict]:
+        return self.shard(user).for_date(date, user)
+
+    def users(self, limit: int | None = None) -> list[str]:
+        shards = sorted(self._shards(), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        users = []
+        for path in shards[:limit]:
+            with open(path, "rb") as f:
+                first = f.readline()
+            try:
+                users.append(json.loads(first)["user"])
+            except (json.JSONDecodeError, KeyError):
+                logger.warning("Skipping unreadable wellness shard %s", path)
+        return users
+
+    def __len__(self) -> int:
+        # Reads every shard; meant for tools and tests, not the agent
+        return sum(len(JsonlWellnessStore(path)) for path in self._shards())
+
+    def _shards(self) -> list[Path]:
+        return list(self.path.glob("*/*.jsonl"))
+
+
+def migrate_json_array(legacy_path: str | Path, store: WellnessStore) -> int:
+    """Import a legacy `wellness_log.json` array into `store`, once.
+
+    The legacy file is renamed to `<name>.migrated` so the import never runs
+    twice. Returns the number of entries imported.
+    """
+    legacy_path = Path(legacy_path)
+    migrated_path = legacy_path.with_name(legacy_path.name + ".migrated")
+    try:
+        # Renaming first claims the migration, so concurrent workers opening
+        # the store at the same time cannot import the entries twice.
+        legacy_path.rename(migrated_path)
+    except FileNotFoundError:
+        return 0
+
+    with open(migrated_path, encoding="utf-8") as f:
+        try:
+            entries = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning("Legacy wellness log %s is corrupt; skipping", legacy_path)
+            entries = []
+
+    for entry in entries:
+        store.append(entry)
+
+    logger.info("Migrated %d wellness entries from %s", len(entries), legacy_path)
+    return len(entries)
+
+
+def migrate_journal(journal_path: str | Path, store: ShardedWellnessStore) -> int:
+    """Split a single `wellness_log.jsonl` journal into per-user shards, once.
+
+    Claimed by renaming it to `<name>.migrated`, like `migrate_json_array`.
+    Returns the number of entries imported.
+    """
+    journal_path = Path(journal_path)
+    migrated_path = journal_path.with_name(journal_path.name + ".migrated")
+    try:
+        journal_path.rename(migrated_path)
+    except FileNotFoundError:
+        return 0
+
+    def entries():
+        with open(migrated_path, "rb") as f:
+            for lineno, raw in enumerate(f, 1):
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    yield json.loads(raw)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt wellness journal line %d", lineno)
+
+    count = store.import_entries(entries())
+    logger.info("Split %d wellness entries from %s into per-user shards", count, journal_path)
+    return count
+
+
+def open_store(directory: str | Path | None = None) -> WellnessStore:
+    """Open the per-user wellness journals in `directory` (default: the working dir).
+
+    A legacy `wellness_log.json` array or single `wellness_log.jsonl`
+    journal found there is migrated on first open.
+    """
+    directory = Path(directory) if directory is not None else Path(os.getcwd())
+    store = ShardedWellnessStore(directory / USERS_DIRNAME)
+    migrate_json_array(directory / LEGACY_FILENAME, store)
+    migrate_journal(directory / JOURNAL_FILENAME, store)
+    return store
@@ -0,0 +1,109 @@
+"""Async write-behind persistence for function tools.
+
+Tool handlers run on the job's event loop, next to audio frame handling, VAD
+and TTS streaming, so they must not block on disk I/O. `WriteBehindWriter`
+accepts records into a bounded in-memory queue and a background task hands
+them to a blocking sink in batches on a worker thread. The queue is flushed
+when the job shuts down (see `ctx.add_shutdown_callback(writer.aclose)`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger("agent")
+
+# sink(records, sync): write `records` and, if `sync` is true, fsync them.
+Sink = Callable[[list, bool], None]
+
+FSYNC_POLICIES = ("always", "batch", "interval", "never")
+
+
+class WriteBehindWriter:
+    """Queue records on the event loop and persist them off-loop in batches.
+
+    Args:
+        sink: blocking callable `sink(records, sync)` run in a worker thread.
+        max_queue: records buffered before `submit` applies backpressure.
+        max_batch: most records handed to the sink in one call.
+        fsync: "always" (one record per sink call, each synced), "batch"
+            (sync every batch), "interval" (sync at most every
+            `fsync_interval` seconds) or "never" (leave it to the OS).
+        fsync_interval: seconds between syncs for the "interval" policy.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        *,
+        max_queue: int = 1024,
+        max_batch: int = 64,
+        fsync: str = "batch",
+        fsync_interval: float = 1.0,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self._sink = sink
+        self._max_batch = 1 if fsync == "always" else max_batch
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._last_sync = time.monotonic()
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.written = 0
+        self.failed = 0
+
+    async def submit(self, record: Any) -> None:
+        """Queue `record` for writing; waits only while the queue is full."""
+        if self._closed:
+            raise RuntimeError("WriteBehindWriter is closed")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="write_behind")
+        await self._queue.put(record)
+
+    async def flush(self) -> None:
+        """Wait until every record submitted so far has reached the sink."""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        """Flush pending records and stop the background task."""
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._sink, batch, self._should_sync())
+                self.written += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Write-behind sink failed; dropped %d record(s)", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _should_sync(self) -> bool:
+        if self._fsync in ("always", "batch"):
+            return True
+        if self._fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_sync >= self._fsync_interval:
+                self._last_sync = now
+                return True
+        return False
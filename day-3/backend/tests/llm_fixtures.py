@@ -0,0 +1,236 @@
+"""Record/replay LLM for the agent eval tests.
+
+`RecordReplayLLM` sits where the tests used to build `inference.LLM`, both
+as the agent's LLM and as the `judge`. Each request is keyed by a hash of
+the normalized chat context (roles, text, tool calls and outputs; no ids or
+timestamps; dates and times in the instructions masked) plus the tool names
+and tool choice. The streamed response is stored as one JSON file per key
+under `tests/fixtures/llm/`, with each chunk's offset from the start of the
+request, so it can be replayed with the original pacing.
+
+Set `LLM_FIXTURES` to choose the mode:
+
+- `auto` (default): replay when a recording exists, otherwise call the real
+  LLM and record its response.
+- `replay`: never touch the network; a missing recording fails the test.
+- `record`: always call the real LLM and overwrite the recording.
+
+`LLM_REPLAY_SPEED` scales replay pacing: 1 is real time, 0 plays instantly.
+One file per key, written atomically, so `pytest -n auto` workers can
+record side by side.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, NotGivenOr, llm
+from livekit.agents.llm.tool_context import (
+    get_function_info,
+    get_raw_function_info,
+    is_function_tool,
+)
+from livekit.agents.types import NOT_GIVEN
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "llm"
+MODES = ("auto", "replay", "record")
+
+_MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+_VOLATILE = [
+    (re.compile(rf"\b(?:{_MONTHS}) \d{{1,2}}, \d{{4}}\b"), "<date>"),
+    (re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})? ?[AP]M\b"), "<time>"),
+    (re.compile(r"\b(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day\b"), "<weekday>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}(?:T[\d:.]+Z?)?\b"), "<date>"),
+]
+
+
+class MissingRecording(AssertionError):
+    pass
+
+
+def _normalize_text(text: str) -> str:
+    for pattern, placeholder in _VOLATILE:
+        text = pattern.sub(placeholder, text)
+    return " ".join(text.split())
+
+
+def _normalize_item(item: dict) -> dict:
+    out: dict[str, Any] = {"type": item.get("type")}
+    for key in ("role", "name", "is_error"):
+        if key in item:
+            out[key] = item[key]
+    if "content" in item:
+        out["content"] = [
+            _normalize_text(c) if isinstance(c, str) else c.get("type") for c in item["content"]
+        ]
+    if "arguments" in item:
+        try:
+            out["arguments"] = json.loads(item["arguments"] or "{}")
+        except ValueError:
+            out["arguments"] = item["arguments"]
+    if "output" in item:
+        out["output"] = _normalize_text(str(item["output"]))
+    return out
+
+
+def _tool_name(tool: Any) -> str:
+    if is_function_tool(tool):
+        return get_function_info(tool).name
+    return get_raw_function_info(tool).name
+
+
+def fixture_key(chat_ctx: llm.ChatContext, tools: list, tool_choice: Any, model: str) -> tuple[str, dict]:
+    """The recording key for a request, and the normalized material it hashes."""
+    material = {
+        "model": model,
+        "items": [_normalize_item(i) for i in chat_ctx.to_dict(exclude_timestamp=True)["items"]],
+        "tools": sorted(_tool_name(t) for t in tools),
+        "tool_choice": tool_choice if tool_choice is not NOT_GIVEN else None,
+    }
+    raw = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32], material
+
+
+class FixtureStore:
+    """One `<key>.json` recording per request."""
+
+    def __init__(self, directory: str | os.PathLike = FIXTURE_DIR) -> None:
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> dict | None:
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, recording: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{key}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(recording, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.path(key))
+
+
+class RecordReplayLLM(llm.LLM):
+    """Serve recorded responses; record from `make_llm()` when allowed.
+
+    Args:
+        make_llm: builds the real LLM; only called when something must be
+            recorded, so replaying needs no credentials.
+        model: model name, part of the key.
+        mode, speed: default to `LLM_FIXTURES` and `LLM_REPLAY_SPEED`.
+    """
+
+    def __init__(
+        self,
+        make_llm: Callable[[], llm.LLM],
+        *,
+        model: str,
+        store: FixtureStore | None = None,
+        mode: str | None = None,
+        speed: float | None = None,
+    ) -> None:
+        super().__init__()
+        self._make_llm = make_llm
+        self._real: llm.LLM | None = None
+        self._model = model
+        self.store = store or FixtureStore()
+        self.mode = mode or os.getenv("LLM_FIXTURES", "auto")
+        if self.mode not in MODES:
+            raise ValueError(f"LLM_FIXTURES must be one of {MODES}, not {self.mode!r}")
+        self.speed = speed if speed is not None else float(os.getenv("LLM_REPLAY_SPEED", "1"))
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def real_llm(self) -> llm.LLM:
+        if self._real is None:
+            self._real = self._make_llm()
+        return self._real
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> RecordReplayStream:
+        return RecordReplayStream(
+            self,
+            chat_ctx=chat_ctx,
+            tools=tools or [],
+            conn_options=conn_options,
+            request={
+                "parallel_tool_calls": parallel_tool_calls,
+                "tool_choice": tool_choice,
+                "extra_kwargs": extra_kwargs,
+            },
+        )
+
+    async def aclose(self) -> None:
+        if self._real is not None:
+            await self._real.aclose()
+
+
+class RecordReplayStream(llm.LLMStream):
+    def __init__(self, llm_: RecordReplayLLM, *, request: dict, **kwargs: Any) -> None:
+        super().__init__(llm_, **kwargs)
+        self._owner = llm_
+        self._request = request
+
+    async def _run(self) -> None:
+        owner = self._owner
+        key, material = fixture_key(
+            self._chat_ctx, self._tools, self._request["tool_choice"], owner.model
+        )
+        recording = owner.store.load(key) if owner.mode != "record" else None
+        if recording is not None:
+            await self._replay(recording)
+            return
+        if owner.mode == "replay":
+            raise MissingRecording(
+                f"no recorded LLM response for {owner.store.path(key).name}; "
+                "run the tests once with LLM_FIXTURES=record (needs credentials)"
+            )
+        await self._record(key, material)
+
+    async def _replay(self, recording: dict) -> None:
+        start = time.perf_counter()
+        for entry in recording["chunks"]:
+            if self._owner.speed > 0:
+                due = start + entry["t"] * self._owner.speed
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            self._event_ch.send_nowait(llm.ChatChunk.model_validate(entry["chunk"]))
+
+    async def _record(self, key: str, material: dict) -> None:
+        start = time.perf_counter()
+        chunks = []
+        async with self._owner.real_llm().chat(
+            chat_ctx=self._chat_ctx,
+            tools=self._tools,
+            conn_options=self._conn_options,
+            **self._request,
+        ) as stream:
+            async for chunk in stream:
+                chunks.append(
+                    {"t": round(time.perf_counter() - start, 4), "chunk": chunk.model_dump(mode="json")}
+                )
+                self._event_ch.send_nowait(chunk)
+        self._owner.store.save(key, {"request": material, "chunks": chunks})
@@ -2,10 +2,14 @@ import pytest
 from livekit.agents import AgentSession, inference, llm
 
 from agent import Assistant
+from llm_fixtures import RecordReplayLLM
+
+MODEL = "openai/gpt-4.1-mini"
 
 
 def _llm() -> llm.LLM:
-    return inference.LLM(model="openai/gpt-4.1-mini")
+    # Replays tests/fixtures/llm recordings; see llm_fixtures for the modes
+    return RecordReplayLLM(lambda: inference.LLM(model=MODEL), model=MODEL)
 
 
 @pytest.mark.asyncio
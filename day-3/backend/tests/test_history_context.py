@@ -0,0 +1,78 @@
+from agent import Assistant
+from history_context import HistoryDigest, WellnessHistory, estimate_tokens
+from wellness_store import JsonlWellnessStore, ShardedWellnessStore
+
+
+def _entry(i: int) -> dict:
+    return {
+        "date": f"2025-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}T09:00:00Z",
+        "mood": ["great", "ok", "tired"][i % 3],
+        "energy": ["low", "medium", "high"][i % 3],
+        "objectives": [f"objective {i:04d}", "drink water"],
+        "summary": "A quick check-in about the day ahead. " * 3,
+    }
+
+
+def _history(tmp_path, **kwargs) -> WellnessHistory:
+    return WellnessHistory(JsonlWellnessStore(tmp_path / "wellness_log.jsonl"), **kwargs)
+
+
+def test_digest_is_updated_incrementally(tmp_path) -> None:
+    history = _history(tmp_path)
+    history.record({"date": "2025-11-24T09:00:00Z", "mood": "tired", "energy": "low", "objectives": ["sleep"]})
+    history.record({"date": "2025-11-25T09:00:00Z", "mood": "Great", "energy": "high", "objectives": ["run"]})
+
+    digest = history.digest()
+    assert digest.sessions == 2
+    assert digest.mood_counts == {"tired": 1, "great": 1}
+    assert digest.carried_objectives == ["run"]
+    assert (digest.first_date, digest.last_date) == ("2025-11-24", "2025-11-25")
+    assert HistoryDigest.from_dict(digest.to_dict()) == digest
+
+
+def test_digest_is_seeded_once_from_existing_journal(tmp_path) -> None:
+    store = JsonlWellnessStore(tmp_path / "wellness_log.jsonl")
+    store.append(_entry(0))
+    history = WellnessHistory(store)
+    history.record(_entry(1))
+    assert history.digest().sessions == 2
+
+
+def test_context_respects_token_budget(tmp_path) -> None:
+    history = _history(tmp_path, recent_sessions=10, token_budget=120)
+    for i in range(20):
+        history.record(_entry(i))
+    assert estimate_tokens(history.build_context()) <= 120
+
+
+def test_instruction_size_is_constant_as_log_grows(tmp_path) -> None:
+    history = _history(tmp_path)
+    sizes = []
+    for i in range(300):
+        history.record(_entry(i))
+        if i + 1 in (10, 100, 300):
+            sizes.append(len(Assistant(history=history).instructions))
+    # Only the digest's counters (e.g. "10" vs "300" sessions) may differ.
+    assert max(sizes) - min(sizes) <= 16
+
+
+def test_warm_cache_construction_does_not_touch_disk(tmp_path, monkeypatch) -> None:
+    history = WellnessHistory(ShardedWellnessStore(tmp_path / "users"))
+    history.record({**_entry(0), "user": "alice"})
+    assert history.warm(history.store.users()) == 1
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("read from disk")
+
+    monkeypatch.setattr(history.store, "recent", no_disk)
+    monkeypatch.setattr(history, "digest", no_disk)
+    Assistant(history=history, user="alice")
+    assert (history.hits, history.misses) == (1, 1)
+
+
+def test_record_invalidates_the_cached_history(tmp_path) -> None:
+    history = WellnessHistory(ShardedWellnessStore(tmp_path / "users"))
+    assert history.build_context("alice") == "No previous check-ins."
+    history.record({**_entry(0), "user": "alice"})
+    assert "Check-ins so far: 1" in history.build_context("alice")
+    assert history.build_context("bob") == "No previous check-ins."
@@ -0,0 +1,92 @@
+import json
+
+from wellness_store import (
+    JsonlWellnessStore,
+    ShardedWellnessStore,
+    migrate_json_array,
+    migrate_journal,
+    open_store,
+)
+
+
+def _entry(user: str, date: str, mood: str) -> dict:
+    return {
+        "user": user,
+        "date": f"{date}T09:00:00Z",
+        "mood": mood,
+        "energy": "medium",
+        "objectives": [],
+        "summary": "",
+    }
+
+
+def test_append_is_indexed_by_user_and_date(tmp_path) -> None:
+    store = JsonlWellnessStore(tmp_path / "wellness_log.jsonl")
+    store.append(_entry("alice", "2025-11-24", "great"))
+    store.append(_entry("bob", "2025-11-24", "tired"))
+    store.append(_entry("alice", "2025-11-25", "ok"))
+
+    assert len(store) == 3
+    assert [e["mood"] for e in store.history("alice")] == ["great", "ok"]
+    assert [e["mood"] for e in store.recent("alice", limit=1)] == ["ok"]
+    assert [e["mood"] for e in store.for_date("2025-11-24", user="bob")] == ["tired"]
+    assert store.history("nobody") == []
+
+
+def test_sees_appends_from_other_instances(tmp_path) -> None:
+    path = tmp_path / "wellness_log.jsonl"
+    writer = JsonlWellnessStore(path)
+    reader = JsonlWellnessStore(path)
+
+    writer.append(_entry("alice", "2025-11-24", "great"))
+    assert len(reader) == 1
+    writer.append(_entry("alice", "2025-11-25", "ok"))
+    assert [e["mood"] for e in reader.history("alice")] == ["great", "ok"]
+
+
+def test_ignores_partially_written_line(tmp_path) -> None:
+    path = tmp_path / "wellness_log.jsonl"
+    store = JsonlWellnessStore(path)
+    store.append(_entry("alice", "2025-11-24", "great"))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"user": "alice", "mo')
+
+    assert len(JsonlWellnessStore(path)) == 1
+
+
+def test_migrates_legacy_json_array_once(tmp_path) -> None:
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(json.dumps([{"date": "2025-11-24T21:38:41Z", "mood": "great"}]))
+
+    store = open_store(tmp_path)
+    assert [e["mood"] for e in store.history()] == ["great"]
+    assert not legacy.exists()
+    assert (tmp_path / "wellness_log.json.migrated").exists()
+
+    assert migrate_json_array(legacy, store) == 0
+    assert len(open_store(tmp_path)) == 1
+
+
+def test_sharded_store_keeps_one_journal_per_user(tmp_path) -> None:
+    store = ShardedWellnessStore(tmp_path / "users")
+    store.append(_entry("alice", "2025-11-24", "great"))
+    store.append(_entry("bob/../x", "2025-11-24", "tired"))
+    store.append(_entry("alice", "2025-11-25", "ok"))
+
+    assert [e["mood"] for e in store.recent("alice", limit=1)] == ["ok"]
+    assert [e["mood"] for e in store.for_date("2025-11-24", user="bob/../x")] == ["tired"]
+    assert store.shard_path("bob/../x").parent.parent == tmp_path / "users"
+    assert sorted(store.users()) == ["alice", "bob/../x"]
+    assert len(store) == 3
+
+
+def test_splits_single_journal_into_shards_once(tmp_path) -> None:
+    journal = JsonlWellnessStore(tmp_path / "wellness_log.jsonl")
+    for i in range(5):
+        journal.append(_entry(f"user{i % 2}", f"2025-11-{20 + i}", "ok"))
+
+    store = open_store(tmp_path)
+    assert len(store) == 5
+    assert [e["date"][:10] for e in store.history("user0")] == ["2025-11-20", "2025-11-22", "2025-11-24"]
+    assert (tmp_path / "wellness_log.jsonl.migrated").exists()
+    assert migrate_journal(tmp_path / "wellness_log.jsonl", store) == 0
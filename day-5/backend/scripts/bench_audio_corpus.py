@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""CPU cost of the audio front end (VAD, noise cancellation, turn detector).
+
+Streams every WAV file in a directory through the components `entrypoint`
+configures, in 10 ms frames, with no LiveKit room. The rate is either as
+fast as possible or paced in real time (`--realtime`). Each configuration
+reports:
+
+- real-time factor (wall time / audio time) and CPU ms per audio second,
+  from process CPU time, so the inference threads are included
+- RSS and peak RSS
+- speech segments found, and how often the VAD's speaking state agrees
+  with the first configuration (per 10 ms of audio)
+
+Configurations:
+
+- `vad`: Silero VAD as loaded in `prewarm`
+- `vad-8k`: the VAD at 8 kHz inference
+- `bvc+vad`: `noise_cancellation.BVC()` in front of the VAD, as in
+  `RoomInputOptions`. The filter only runs inside an `rtc.AudioStream`,
+  which paces frames in real time whatever `--realtime` says. The current
+  SDK also refuses to apply it to a track that has no room ("this track
+  has no room information"), so offline this configuration reports
+  itself as unavailable. Measure BVC on a worker in a LiveKit Cloud room.
+
+With `--eou`, each file's sidecar transcript (`name.txt`) is scored by the
+multilingual turn detector at every end of speech. That reports CPU ms per
+prediction. The model must be downloaded first (`download-files`).
+
+Usage: python scripts/bench_audio_corpus.py CORPUS_DIR [--config vad bvc+vad] [--realtime] [--eou]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import psutil
+from livekit import rtc
+from livekit.agents import vad as agents_vad
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import shared_models  # noqa: E402
+
+FRAME_MS = 10
+CONFIGS = {
+    "vad": {"sample_rate": 16000, "noise_cancellation": False},
+    "vad-8k": {"sample_rate": 8000, "noise_cancellation": False},
+    "bvc+vad": {"sample_rate": 16000, "noise_cancellation": True},
+}
+
+
+def read_wav(path: Path) -> tuple[int, np.ndarray]:
+    """Sample rate and mono int16 samples of a 16-bit PCM WAV file."""
+    with wave.open(str(path), "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: only 16-bit PCM is supported")
+        rate, channels = f.getframerate(), f.getnchannels()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return rate, samples
+
+
+def to_frames(rate: int, samples: np.ndarray) -> list[rtc.AudioFrame]:
+    size = rate * FRAME_MS // 1000
+    return [
+        rtc.AudioFrame(samples[i : i + size].tobytes(), rate, 1, len(samples[i : i + size]))
+        for i in range(0, len(samples) - size + 1, size)
+    ]
+
+
+async def paced(frames: list[rtc.AudioFrame], realtime: bool):
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        if realtime:
+            await asyncio.sleep(max(0.0, start + i * FRAME_MS / 1000 - time.perf_counter()))
+        yield frame
+
+
+async def denoise(frames: list[rtc.AudioFrame], options) -> list[rtc.AudioFrame]:
+    """Run frames through a local track's `AudioStream` with noise cancellation."""
+    rate = frames[0].sample_rate
+    source = rtc.AudioSource(rate, 1)
+    track = rtc.LocalAudioTrack.create_audio_track("corpus", source)
+    try:
+        stream = rtc.AudioStream.from_track(
+            track=track, sample_rate=rate, num_channels=1, noise_cancellation=options
+        )
+    except AssertionError:
+        await source.aclose()
+        raise RuntimeError("the SDK rejected the audio filter for a track without a room") from None
+    out: list[rtc.AudioFrame] = []
+
+    async def feed() -> None:
+        # The stream subscribes asynchronously; lead in with silence
+        silence = np.zeros(rate * FRAME_MS // 1000, dtype=np.int16).tobytes()
+        for _ in range(20):
+            await source.capture_frame(rtc.AudioFrame(silence, rate, 1, len(silence) // 2))
+        for frame in frames:
+            await source.capture_frame(frame)
+        await source.wait_for_playout()
+        await asyncio.sleep(0.2)
+        await stream.aclose()
+
+    task = asyncio.create_task(feed())
+    async for event in stream:
+        out.append(event.frame)
+    await task
+    await source.aclose()
+    return out[-len(frames) :]
+
+
+async def detect(vad: agents_vad.VAD, frames, realtime: bool) -> dict:
+    """Speech segments, per-10 ms speaking states, and end-of-speech times."""
+    stream = vad.stream()
+    states: list[tuple[float, bool]] = []
+    ends: list[float] = []
+    segments = 0
+    rate = vad._opts.sample_rate
+
+    async def feed() -> None:
+        async for frame in paced(frames, realtime):
+            stream.push_frame(frame)
+        stream.end_input()
+
+    task = asyncio.create_task(feed())
+    async for event in stream:
+        position = event.samples_index / rate
+        if event.type == agents_vad.VADEventType.INFERENCE_DONE:
+            states.append((position, event.speaking))
+        elif event.type == agents_vad.VADEventType.START_OF_SPEECH:
+            segments += 1
+        elif event.type == agents_vad.VADEventType.END_OF_SPEECH:
+            ends.append(position)
+    await task
+    await stream.aclose()
+
+    timeline = []
+    step, i, speaking = FRAME_MS / 1000, 0, False
+    for n in range(len(frames)):
+        while i < len(states) and states[i][0] <= n * step:
+            speaking = states[i][1]
+            i += 1
+        timeline.append(speaking)
+    return {"segments": segments, "timeline": timeline, "ends": ends}
+
+
+def load_vad(config: dict) -> agents_vad.VAD:
+    from livekit.plugins import silero
+
+    if config["sample_rate"] == 16000:
+        return shared_models.vad()
+    return silero.VAD.load(sample_rate=config["sample_rate"])
+
+
+async def run_config(name: str, corpus: list[Path], realtime: bool) -> dict:
+    config = CONFIGS[name]
+    vad = load_vad(config)
+    options = None
+    if config["noise_cancellation"]:
+        from livekit.plugins import noise_cancellation
+
+        options = noise_cancellation.BVC()
+
+    audio_seconds = 0.0
+    detections = {}
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for path in corpus:
+        frames = to_frames(*read_wav(path))
+        audio_seconds += len(frames) * FRAME_MS / 1000
+        if options is not None:
+            frames = await denoise(frames, options)
+        detections[path.name] = await detect(vad, frames, realtime)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    return {
+        "config": name,
+        "files": len(corpus),
+        "audio_s": round(audio_seconds, 1),
+        "rtf": round(wall / audio_seconds, 4),
+        "cpu_ms_per_audio_s": round(cpu * 1000 / audio_seconds, 2),
+        "rss_mb": round(psutil.Process().memory_info().rss / 2**20, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "segments": sum(d["segments"] for d in detections.values()),
+        "detections": detections,
+    }
+
+
+def agreement(a: dict, b: dict) -> float:
+    same = total = 0
+    for name, det in a["detections"].items():
+        other = b["detections"].get(name)
+        if other is None:
+            continue
+        n = min(len(det["timeline"]), len(other["timeline"]))
+        same += sum(x == y for x, y in zip(det["timeline"][:n], other["timeline"][:n]))
+        total += n
+    return round(100 * same / total, 2) if total else 0.0
+
+
+def score_turns(corpus: list[Path], detections: dict) -> dict:
+    """CPU cost of one EOU prediction per end of speech, on the sidecar transcripts."""
+    from livekit.plugins.turn_detector.multilingual import _EUORunnerMultilingual
+
+    runner = _EUORunnerMultilingual()
+    runner.initialize()
+    latencies = []
+    cpu_start = time.process_time()
+    for path in corpus:
+        transcript = path.with_suffix(".txt")
+        if not transcript.exists():
+            continue
+        words = transcript.read_text().split()
+        ends = detections[path.name]["ends"] or [0.0]
+        for k in range(1, len(ends) + 1):
+            # Without word timings, reveal the transcript in proportion to the segments
+            text = " ".join(words[: max(1, len(words) * k // len(ends))])
+            data = json.dumps({"chat_ctx": [{"role": "user", "content": text}]}).encode()
+            start = time.perf_counter()
+            runner.run(data)
+            latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu_start
+    if not latencies:
+        return {"predictions": 0}
+    latencies.sort()
+    return {
+        "predictions": len(latencies),
+        "cpu_ms_per_prediction": round(cpu * 1000 / len(latencies), 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=Path, help="directory of 16-bit PCM WAV files")
+    parser.add_argument("--config", nargs="+", choices=list(CONFIGS), default=["vad", "bvc+vad"])
+    parser.add_argument("--realtime", action="store_true", help="pace frames in real time")
+    parser.add_argument("--eou", action="store_true", help="score sidecar transcripts")
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    corpus = sorted(args.corpus.glob("*.wav"))
+    if not corpus:
+        raise SystemExit(f"no .wav files in {args.corpus}")
+
+    results = []
+    for name in args.config:
+        try:
+            result = await run_config(name, corpus, args.realtime)
+        except Exception as e:
+            print(f"{name:8} unavailable: {e!r}")
+            continue
+        if results:
+            result["agreement_pct"] = agreement(results[0], result)
+        results.append(result)
+        print(
+            f"{name:8} {result['audio_s']:7.1f} s audio  rtf {result['rtf']:.4f}  "
+            f"cpu {result['cpu_ms_per_audio_s']:6.2f} ms/s  rss {result['rss_mb']} MB  "
+            f"segments {result['segments']}  agreement {result.get('agreement_pct', 100.0)}%"
+        )
+
+    report: dict = {"configs": results}
+    if args.eou and results:
+        try:
+            report["eou"] = score_turns(corpus, results[0]["detections"])
+            print(f"eou      {report['eou']}")
+        except Exception as e:
+            print(f"eou      unavailable: {e}")
+
+    if args.output:
+        for result in results:
+            for det in result["detections"].values():
+                del det["timeline"]
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Prompt size over a long scripted call, with and without the context policy.
+
+Plays a scripted call of `--turns` user turns through the SDR agent in a
+text-only `AgentSession`, once sending the full history to the LLM
+(`CONTEXT_KEEP_TURNS=0`) and once with the context policy. The LLM is a stub
+that answers instantly: every few turns it calls `lookup_faq` or
+`update_lead`, otherwise it gives a short reply. It records the size of
+every request. Summaries come from a second stub with `--summary-delay`
+latency, so they finish between turns as a real summarizer would, off the
+critical path.
+
+For each mode it reports the prompt size of the first request of every
+tenth turn, the largest and mean request, and whether the last request still
+carried every `update_lead` call. Token counts are estimated at 4
+characters per token; the instructions are included, the tool schemas are
+not (they are the same in both modes).
+
+Usage: python scripts/bench_context.py [--turns 60] [--keep-turns 6] [--summary-delay 0.05]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from livekit.agents import (  # noqa: E402
+    DEFAULT_API_CONNECT_OPTIONS,
+    AgentSession,
+    APIConnectOptions,
+    NotGivenOr,
+    llm,
+)
+from livekit.agents.types import NOT_GIVEN  # noqa: E402
+
+from agent import Assistant  # noqa: E402
+from lead_store import FIELDS, open_store  # noqa: E402
+
+# (turn, tool, arguments): the turns on which the stub LLM calls a tool
+LEAD_UPDATES = [
+    (2, "update_lead", {"name": "Priya"}),
+    (5, "update_lead", {"company": "Acme Payments", "role": "CTO"}),
+    (14, "update_lead", {"email": "priya at acme dot io"}),
+    (27, "update_lead", {"team_size": "40"}),
+    (41, "update_lead", {"use_case": "subscriptions for a SaaS product"}),
+    (55, "update_lead", {"timeline": "soon"}),
+]
+FAQ_EVERY = 4
+
+USER_LINES = [
+    "We run a subscription business and are looking at payment providers.",
+    "How do refunds work if a customer cancels halfway through a month?",
+    "Our finance team wants to understand settlement timelines in detail.",
+    "Can you walk me through what the onboarding looks like for a company like ours?",
+    "We also sell in a couple of other countries, does that change anything?",
+]
+
+
+def tokens(chars: int) -> int:
+    return round(chars / 4)
+
+
+def prompt_chars(chat_ctx: llm.ChatContext) -> int:
+    chars = 0
+    for item in chat_ctx.items:
+        if item.type == "message":
+            chars += len(item.text_content or "")
+        elif item.type == "function_call":
+            chars += len(item.name) + len(item.arguments)
+        elif item.type == "function_call_output":
+            chars += len(item.output)
+    return chars
+
+
+def script(turns: int) -> list[str]:
+    lines = []
+    for turn in range(1, turns + 1):
+        line = USER_LINES[turn % len(USER_LINES)]
+        lines.append(f"Turn {turn}. {line}")
+    return lines
+
+
+class StubStream(llm.LLMStream):
+    def __init__(self, llm_: llm.LLM, *, chunks: list[llm.ChatChunk], delay: float = 0.0, **kwargs):
+        super().__init__(llm_, **kwargs)
+        self._chunks = chunks
+        self._delay = delay
+
+    async def _run(self) -> None:
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        for chunk in self._chunks:
+            self._event_ch.send_nowait(chunk)
+
+
+def _text(text: str) -> list[llm.ChatChunk]:
+    return [llm.ChatChunk(id="stub", delta=llm.ChoiceDelta(role="assistant", content=text))]
+
+
+class AgentLLM(llm.LLM):
+    """Replies from the script and records the size of every request."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests: list[dict] = []
+        self._calls = {turn: (tool, args) for turn, tool, args in LEAD_UPDATES}
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict] = NOT_GIVEN,
+    ) -> StubStream:
+        last = chat_ctx.items[-1]
+        self.requests.append(
+            {
+                "chars": prompt_chars(chat_ctx),
+                "after_user": last.type == "message" and last.role == "user",
+                "lead_calls": sum(
+                    1 for i in chat_ctx.items if i.type == "function_call" and i.name == "update_lead"
+                ),
+            }
+        )
+        if last.type == "message" and last.role == "user":
+            # The policy drops older user messages, so read the turn number
+            # from the message rather than counting them
+            turn = int((last.text_content or "").split(".")[0].split()[-1])
+            call = self._calls.get(turn)
+            if call is None and turn % FAQ_EVERY == 0:
+                call = ("lookup_faq", {"question": "How do refunds work?"})
+            if call is not None:
+                tool, args = call
+                if tool == "update_lead":
+                    # Strict tool schemas: every field is sent, unset ones as null
+                    args = {field: args.get(field) for field in FIELDS}
+                chunks = [
+                    llm.ChatChunk(
+                        id="stub",
+                        delta=llm.ChoiceDelta(
+                            role="assistant",
+                            tool_calls=[
+                                llm.FunctionToolCall(
+                                    name=tool, arguments=json.dumps(args), call_id=f"call_{turn}"
+                                )
+                            ],
+                        ),
+                    )
+                ]
+            else:
+                chunks = _text(
+                    "Thanks, that's really helpful to know. Could you tell me a little more about "
+                    "how your team handles payments today and what you would like to improve?"
+                )
+        else:
+            chunks = _text("Got it, I have noted that down. What else would you like to know?")
+        return StubStream(
+            self, chunks=chunks, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options
+        )
+
+
+class SummaryLLM(llm.LLM):
+    """Keeps the last ~600 characters of what it is given, after a delay."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools: list | None = None,
+             conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> StubStream:
+        self.calls += 1
+        text = " ".join((chat_ctx.items[-1].text_content or "").split())
+        return StubStream(
+            self,
+            chunks=_text(text[-600:]),
+            delay=self.delay,
+            chat_ctx=chat_ctx,
+            tools=tools or [],
+            conn_options=conn_options,
+        )
+
+
+async def run_call(turns: int, keep_turns: int, summary_delay: float, leads_dir: str) -> dict:
+    os.environ["CONTEXT_KEEP_TURNS"] = str(keep_turns)
+    agent_llm = AgentLLM()
+    summary_llm = SummaryLLM(summary_delay)
+    async with AgentSession(llm=agent_llm) as session:
+        agent = Assistant(leads=open_store(leads_dir), summary_llm=summary_llm)
+        await session.start(agent)
+        for line in script(turns):
+            await session.run(user_input=line)
+            # A caller takes a few seconds to answer; give the summary its turn
+            await asyncio.sleep(summary_delay * 2)
+    await agent._writer.aclose()
+
+    firsts = [r for r in agent_llm.requests if r["after_user"]]
+    sizes = [tokens(r["chars"]) for r in agent_llm.requests]
+    return {
+        "keep_turns": keep_turns or "all",
+        "requests": len(sizes),
+        "prompt_tokens_by_turn": {
+            str(t): tokens(firsts[t - 1]["chars"]) for t in range(10, turns + 1, 10)
+        },
+        "max_prompt_tokens": max(sizes),
+        "mean_prompt_tokens": round(sum(sizes) / len(sizes)),
+        "summaries": summary_llm.calls,
+        "lead_calls_in_last_request": f"{agent_llm.requests[-1]['lead_calls']}/{len(LEAD_UPDATES)}",
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--keep-turns", type=int, default=6)
+    parser.add_argument("--summary-delay", type=float, default=0.05, help="stub summary latency (s)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            await run_call(args.turns, 0, args.summary_delay, os.path.join(tmp, "full")),
+            await run_call(args.turns, args.keep_turns, args.summary_delay, os.path.join(tmp, "policy")),
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Relevance and latency of `lookup_faq`, and the prompt size it saves.
+
+Runs every question in `faq_questions.json` (a spoken-style question and
+the id of the entry that answers it) through the FAQ index and reports:
+
+- top-1 accuracy, recall@k and mean reciprocal rank
+- search latency per question (p50/p99/max over `--repeat` runs)
+- what every LLM turn sends: the instructions with the whole FAQ pasted
+  in, vs. the instructions plus the `lookup_faq` tool schema; and the
+  average tool result, which is only added on turns that ask a question
+
+Token counts are estimated at 4 characters per token.
+
+Usage: python scripts/bench_faq.py [--faq src/faq.json] [--k 3] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from faq import FAQ_PATH, FaqIndex  # noqa: E402
+
+QUESTIONS = Path(__file__).with_name("faq_questions.json")
+
+
+def tokens(text: str) -> int:
+    return round(len(text) / 4)
+
+
+def relevance(index: FaqIndex, questions: list[dict], k: int) -> dict:
+    top1 = recall = rr = 0.0
+    misses = []
+    for q in questions:
+        ids = [hit.entry.id for hit in index.search(q["question"], k)]
+        rank = ids.index(q["expected"]) + 1 if q["expected"] in ids else None
+        top1 += rank == 1
+        recall += rank is not None
+        rr += 1 / rank if rank else 0.0
+        if rank != 1:
+            misses.append({"question": q["question"], "expected": q["expected"], "got": ids})
+    n = len(questions)
+    return {
+        "questions": n,
+        "top1": round(top1 / n, 3),
+        f"recall@{k}": round(recall / n, 3),
+        "mrr": round(rr / n, 3),
+        "misses": misses,
+    }
+
+
+def latency(index: FaqIndex, questions: list[dict], k: int, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        for q in questions:
+            start = time.perf_counter()
+            index.search(q["question"], k)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 1),
+        "max_us": round(samples[-1] * 1e6, 1),
+    }
+
+
+def prompt_size(index: FaqIndex, questions: list[dict], k: int) -> dict:
+    from livekit.agents import llm
+
+    from agent import Assistant
+
+    agent = Assistant(faq=index)
+    schemas = [llm.utils.build_legacy_openai_schema(tool) for tool in agent.tools]
+    tool_schema = json.dumps(schemas)
+    results = [
+        json.dumps(
+            [{"question": h.entry.question, "answer": h.entry.answer} for h in index.search(q["question"], k)]
+        )
+        for q in questions
+    ]
+    pasted = agent.instructions + "\n\nCompany FAQ:\n" + index.as_text()
+    with_tool = agent.instructions + tool_schema
+    return {
+        "pasted_faq_tokens_per_turn": tokens(pasted),
+        "tool_tokens_per_turn": tokens(with_tool),
+        "tool_result_tokens_mean": round(sum(map(tokens, results)) / len(results)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faq", default=str(FAQ_PATH))
+    parser.add_argument("--questions", default=str(QUESTIONS))
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = FaqIndex.load(args.faq)
+    build_ms = (time.perf_counter() - start) * 1000
+    questions = json.loads(Path(args.questions).read_text())
+
+    report = {
+        "entries": len(index.entries),
+        "build_ms": round(build_ms, 2),
+        **relevance(index, questions, args.k),
+        "latency": latency(index, questions, args.k, args.repeat),
+        "prompt": prompt_size(index, questions, args.k),
+    }
+    print(
+        f"{report['entries']} entries, built in {report['build_ms']} ms; "
+        f"{report['questions']} questions  top-1 {report['top1']:.1%}  "
+        f"recall@{args.k} {report[f'recall@{args.k}']:.1%}  MRR {report['mrr']:.3f}"
+    )
+    lat = report["latency"]
+    print(f"search p50 {lat['p50_us']} us  p99 {lat['p99_us']} us  max {lat['max_us']} us")
+    prompt = report["prompt"]
+    print(
+        f"prompt per turn: ~{prompt['pasted_faq_tokens_per_turn']} tokens with the FAQ pasted, "
+        f"~{prompt['tool_tokens_per_turn']} with lookup_faq "
+        f"(+~{prompt['tool_result_tokens_mean']} per lookup)"
+    )
+    for miss in report["misses"]:
+        print(f"  miss: {miss['question']!r} expected {miss['expected']}, got {miss['got']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Memory and process count of three persona workers vs one multi-persona worker.
+
+"separate" runs the barista, wellness and SDR agents as three workers, the
+way each day's `agent.py` starts. "combined" runs `personas.py` as one
+worker. Each worker stand-in does what the worker does before its first
+job:
+
+- imports its plugins and enables the shared models (`startup.run_app`)
+- starts a forkserver that preloads them
+- forks `--idle` job processes that run its `prewarm`
+- forks one inference process that loads the turn detector (it reports
+  the error and stays up without the model if the files are missing)
+
+Once every process is up, the script adds up their PSS (shared pages are
+split between the processes sharing them, so PSS adds up across workers)
+and USS, and counts the processes. `--idle` defaults to the CPU count,
+the worker's default in production; each separate worker keeps that many
+idle processes, so the separate setup has three times as many.
+
+    uv run python scripts/bench_personas.py --idle 4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import psutil
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+SEPARATE = ("barista", "wellness", "sdr")
+
+
+def _setup(worker: str):
+    """The worker's plugins and prewarm function."""
+    import personas
+
+    if worker == "combined":
+        return personas.plugins(), personas.prewarm
+    module = personas.load(worker)
+    return module.PLUGINS, module.prewarm
+
+
+def job_process(worker: str, ready, release) -> None:
+    from livekit.agents import JobExecutorType, JobProcess
+
+    _, prewarm = _setup(worker)
+    proc = JobProcess(executor_type=JobExecutorType.PROCESS, user_arguments=None, http_proxy=None)
+    prewarm(proc)
+    ready.put({"role": "job"})
+    release.wait()
+
+
+def inference_process(ready, release) -> None:
+    from livekit.agents.inference_runner import _InferenceRunner
+
+    report = {"role": "inference"}
+    try:
+        for runner_cls in _InferenceRunner.registered_runners.values():
+            runner_cls().initialize()
+    except Exception as e:
+        # Usually the model files are missing: `download-files` fetches them
+        report["error"] = str(e)
+    ready.put(report)
+    release.wait()
+
+
+def run_worker(worker: str, idle: int) -> None:
+    """Runs in its own interpreter, like a worker; stops when stdin closes."""
+    import shared_models
+    from startup import load_plugins
+
+    plugins, _ = _setup(worker)
+    load_plugins(plugins)
+    shared_models.enable()
+    preload = [f"livekit.plugins.{name}" for name in plugins] + ["av"]
+    if shared_models.enabled():
+        preload.append("shared_models")
+
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload(preload)
+    ready, release = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=inference_process, args=(ready, release))]
+    procs += [ctx.Process(target=job_process, args=(worker, ready, release)) for _ in range(idle)]
+    for proc in procs:
+        proc.start()
+    reports = [ready.get(timeout=300) for _ in procs]
+    errors = sorted({r["error"] for r in reports if "error" in r})
+    print(json.dumps({"worker": worker, "errors": errors}), flush=True)
+    sys.stdin.read()
+    release.set()
+    for proc in procs:
+        proc.join()
+
+
+def measure(pids: list[int]) -> dict:
+    """Total memory of these processes and their descendants."""
+    processes = []
+    for pid in pids:
+        root = psutil.Process(pid)
+        processes += [root, *root.children(recursive=True)]
+    totals = {"processes": len(processes), "pss_mb": 0.0, "uss_mb": 0.0, "rss_mb": 0.0}
+    for process in processes:
+        try:
+            info = process.memory_full_info()
+        except (psutil.AccessDenied, psutil.NoSuchProcess, AttributeError):
+            continue
+        for field in ("pss", "uss", "rss"):
+            totals[f"{field}_mb"] += getattr(info, field, 0) / 2**20
+    return {k: round(v, 1) if isinstance(v, float) else v for k, v in totals.items()}
+
+
+def run_setup(name: str, workers: tuple[str, ...], idle: int) -> dict:
+    with tempfile.TemporaryDirectory() as cwd:
+        # The prewarms create their caches in the working directory
+        stand_ins = [
+            subprocess.Popen(
+                [sys.executable, __file__, "--worker", worker, "--idle", str(idle)],
+                cwd=cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for worker in workers
+        ]
+        try:
+            started = [json.loads(p.stdout.readline()) for p in stand_ins]
+            report = {"setup": name, "workers": len(workers), "idle_job_processes": idle * len(workers)}
+            report.update(measure([p.pid for p in stand_ins]))
+            report["errors"] = sorted({e for s in started for e in s["errors"]})
+        finally:
+            for p in stand_ins:
+                p.stdin.close()
+            for p in stand_ins:
+                p.wait(timeout=60)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=int, default=os.cpu_count(), help="idle processes per worker")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.idle)
+        return
+
+    reports = [
+        run_setup("separate", SEPARATE, args.idle),
+        run_setup("combined", ("combined",), args.idle),
+    ]
+    for r in reports:
+        print(
+            f"{r['setup']:9} {r['workers']} worker(s)  {r['processes']:3} processes  "
+            f"{r['idle_job_processes']:3} idle jobs  pss {r['pss_mb']:8.1f} MB  "
+            f"uss {r['uss_mb']:8.1f} MB  rss {r['rss_mb']:8.1f} MB"
+        )
+    for error in reports[0]["errors"]:
+        print(f"note: {error}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
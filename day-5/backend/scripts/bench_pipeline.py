@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark of the voice assistant with stub providers.
+
+Runs `--sessions` concurrent `AgentSession`s of the day-5 `Assistant`
+through a scripted small-talk conversation using the stub STT/LLM/TTS in
+`pipeline_bench.py`, and prints one JSON object with per-turn latency,
+framework overhead (latency minus stub provider time), event-loop lag and
+memory per session.
+
+Usage: python scripts/bench_pipeline.py [--sessions 10] [--llm-ttft 0.4] [--output result.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline_bench import add_profile_arguments, profile_from_args, run_benchmark  # noqa: E402
+
+CONVERSATION = [
+    {"user": "Hello there!", "llm": ["Hi! How can I help you today?"]},
+    {"user": "What's a good book for a long flight?", "llm": ["Try The Martian. It's funny, fast and hard to put down."]},
+    {"user": "Anything shorter?", "llm": ["Then Of Mice and Men. You'll finish it before landing."]},
+    {"user": "Thanks, that's all.", "llm": ["Enjoy your flight!"]},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    from agent import Assistant
+
+    result = asyncio.run(
+        run_benchmark("day-5 assistant", Assistant, CONVERSATION, profile_from_args(args), args.sessions)
+    )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Export captured leads to CSV or JSONL.
+
+Streams every lead's latest snapshot from the lead journal, one row at a
+time, so the export does not hold the leads in memory. `--drafts` adds
+the fields heard in calls that were never finalized, and
+`--finalize-drafts` merges those drafts into leads first, e.g. after a
+worker died mid-call.
+
+Usage: python scripts/export_leads.py [--dir leads] [--format csv] [--output leads.csv]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from lead_store import open_store  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", help="lead journal directory (default: ./leads)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--output", help="write here instead of stdout")
+    parser.add_argument("--drafts", action="store_true", help="include unfinalized drafts")
+    parser.add_argument("--finalize-drafts", action="store_true", help="finalize open drafts first")
+    args = parser.parse_args()
+
+    store = open_store(args.dir)
+    if args.finalize_drafts:
+        print(f"finalized {store.finalize_all()} draft(s)", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            count = store.export(out, args.format, drafts=args.drafts)
+    else:
+        count = store.export(sys.stdout, args.format, drafts=args.drafts)
+    print(f"exported {count} row(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+import asyncio
 import logging
+import uuid
+from typing import Optional
 
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -9,29 +12,139 @@ from livekit.agents import (
     MetricsCollectedEvent,
     RoomInputOptions,
     WorkerOptions,
-    cli,
     metrics,
-    tokenize,
-    # function_tool,
-    # RunContext
+    function_tool,
+    llm,
+    RunContext,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+import capacity
+import provider_pool
+import shared_models
+import turn_batching
+from context_policy import ContextPolicy
+from faq import FaqIndex, load_faq
+from latency_metrics import SessionLatency, dispatched_at, worker_options
+from lead_store import FIELDS, LeadStore, open_store
+from session_journal import SessionJournal
+from startup import run_app, startup_step
+from text_segmentation import tts_tokenizer
+from write_behind import WriteBehindWriter
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+# Provider plugins used by the pipeline, imported lazily where they are
+# used; the worker process registers exactly these (see startup.py)
+PLUGINS = (
+    "deepgram",
+    "google",
+    "murf",
+    "silero",
+    "turn_detector.multilingual",
+    "noise_cancellation",
+)
+
 
 class Assistant(Agent):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        faq: Optional[FaqIndex] = None,
+        leads: Optional[LeadStore] = None,
+        writer: Optional[WriteBehindWriter] = None,
+        session_id: Optional[str] = None,
+        summary_llm: Optional[llm.LLM] = None,
+    ) -> None:
+        # Compiled FAQ index, searched by `lookup_faq` instead of pasting
+        # the whole FAQ into the instructions
+        self._faq = faq if faq is not None else load_faq()
+        # Lead fields are persisted as deltas, off the event loop, as they are heard
+        self._leads = leads if leads is not None else open_store()
+        self._writer = writer if writer is not None else WriteBehindWriter(self._leads.append)
+        self._session_id = session_id or uuid.uuid4().hex
+        self._lead: dict = {}
+        # Long calls send recent turns verbatim and a summary of the rest;
+        # lead updates are always kept
+        self._context = ContextPolicy.from_env(state_tools=("update_lead",))
+        self._summary_llm = summary_llm
+        company = self._faq.company or "the company"
+
         super().__init__(
-            instructions="""You are a helpful voice AI assistant. The user is interacting with you via voice, even if you perceive the conversation as text.
-            You eagerly assist users with their questions by providing information from your extensive knowledge.
+            instructions=f"""You are a friendly sales development representative (SDR) for {company}. The user is interacting with you via voice, even if you perceive the conversation as text.
+            Greet the visitor warmly, ask what brought them here and what they are working on, and keep the conversation focused on understanding their needs.
+            When the user asks about {company}'s products, pricing, company or policies, call the tool `lookup_faq` with their question and answer only from the entries it returns. If it finds nothing relevant, say you don't know and offer to have the sales team follow up. Never make up prices or features.
+            Over the conversation, naturally ask for the visitor's name, company, work email, role, what they want to use {company} for, their team size and their timeline (now, soon or later), one question at a time. As soon as the user tells you any of these, call the tool `update_lead` with just the new details; do not wait for the end of the call.
             Your responses are concise, to the point, and without any complex formatting or punctuation including emojis, asterisks, or other symbols.
             You are curious, friendly, and have a sense of humor.""",
         )
 
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        chat_ctx = self._context.apply(chat_ctx, self._summary_llm or self.session.llm)
+        return Agent.default.llm_node(self, chat_ctx, tools, model_settings)
+
+    @function_tool
+    async def lookup_faq(self, context: RunContext, question: str):
+        """Search the company FAQ for entries that answer the user's question.
+
+        Args:
+            question: the user's question about the company, its products or pricing.
+        """
+        hits = self._faq.search(question)
+        if not hits:
+            return {"status": "not_found"}
+        return {
+            "status": "ok",
+            "results": [{"question": h.entry.question, "answer": h.entry.answer} for h in hits],
+        }
+
+    @function_tool
+    async def update_lead(
+        self,
+        context: RunContext,
+        name: Optional[str] = None,
+        company: Optional[str] = None,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        role: Optional[str] = None,
+        use_case: Optional[str] = None,
+        team_size: Optional[str] = None,
+        timeline: Optional[str] = None,
+    ):
+        """Save lead details as soon as the user mentions them. Pass only the details just heard.
+
+        Args:
+            name: the visitor's name.
+            company: the company they work for.
+            email: their work email address.
+            phone: their phone number.
+            role: their role or job title.
+            use_case: what they want to use the product for.
+            team_size: how many people are on their team.
+            timeline: when they want to start: "now", "soon" or "later".
+        """
+        record, problems = self._leads.delta(
+            self._session_id,
+            {
+                "name": name,
+                "company": company,
+                "email": email,
+                "phone": phone,
+                "role": role,
+                "use_case": use_case,
+                "team_size": team_size,
+                "timeline": timeline,
+            },
+        )
+        if record is not None:
+            await self._writer.submit(record)
+            self._lead.update(record["fields"])
+        missing = [f for f in FIELDS if f != "phone" and f not in self._lead]
+        if problems:
+            # Ask the user to repeat or spell out what was rejected
+            return {"status": "error", "error": "; ".join(problems), "missing": missing}
+        return {"status": "ok", "missing": missing}
+
     # To add tools, use the @function_tool decorator.
     # Here's an example that adds a simple weather tool.
     # You also have to add `from livekit.agents import function_tool, RunContext` to the top of this file
@@ -51,21 +164,43 @@ class Assistant(Agent):
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    # Inherited from the forkserver unless SHARE_MODELS=0 (see shared_models.py)
+    with startup_step("silero_vad"):
+        proc.userdata["vad"] = shared_models.vad()
+    if turn_batching.enabled():
+        # One batched turn detector for every session in the process
+        with startup_step("turn_detector"):
+            turn_batching.service()
+    with startup_step("faq_index"):
+        proc.userdata["faq"] = load_faq()
+    with startup_step("lead_index"):
+        # Scans the journal once; jobs then only read what was appended since
+        leads = open_store()
+        leads.refresh()
+        proc.userdata["leads"] = leads
+    logger.info(f"Job process memory: {shared_models.memory_usage()}")
 
 
 async def entrypoint(ctx: JobContext):
+    from livekit.plugins import deepgram, google, murf, noise_cancellation
+
     # Logging setup
     # Add any other context you want in all log entries here
     ctx.log_context_fields = {
         "room": ctx.room.name,
     }
+    latency = SessionLatency(agent="assistant", room=ctx.room.name, dispatched_at=dispatched_at(ctx.job))
+
+    # Join the room while the session is set up
+    connecting = asyncio.create_task(ctx.connect())
+    # Kept alive for the whole process rather than per job
+    http_session = provider_pool.http_session()
 
     # Set up a voice AI pipeline using OpenAI, Cartesia, AssemblyAI, and the LiveKit turn detector
     session = AgentSession(
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
         # See all available models at https://docs.livekit.io/agents/models/stt/
-        stt=deepgram.STT(model="nova-3"),
+        stt=deepgram.STT(model="nova-3", http_session=http_session),
         # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
         # See all available models at https://docs.livekit.io/agents/models/llm/
         llm=google.LLM(
@@ -76,17 +211,21 @@ async def entrypoint(ctx: JobContext):
         tts=murf.TTS(
                 voice="en-US-matthew", 
                 style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+                http_session=http_session,
+                tokenizer=tts_tokenizer(),
                 text_pacing=True
             ),
         # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
         # See more at https://docs.livekit.io/agents/build/turns
-        turn_detection=MultilingualModel(),
+        turn_detection=turn_batching.turn_detector(),
         vad=ctx.proc.userdata["vad"],
         # allow the LLM to generate a response while waiting for the end of turn
         # See more at https://docs.livekit.io/agents/build/audio/#preemptive-generation
         preemptive_generation=True,
     )
+    # Open the provider connections before the participant joins
+    warming = provider_pool.warm_up(session)
+    warming.add_done_callback(lambda _: latency.mark("providers_warm"))
 
     # To use a realtime model instead of a voice pipeline, use the following session setup instead.
     # (Note: This is for the OpenAI Realtime API. For other providers, see https://docs.livekit.io/agents/models/realtime/))
@@ -106,13 +245,38 @@ async def entrypoint(ctx: JobContext):
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        latency.observe(ev.metrics)
+
+    session.on("agent_state_changed", latency.on_agent_state)
+
+    # Transcripts, tool calls and metrics, for debugging the session later
+    journal = SessionJournal.from_env(agent="assistant", room=ctx.room.name, job_id=ctx.job.id)
+    if journal is not None:
+        journal.attach(session)
+        ctx.add_shutdown_callback(journal.aclose)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        logger.info(f"Turn latency: {latency.summary()}")
 
     ctx.add_shutdown_callback(log_usage)
 
+    # Every field heard is already in the journal; at the end of the call
+    # the session's draft is merged into its (deduplicated) lead
+    leads = ctx.proc.userdata.get("leads")
+    if leads is None:
+        leads = await asyncio.to_thread(open_store)
+    writer = WriteBehindWriter(leads.append)
+
+    async def finalize_lead():
+        await writer.aclose()
+        lead = await asyncio.to_thread(leads.finalize, ctx.job.id)
+        if lead is not None:
+            logger.info(f"Lead {lead['id']} updated: {sorted(lead['fields'])}")
+
+    ctx.add_shutdown_callback(finalize_lead)
+
     # # Add a virtual avatar to the session, if desired
     # # For other providers, see https://docs.livekit.io/agents/models/avatar/
     # avatar = hedra.AvatarSession(
@@ -122,18 +286,33 @@ async def entrypoint(ctx: JobContext):
     # await avatar.start(session, room=ctx.room)
 
     # Start the session, which initializes the voice pipeline and warms up the models
+    await connecting
     await session.start(
-        agent=Assistant(),
+        agent=Assistant(
+            faq=ctx.proc.userdata.get("faq"),
+            leads=leads,
+            writer=writer,
+            session_id=ctx.job.id,
+            # A separate instance, so summaries stay out of the turn metrics
+            summary_llm=google.LLM(model="gemini-2.5-flash-lite"),
+        ),
         room=ctx.room,
         room_input_options=RoomInputOptions(
             # For telephony applications, use `BVCTelephony` for best results
             noise_cancellation=noise_cancellation.BVC(),
         ),
     )
-
-    # Join the room and connect to the user
-    await ctx.connect()
+    latency.mark("ready")
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            **worker_options(),
+            **turn_batching.worker_options(),
+            **capacity.worker_options(),
+        ),
+        PLUGINS,
+    )
@@ -0,0 +1,156 @@
+"""Company FAQ for the SDR agent, behind a BM25 index.
+
+Pasting the whole FAQ into the instructions makes every LLM turn pay for
+it. Instead the agent calls `lookup_faq` with the user's question and gets
+back the few entries that answer it.
+
+The content is either JSON (`faq.json`: a `faq` list of entries with
+`id`, `question`, `answer` and optional `tags`) or Markdown (`## question`
+headings, each followed by its answer). `FaqIndex` compiles it once per
+process into an inverted index: term -> [(entry, weighted term count)].
+Questions and tags count `FIELD_WEIGHT` times per occurrence, since they
+say what an entry is about. A search only visits the postings of the query
+terms, so it takes microseconds on a company FAQ.
+
+Set `FAQ_PATH` to use another company's content.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+FAQ_PATH = Path(__file__).with_name("faq.json")
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+# Occurrences in the question and tags count this many times
+FIELD_WEIGHT = 2
+DEFAULT_TOP_K = 3
+
+_STOPWORDS = frozenset(
+    """a an and are as at be by can could do does from have i if in is it its
+    me my of on or our so that the their there this to us was we will with
+    would you your""".split()
+)
+
+
+def _stem(word: str) -> str:
+    """Folds plurals and a few verb forms ("prices", "pricing" -> "pric")."""
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)] + replacement
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 4 else word
+
+
+def tokenize(text: str) -> list[str]:
+    text = re.sub(r"'(s|re|m|ll|ve|d)\b", "", text.lower().replace("’", "'"))
+    words = re.findall(r"[a-z0-9]+", text)
+    return [_stem(word) for word in words if word not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class FaqEntry:
+    id: str
+    question: str
+    answer: str
+    tags: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FaqHit:
+    entry: FaqEntry
+    score: float
+
+
+def parse_markdown(text: str) -> list[FaqEntry]:
+    """Entries from `## question` headings and the text under them."""
+    entries = []
+    for block in re.split(r"^##\s+", text, flags=re.MULTILINE)[1:]:
+        question, _, answer = block.partition("\n")
+        answer = " ".join(answer.split())
+        if question.strip() and answer:
+            slug = "-".join(tokenize(question)) or str(len(entries))
+            entries.append(FaqEntry(id=slug, question=question.strip(), answer=answer))
+    return entries
+
+
+class FaqIndex:
+    """BM25 over the FAQ entries."""
+
+    def __init__(self, entries: list[FaqEntry], company: str = "", source: str = "") -> None:
+        self.entries = list(entries)
+        self.company = company
+        self.source = source
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        for i, entry in enumerate(self.entries):
+            counts: dict[str, int] = {}
+            for weight, text in (
+                (FIELD_WEIGHT, " ".join((entry.question, *entry.tags))),
+                (1, entry.answer),
+            ):
+                for term in tokenize(text):
+                    counts[term] = counts.get(term, 0) + weight
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append((i, count))
+            lengths.append(sum(counts.values()))
+        n = len(self.entries)
+        average = sum(lengths) / n if n else 1.0
+        # Per-entry length normalisation and per-term idf, precomputed
+        self._norm = [K1 * (1 - B + B * length / average) for length in lengths]
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def load(cls, path: str | Path = FAQ_PATH) -> FaqIndex:
+        path = Path(path)
+        text = path.read_text(encoding="utf-8")
+        if path.suffix.lower() in (".md", ".markdown"):
+            return cls(parse_markdown(text), source=str(path))
+        data = json.loads(text)
+        items = data["faq"] if isinstance(data, dict) else data
+        entries = [
+            FaqEntry(
+                id=str(item.get("id") or i),
+                question=item["question"],
+                answer=item["answer"],
+                tags=tuple(item.get("tags", ())),
+            )
+            for i, item in enumerate(items)
+        ]
+        if isinstance(data, dict):
+            return cls(entries, company=data.get("company", ""), source=data.get("source", ""))
+        return cls(entries)
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> list[FaqHit]:
+        """The best `k` entries for `query`, best first; only entries sharing a term."""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, count in self._postings[term]:
+                scores[i] = scores.get(i, 0.0) + idf * count * (K1 + 1) / (count + self._norm[i])
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [FaqHit(self.entries[i], round(score, 3)) for i, score in best]
+
+    def as_text(self) -> str:
+        """The whole FAQ as it would be pasted into the instructions."""
+        return "\n\n".join(f"Q: {e.question}\nA: {e.answer}" for e in self.entries)
+
+
+@lru_cache(maxsize=None)
+def load_faq(path: str | Path | None = None) -> FaqIndex:
+    """The index for `path` (default: `FAQ_PATH` or faq.json), built once per process."""
+    return FaqIndex.load(path or os.getenv("FAQ_PATH") or FAQ_PATH)
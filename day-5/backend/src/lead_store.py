@@ -0,0 +1,374 @@
+"""Lead capture for the SDR agent: field deltas, per-session drafts, dedup.
+
+The agent records each lead field as soon as the user says it, so a
+dropped call keeps what was heard. Everything is one append-only JSONL
+journal (`leads/leads.jsonl`) with two kinds of line:
+
+- `delta`: fields heard in a session. The deltas of a session fold into
+  its draft.
+- `lead`: a full snapshot of a lead, written when a session is finalized.
+  A session's draft merges into the lead that shares its normalized email
+  or phone number, or starts a new lead. The latest snapshot of a lead
+  wins.
+
+Each line is a single `write` on an `O_APPEND` descriptor under an
+exclusive `flock`, so lines are never torn or interleaved. `finalize` holds
+the lock while it looks up and merges, so two workers finalizing the same
+visitor cannot create two leads. The in-memory index keeps only the offset
+of each lead's latest snapshot, its dedup keys, and the open drafts. It
+is kept current by reading the bytes appended since the last scan. `export`
+streams the journal to CSV or JSONL without loading the leads.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TextIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+logger = logging.getLogger("agent")
+
+FIELDS = ("name", "company", "email", "phone", "role", "use_case", "team_size", "timeline")
+TIMELINES = ("now", "soon", "later")
+JOURNAL_FILENAME = "leads.jsonl"
+# Ten-digit numbers are taken as Indian mobile numbers
+DEFAULT_COUNTRY_CODE = "91"
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[a-z]{2,}$")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def normalize_email(value: str) -> str | None:
+    """Lowercased address, also from spoken forms ("sam at acme dot io")."""
+    text = value.strip().lower()
+    text = re.sub(r"\s+at\s+", "@", text)
+    text = re.sub(r"\s+dot\s+", ".", text)
+    text = "".join(text.split())
+    return text if _EMAIL.match(text) else None
+
+
+def normalize_phone(value: str) -> str | None:
+    """Digits with the country code, or None if it is not a phone number."""
+    digits = re.sub(r"\D", "", value)
+    if value.strip().startswith("00"):
+        digits = digits[2:]
+    if len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    if len(digits) == 10:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    return digits if 11 <= len(digits) <= 15 else None
+
+
+def normalize_fields(fields: dict) -> tuple[dict, list[str]]:
+    """Clean lead fields; returns the usable ones and a problem per rejected one."""
+    clean, problems = {}, []
+    for field, value in fields.items():
+        value = str(value or "").strip()
+        if not value:
+            continue
+        if field not in FIELDS:
+            problems.append(f"{field}: not a lead field")
+        elif field == "email":
+            email = normalize_email(value)
+            if email is None:
+                problems.append(f"email: {value!r} is not an email address")
+            else:
+                clean[field] = email
+        elif field == "phone":
+            phone = normalize_phone(value)
+            if phone is None:
+                problems.append(f"phone: {value!r} is not a phone number")
+            else:
+                clean[field] = phone
+        elif field == "timeline":
+            # Keep what was said if it is not clearly one of the buckets
+            word = value.lower()
+            clean[field] = next((t for t in TIMELINES if t in word.split()), value)
+        else:
+            clean[field] = value
+    return clean, problems
+
+
+def dedup_keys(fields: dict) -> list[str]:
+    keys = []
+    if fields.get("email"):
+        keys.append(f"email:{fields['email']}")
+    if fields.get("phone"):
+        keys.append(f"phone:{fields['phone']}")
+    return keys
+
+
+class LeadStore:
+    """Append-only lead journal with an index by lead, dedup key and session.
+
+    `delta` is cheap and safe to call on the event loop; `append` does the
+    disk write and is meant to run off-loop (it doubles as a write-behind
+    sink). `finalize` writes synchronously and should also run off-loop.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._indexed_to = 0
+        self._leads: dict[str, int] = {}  # lead id -> offset of its latest snapshot
+        self._by_key: dict[str, str] = {}  # dedup key -> lead id
+        self._by_session: dict[str, str] = {}  # finalized session -> lead id
+        self._merged: dict[str, str] = {}  # merged-away lead id -> the lead it joined
+        self._drafts: dict[str, dict] = {}  # session -> fields not yet finalized
+
+    def delta(self, session: str, fields: dict) -> tuple[dict | None, list[str]]:
+        """A delta record for the usable `fields`, ready to `append`, and the problems."""
+        clean, problems = normalize_fields(fields)
+        if not clean:
+            return None, problems
+        return {"type": "delta", "session": session, "fields": clean, "at": _now()}, problems
+
+    def append(self, records: list, sync: bool = False) -> None:
+        """Persist delta records and index them."""
+        data = b"".join(self._encode(record) for record in records)
+        fd = self._open()
+        try:
+            os.write(fd, data)
+            if sync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.refresh()
+
+    def finalize(self, session: str, sync: bool = True) -> dict | None:
+        """Merge the session's draft into its lead (deduplicated); returns the lead.
+
+        Returns None if the session has no draft.
+        """
+        fd = self._open()
+        try:
+            with self._lock:
+                self._refresh_locked()
+                draft = self._drafts.get(session)
+                if not draft:
+                    return None
+                record = self._merge(session, draft)
+                os.write(fd, self._encode(record))
+                if sync:
+                    os.fsync(fd)
+                # Indexes the new snapshot (the lock kept other writers out)
+                self._refresh_locked()
+        finally:
+            os.close(fd)
+        return record
+
+    def finalize_all(self) -> int:
+        """Finalize every open draft, e.g. from calls whose worker died."""
+        self.refresh()
+        with self._lock:
+            sessions = list(self._drafts)
+        return sum(self.finalize(session) is not None for session in sessions)
+
+    def draft(self, session: str) -> dict:
+        self.refresh()
+        with self._lock:
+            return dict(self._drafts.get(session, {}))
+
+    def get(self, lead_id: str) -> dict | None:
+        self.refresh()
+        with self._lock:
+            offset = self._leads.get(self._resolve(lead_id))
+        return self._read(offset) if offset is not None else None
+
+    def find(self, email: str | None = None, phone: str | None = None) -> dict | None:
+        """The lead with this email or phone number, in any spelling."""
+        keys = dedup_keys(
+            {"email": normalize_email(email or ""), "phone": normalize_phone(phone or "")}
+        )
+        self.refresh()
+        with self._lock:
+            lead_id = next((self._resolve(self._by_key[k]) for k in keys if k in self._by_key), None)
+        return self.get(lead_id) if lead_id is not None else None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._leads)
+
+    def leads(self) -> Iterator[dict]:
+        """Every lead's latest snapshot, streamed from the journal."""
+        self.refresh()
+        with self._lock:
+            latest = set(self._leads.values())
+            end = self._indexed_to
+        if not latest:
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for raw in f:
+                if offset >= end:
+                    break
+                if offset in latest:
+                    yield json.loads(raw)
+                offset += len(raw)
+
+    def export(self, out: TextIO, format: str = "jsonl", drafts: bool = False) -> int:
+        """Write every lead (and open drafts if `drafts`) to `out`; returns the count."""
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"format must be 'jsonl' or 'csv', got {format!r}")
+        rows = self._rows(drafts)
+        count = 0
+        if format == "csv":
+            writer = csv.DictWriter(
+                out, fieldnames=["id", "status", *FIELDS, "sessions", "created_at", "updated_at"]
+            )
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({**row, "sessions": " ".join(row["sessions"])})
+                count += 1
+        else:
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def _rows(self, drafts: bool) -> Iterator[dict]:
+        for lead in self.leads():
+            yield {
+                "id": lead["id"],
+                "status": "lead",
+                **lead["fields"],
+                "sessions": lead["sessions"],
+                "created_at": lead["created_at"],
+                "updated_at": lead["updated_at"],
+            }
+        if drafts:
+            with self._lock:
+                open_drafts = [(s, dict(d)) for s, d in self._drafts.items()]
+            for session, draft in open_drafts:
+                yield {"id": "", "status": "draft", **draft, "sessions": [session]}
+
+    def _merge(self, session: str, draft: dict) -> dict:
+        """The lead snapshot for `session`'s draft; called with the lock held."""
+        candidates = [self._by_session.get(session)]
+        candidates += [self._by_key.get(key) for key in dedup_keys(draft)]
+        matches: list[str] = []
+        for lead_id in candidates:
+            if lead_id is None:
+                continue
+            lead_id = self._resolve(lead_id)
+            if lead_id in self._leads and lead_id not in matches:
+                matches.append(lead_id)
+
+        now = _now()
+        fields: dict = {}
+        sessions: list[str] = []
+        created_at = now
+        # Oldest lead first, so the newest values win
+        leads = sorted((self._read(self._leads[i]) for i in matches), key=lambda r: r["created_at"])
+        for lead in leads:
+            fields.update(lead["fields"])
+            sessions.extend(s for s in lead["sessions"] if s not in sessions)
+            created_at = min(created_at, lead["created_at"])
+        fields.update(draft)
+        if session not in sessions:
+            sessions.append(session)
+        record = {
+            "type": "lead",
+            "id": matches[0] if matches else f"lead-{uuid.uuid4().hex[:12]}",
+            "fields": fields,
+            "sessions": sessions,
+            "created_at": created_at,
+            "updated_at": now,
+        }
+        if len(matches) > 1:
+            # The email and the phone number belonged to different leads
+            record["merged"] = matches[1:]
+        return record
+
+    def _open(self) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            # Released when the descriptor is closed
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _read(self, offset: int) -> dict:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def refresh(self) -> None:
+        """Index any complete lines appended since the last scan, by any process."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._indexed_to:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_to)
+            offset = self._indexed_to
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Another process is mid-write; pick it up next time.
+                    break
+                try:
+                    self._index(json.loads(raw), offset)
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning("Skipping corrupt lead journal line at %d", offset)
+                offset += len(raw)
+            self._indexed_to = offset
+
+    def _resolve(self, lead_id: str) -> str:
+        """The lead `lead_id` was merged into, if any; called with the lock held."""
+        survivor = lead_id
+        while survivor in self._merged:
+            survivor = self._merged[survivor]
+        # Shorten the chain for the next lookup
+        while lead_id != survivor:
+            lead_id, self._merged[lead_id] = self._merged[lead_id], survivor
+        return survivor
+
+    def _index(self, record: dict, offset: int) -> None:
+        if record["type"] == "delta":
+            self._drafts.setdefault(record["session"], {}).update(record["fields"])
+            return
+        lead_id = record["id"]
+        # The keys and sessions of merged leads still point at them; they
+        # resolve through `_merged`
+        for merged in record.get("merged", ()):
+            self._leads.pop(merged, None)
+            if merged != lead_id:
+                self._merged[merged] = lead_id
+        self._leads[lead_id] = offset
+        for key in dedup_keys(record["fields"]):
+            self._by_key[key] = lead_id
+        for session in record["sessions"]:
+            self._by_session[session] = lead_id
+            self._drafts.pop(session, None)
+
+
+def open_store(directory: str | Path | None = None) -> LeadStore:
+    """Open the lead journal in `directory` (default: `./leads`)."""
+    directory = Path(directory) if directory is not None else Path(os.getcwd()) / "leads"
+    return LeadStore(directory / JOURNAL_FILENAME)
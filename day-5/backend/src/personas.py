@@ -0,0 +1,190 @@
+"""One worker for every persona: barista (day 2), wellness (day 3), SDR (day 5).
+
+Each day's `agent.py` is a complete agent with its own `prewarm` and
+`entrypoint`. Running them as three workers means three forkservers with
+the same plugins and VAD, three inference processes each holding the turn
+detector, and three pools of idle job processes. This worker registers
+every persona's plugins once, prewarms every persona in each job process
+(the VAD and the batched turn detector are per-process singletons, so
+they are loaded once and shared), and picks the persona per job.
+
+The persona comes from the first of these that names one:
+
+1. the job's dispatch metadata (explicit dispatch)
+2. the room's metadata
+3. the room name's prefix, e.g. `barista-1234` or `wellness_room_7`
+4. `DEFAULT_PERSONA` (default `sdr`)
+
+Metadata is either a bare persona name or a JSON object with a `persona`
+key. Unknown names fall through to the next source.
+
+The personas are loaded from the other days' `src` directories in this
+checkout, under their own module names (`barista_agent`, ...). Their
+helper modules are imported by plain name, so modules that exist in more
+than one day (`write_behind`, `capacity`, ...) must stay identical copies.
+Stores that default to the working directory (orders, the wellness
+journal) use this worker's.
+
+    uv run python src/personas.py dev
+    uv run python src/personas.py list-personas
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+
+from dotenv import load_dotenv
+from livekit.agents import JobContext, JobProcess, WorkerOptions, llm
+from livekit.agents.llm.tool_context import get_function_info, get_raw_function_info
+
+import capacity
+import turn_batching
+from latency_metrics import worker_options
+from startup import run_app
+
+logger = logging.getLogger("personas")
+
+load_dotenv(".env.local")
+
+SRC = Path(__file__).resolve().parent
+REPO = SRC.parents[2]
+
+
+@dataclass(frozen=True)
+class Persona:
+    name: str
+    # The day's `src` directory; its `agent.py` defines the persona
+    src: Path
+
+    @property
+    def module_name(self) -> str:
+        return f"{self.name}_agent"
+
+
+PERSONAS: dict[str, Persona] = {
+    persona.name: persona
+    for persona in (
+        Persona("barista", REPO / "day-2" / "backend" / "src"),
+        Persona("wellness", REPO / "day-3" / "backend" / "src"),
+        Persona("sdr", SRC),
+    )
+}
+
+COMMAND = "list-personas"
+
+
+def default_persona() -> str:
+    return os.getenv("DEFAULT_PERSONA", "sdr")
+
+
+def load(name: str) -> ModuleType:
+    """The persona's agent module, imported once per process."""
+    persona = PERSONAS[name]
+    module = sys.modules.get(persona.module_name)
+    if module is not None:
+        return module
+    if str(persona.src) not in sys.path:
+        # After this directory, so shared helpers resolve to this day's copies
+        sys.path.append(str(persona.src))
+    spec = importlib.util.spec_from_file_location(persona.module_name, persona.src / "agent.py")
+    if spec is None or spec.loader is None:
+        raise ImportError(f"no agent.py for persona {name!r} in {persona.src}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[persona.module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[persona.module_name]
+        raise
+    return module
+
+
+def plugins() -> tuple[str, ...]:
+    """Every persona's plugins, each once."""
+    names: dict[str, None] = {}
+    for name in PERSONAS:
+        names.update(dict.fromkeys(load(name).PLUGINS))
+    return tuple(names)
+
+
+def tools(name: str) -> list[str]:
+    """Names of the function tools the persona's agent class defines."""
+    agent_cls = load(name).Assistant
+    names = []
+    for tool in llm.find_function_tools(agent_cls):
+        info = get_function_info(tool) if llm.is_function_tool(tool) else get_raw_function_info(tool)
+        names.append(info.name)
+    return names
+
+
+def _persona_from(metadata: str | None) -> str | None:
+    if not metadata:
+        return None
+    try:
+        data = json.loads(metadata)
+    except ValueError:
+        data = metadata.strip()
+    if isinstance(data, dict):
+        data = data.get("persona")
+    if isinstance(data, str) and data in PERSONAS:
+        return data
+    return None
+
+
+def route(job_metadata: str | None, room_metadata: str | None, room_name: str) -> str:
+    """The persona for a job; see the module docstring for the order."""
+    for metadata in (job_metadata, room_metadata):
+        persona = _persona_from(metadata)
+        if persona is not None:
+            return persona
+    for name in PERSONAS:
+        if room_name.startswith((f"{name}-", f"{name}_")):
+            return name
+    persona = default_persona()
+    if persona not in PERSONAS:
+        raise ValueError(f"DEFAULT_PERSONA={persona!r} is not one of {sorted(PERSONAS)}")
+    return persona
+
+
+def prewarm(proc: JobProcess):
+    # Idle processes serve any persona, so each one prewarms all of them;
+    # the models they have in common load once
+    for name in PERSONAS:
+        load(name).prewarm(proc)
+
+
+async def entrypoint(ctx: JobContext):
+    persona = route(ctx.job.metadata, ctx.job.room.metadata, ctx.job.room.name)
+    logger.info("routing room %s to %s", ctx.job.room.name, persona)
+    await load(persona).entrypoint(ctx)
+
+
+def _list_personas() -> None:
+    for name, persona in PERSONAS.items():
+        marker = " (default)" if name == default_persona() else ""
+        print(f"{name}{marker}: {persona.src / 'agent.py'}")
+        print(f"  tools: {', '.join(tools(name)) or '-'}")
+        print(f"  plugins: {', '.join(load(name).PLUGINS)}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == [COMMAND]:
+        _list_personas()
+    else:
+        run_app(
+            WorkerOptions(
+                entrypoint_fnc=entrypoint,
+                prewarm_fnc=prewarm,
+                **worker_options(),
+                **turn_batching.worker_options(),
+                **capacity.worker_options(),
+            ),
+            plugins(),
+        )
@@ -0,0 +1,142 @@
+"""Provider connections opened as soon as a job is accepted.
+
+The first turn of a call should not pay for DNS, TCP and TLS setup with
+the STT, LLM and TTS providers. `warm_up` runs from the top of
+`entrypoint`, while the room connects and before the participant has
+joined:
+
+- it preconnects to `PRECONNECT_URLS` (Deepgram) through the shared
+  `http_session`, so the STT websocket that `session.start` opens reuses a
+  TLS connection that is already up
+- it opens the TTS websocket, which Murf keeps in its connection pool, and
+  runs any other provider `prewarm` (see `startup.warm_providers`)
+- it opens the LLM client's connection with a model metadata request
+  (`google.LLM` has no `prewarm`; the request is free)
+
+`http_session` is one aiohttp session per process and event loop, with a
+long keep-alive and a DNS cache. The plugins get it as `http_session=`
+instead of the session LiveKit creates and closes for each job, so a later
+job on the same loop finds its connections open. LiveKit job processes
+currently run one job each, so today the reuse is within a call: Deepgram
+and Murf reconnecting after a dropped or expired websocket.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+
+import aiohttp
+from livekit.agents import AgentSession, llm, utils
+
+from startup import warm_providers
+
+logger = logging.getLogger("agent")
+
+# Reached through `http_session`; Murf's websocket is opened by its own prewarm
+PRECONNECT_URLS = ("https://api.deepgram.com",)
+# Idle connections are kept this long (aiohttp's default is 15 s)
+KEEPALIVE_SECONDS = 60.0
+DNS_CACHE_SECONDS = 300
+WARM_UP_TIMEOUT = 5.0
+
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def http_session() -> aiohttp.ClientSession:
+    """The process's session for provider traffic on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for stale in [other for other in _sessions if other.is_closed()]:
+        del _sessions[stale]
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                keepalive_timeout=KEEPALIVE_SECONDS, ttl_dns_cache=DNS_CACHE_SECONDS
+            )
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def aclose() -> None:
+    """Close the running loop's session, e.g. at the end of a script."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+async def preconnect(
+    urls: Sequence[str],
+    session: aiohttp.ClientSession | None = None,
+    timeout: float = WARM_UP_TIMEOUT,
+) -> dict[str, float]:
+    """Leave an open connection to each URL's host in `session`'s pool.
+
+    Sends a GET request; any response will do (usually a 404). Not HEAD:
+    aiohttp does not return the connection of a HEAD response to the pool.
+    Returns the seconds each URL took; failures are logged and left out.
+    """
+    session = session or http_session()
+
+    async def connect(url: str) -> float | None:
+        start = time.perf_counter()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Could not preconnect to %s: %r", url, e)
+            return None
+        return time.perf_counter() - start
+
+    timings = await asyncio.gather(*(connect(url) for url in urls))
+    return {url: seconds for url, seconds in zip(urls, timings) if seconds is not None}
+
+
+async def warm_llm(llm_v: llm.LLM, timeout: float = WARM_UP_TIMEOUT) -> float | None:
+    """Open the connection of `llm_v`'s client; returns seconds, or None.
+
+    Supports `google.LLM`, whose client keeps its own connection pool: the
+    model's metadata is fetched through it. Other LLMs are left alone.
+    """
+    models = getattr(getattr(getattr(llm_v, "_client", None), "aio", None), "models", None)
+    if models is None:
+        return None
+    http_options = getattr(getattr(llm_v, "_opts", None), "http_options", None)
+    config = {"http_options": http_options} if utils.is_given(http_options) and http_options else None
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(models.get(model=llm_v.model, config=config), timeout)
+    except Exception as e:
+        logger.warning("Could not warm the LLM connection: %r", e)
+        return None
+    return time.perf_counter() - start
+
+
+def warm_up(
+    session: AgentSession, preconnect_urls: Sequence[str] = PRECONNECT_URLS
+) -> asyncio.Task[dict[str, float]]:
+    """Start opening `session`'s provider connections; returns the task.
+
+    Call right after building the session. The task never raises; its result
+    is the seconds each connection took, by URL and "llm".
+    """
+    warm_providers(session)
+    return asyncio.create_task(_warm_up(session, preconnect_urls), name="provider_warm_up")
+
+
+async def _warm_up(session: AgentSession, urls: Sequence[str]) -> dict[str, float]:
+    llm_v = session.llm
+    timings, llm_seconds = await asyncio.gather(
+        preconnect(urls),
+        warm_llm(llm_v) if isinstance(llm_v, llm.LLM) else asyncio.sleep(0),
+    )
+    if llm_seconds is not None:
+        timings["llm"] = llm_seconds
+    logger.info(
+        "Provider connections warm: %s",
+        {name: round(seconds * 1000, 1) for name, seconds in timings.items()},
+    )
+    return timings
@@ -0,0 +1,484 @@
+"""Per-session journal of transcripts, tool calls and metrics, and its reader.
+
+`SessionJournal.attach` subscribes to an `AgentSession` and records, as
+one JSON object per event:
+
+- `start`: agent, room and job, when the journal opens
+- `user` / `agent`: each message added to the conversation (final
+  transcripts and the agent's replies, with `interrupted`)
+- `tool`: each function call with its arguments and output
+- `metrics`: every `metrics_collected` event (STT, LLM, TTS, EOU, VAD)
+- `state`: agent and user state changes
+- `error` and `close`
+
+`record` only appends to an in-memory list, so event handlers never wait
+on disk. Every `SEGMENT_EVENTS` events, or `SEGMENT_SECONDS` after the
+first unwritten one, the batch is compressed and appended to
+`<dir>/<date>/<session>.jsonl.gz` on a worker thread. Each batch is a
+gzip member of its own, so the file is valid gzip at every point, a crash
+loses at most the unwritten batch, and readers can resume from the end of
+the last member. At most `MAX_PENDING` events wait in memory; beyond that
+they are dropped and counted. `<dir>/index.jsonl` gets one line when a
+session opens and one when it closes, so sessions can be listed without
+opening their files.
+
+`SESSION_JOURNAL_DIR` sets the directory (default `./journals`);
+`SESSION_JOURNAL=0` turns journaling off. Read the journals with:
+
+    python src/session_journal.py sessions --agent barista --since 2h
+    python src/session_journal.py events --kind user,agent,tool --grep latte
+    python src/session_journal.py events --tail 20 --follow
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+import uuid
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# The reader CLI runs without importing the agents framework
+if TYPE_CHECKING:
+    from livekit.agents import AgentSession
+
+logger = logging.getLogger("agent")
+
+INDEX_FILENAME = "index.jsonl"
+SEGMENT_EVENTS = 200
+SEGMENT_SECONDS = 5.0
+MAX_PENDING = 5000
+# Longer tool arguments and outputs are cut
+MAX_FIELD_CHARS = 2000
+READ_SIZE = 1 << 16
+
+
+def default_dir() -> Path:
+    return Path(os.getenv("SESSION_JOURNAL_DIR") or Path(os.getcwd()) / "journals")
+
+
+def _clip(text: str) -> str:
+    return text if len(text) <= MAX_FIELD_CHARS else text[:MAX_FIELD_CHARS] + "…"
+
+
+def _append(path: Path, data: bytes) -> None:
+    """Append with one O_APPEND write, so concurrent writers never interleave."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _encode(events: Iterable[dict[str, Any]]) -> bytes:
+    lines = (json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events)
+    return "".join(lines).encode()
+
+
+class SessionJournal:
+    """Append-only, segment-compressed journal of one session.
+
+    Args:
+        directory: journal root; the session's file goes in a dated subdirectory.
+        agent, room, job_id: identify the session in the index.
+        segment_events: events per compressed segment.
+        segment_seconds: longest an event waits before its segment is written.
+        max_pending: events held in memory before new ones are dropped.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        agent: str,
+        room: str,
+        job_id: str = "",
+        segment_events: int = SEGMENT_EVENTS,
+        segment_seconds: float = SEGMENT_SECONDS,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.directory = Path(directory)
+        self.agent = agent
+        self.room = room
+        self.job_id = job_id
+        started = datetime.now(timezone.utc)
+        safe_room = re.sub(r"[^A-Za-z0-9_.-]+", "_", room)[:48] or "room"
+        self.session_id = f"{started:%H%M%S}-{safe_room}-{uuid.uuid4().hex[:8]}"
+        self.path = self.directory / f"{started:%Y-%m-%d}" / f"{self.session_id}.jsonl.gz"
+        self._segment_events = segment_events
+        self._segment_seconds = segment_seconds
+        self._max_pending = max_pending
+        self._pending: list[dict[str, Any]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        # Written to the index with the first segment
+        self._start_entry: dict[str, Any] | None = {
+            "session": self.session_id,
+            "path": str(self.path.relative_to(self.directory)),
+            "agent": agent,
+            "room": room,
+            "job": job_id,
+            "started": round(started.timestamp(), 3),
+        }
+        self.events = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.record("start", agent=agent, room=room, job=job_id)
+
+    @classmethod
+    def from_env(cls, *, agent: str, room: str, job_id: str = "") -> SessionJournal | None:
+        if os.getenv("SESSION_JOURNAL", "1") == "0":
+            return None
+        return cls(default_dir(), agent=agent, room=room, job_id=job_id)
+
+    def attach(self, session: AgentSession) -> None:
+        """Record `session`'s conversation, tool calls, metrics and state changes."""
+        session.on("conversation_item_added", self._on_item)
+        session.on("function_tools_executed", self._on_tools)
+        session.on("metrics_collected", self._on_metrics)
+        session.on("agent_state_changed", self._on_agent_state)
+        session.on("user_state_changed", self._on_user_state)
+        session.on("error", self._on_error)
+        session.on("close", self._on_close)
+
+    def record(self, kind: str, **fields: Any) -> None:
+        """Queue one event; never blocks. Events past `max_pending` are dropped."""
+        if self._closed:
+            return
+        if len(self._pending) >= self._max_pending:
+            self.dropped += 1
+            return
+        self._pending.append({"t": round(time.time(), 3), "kind": kind, **fields})
+        self.events += 1
+        if len(self._pending) >= self._segment_events:
+            self._write_pending()
+        elif self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # no loop yet: the next event or aclose writes it
+            self._timer = loop.call_later(self._segment_seconds, self._write_pending)
+
+    async def flush(self) -> None:
+        """Write every event recorded so far."""
+        self._write_pending()
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def aclose(self) -> None:
+        """Flush and add the session's closing line to the index."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        summary = {
+            "session": self.session_id,
+            "ended": round(time.time(), 3),
+            "events": self.events,
+            "dropped": self.dropped,
+            "bytes": self.bytes,
+        }
+        await asyncio.to_thread(self._index, summary)
+        if self.dropped:
+            logger.warning("Session journal dropped %d event(s)", self.dropped)
+
+    def _write_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending and (self._task is None or self._task.done()):
+            try:
+                loop = asyncio.get_running_loop()
+                self._task = loop.create_task(self._drain(), name="session_journal")
+            except RuntimeError:
+                pass  # no loop yet: written by the next flush
+
+    async def _drain(self) -> None:
+        # One segment at a time; events recorded meanwhile join the next one
+        while self._pending:
+            batch = self._pending[: self._segment_events]
+            self._pending = self._pending[self._segment_events :]
+            try:
+                self.bytes += await asyncio.to_thread(self._write_segment, batch)
+            except Exception:
+                logger.exception("Session journal write failed; dropped %d event(s)", len(batch))
+                self.dropped += len(batch)
+
+    def _write_segment(self, events: list[dict[str, Any]]) -> int:
+        if self._start_entry is not None:
+            self._index(self._start_entry)
+            self._start_entry = None
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        data = compressor.compress(_encode(events)) + compressor.flush()
+        _append(self.path, data)
+        return len(data)
+
+    def _index(self, entry: dict[str, Any]) -> None:
+        _append(self.directory / INDEX_FILENAME, _encode([entry]))
+
+    def _on_item(self, ev: Any) -> None:
+        item = ev.item
+        if item.type == "message":
+            kind = "agent" if item.role == "assistant" else item.role
+            self.record(kind, text=item.text_content or "", interrupted=item.interrupted)
+
+    def _on_tools(self, ev: Any) -> None:
+        for call, output in zip(ev.function_calls, ev.function_call_outputs):
+            self.record(
+                "tool",
+                name=call.name,
+                arguments=_clip(call.arguments),
+                output=_clip(output.output) if output is not None else None,
+                is_error=output.is_error if output is not None else None,
+            )
+
+    def _on_agent_state(self, ev: Any) -> None:
+        self.record("state", who="agent", state=ev.new_state)
+
+    def _on_user_state(self, ev: Any) -> None:
+        self.record("state", who="user", state=ev.new_state)
+
+    def _on_error(self, ev: Any) -> None:
+        self.record("error", source=type(ev.source).__name__, error=str(ev.error))
+
+    def _on_close(self, ev: Any) -> None:
+        self.record("close", reason=str(ev.reason), error=str(ev.error or ""))
+
+    def _on_metrics(self, ev: Any) -> None:
+        data = ev.metrics.model_dump(exclude_none=True, exclude={"timestamp", "metadata"})
+        self.record("metrics", **{key: value for key, value in data.items() if key != "kind"})
+
+
+# -- reading -------------------------------------------------------------------
+
+
+def read_segments(
+    path: str | Path, offset: int = 0, keep: Callable[[bytes], bool] | None = None
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    """Yield each complete segment after byte `offset` with the offset it ends at.
+
+    Decompresses one segment at a time. A segment still being written (or
+    cut short by a crash) ends the iteration; read again from the last
+    offset to pick it up once complete. Lines `keep` rejects are skipped
+    without being parsed.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        decompressor = zlib.decompressobj(31)
+        out: list[bytes] = []
+        fed = 0
+        while data := f.read(READ_SIZE):
+            while data:
+                out.append(decompressor.decompress(data))
+                if not decompressor.eof:
+                    fed += len(data)
+                    break
+                rest = decompressor.unused_data
+                offset += fed + len(data) - len(rest)
+                lines = b"".join(out).splitlines()
+                yield [json.loads(line) for line in lines if line and (keep is None or keep(line))], offset
+                decompressor, out, fed, data = zlib.decompressobj(31), [], 0, rest
+
+
+def read_index(directory: str | Path, offset: int = 0) -> tuple[dict[str, dict[str, Any]], int]:
+    """Sessions listed in the index after byte `offset`, and the offset read up to."""
+    sessions: dict[str, dict[str, Any]] = {}
+    path = Path(directory) / INDEX_FILENAME
+    if not path.exists():
+        return sessions, offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # being written
+            offset += len(line)
+            entry = json.loads(line)
+            sessions.setdefault(entry["session"], {}).update(entry)
+    return sessions, offset
+
+
+def parse_since(value: str) -> float:
+    """Unix time for "30m", "2h", "7d" ago, or an ISO date/time."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value)
+    if match:
+        unit = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}[match.group(2)]
+        return time.time() - timedelta(**{unit: float(match.group(1))}).total_seconds()
+    parsed = datetime.fromisoformat(value)
+    return (parsed if parsed.tzinfo else parsed.astimezone()).timestamp()
+
+
+def _session_matches(session: dict[str, Any], args: argparse.Namespace) -> bool:
+    if "path" not in session:
+        return False  # only the closing line is left
+    if args.session and session["session"] not in args.session:
+        return False
+    if args.agent and session.get("agent") != args.agent:
+        return False
+    if args.room and args.room not in session.get("room", ""):
+        return False
+    if args.since and session.get("ended", session.get("started", 0)) < args.since:
+        return False
+    return True
+
+
+def _line_filter(args: argparse.Namespace) -> Callable[[bytes], bool]:
+    """Match `--grep` and pre-match `--kind` on the raw line, before parsing it."""
+    # As `SessionJournal` writes them
+    kinds = [json.dumps({"kind": kind})[1:-1].encode() for kind in args.kind or ()]
+
+    def keep(line: bytes) -> bool:
+        if kinds and not any(kind in line for kind in kinds):
+            return False
+        return not args.grep or args.grep in line.decode().lower()
+
+    return keep
+
+
+def _event_matches(event: dict[str, Any], args: argparse.Namespace) -> bool:
+    if args.kind and event.get("kind") not in args.kind:
+        return False
+    if args.since and event.get("t", 0) < args.since:
+        return False
+    return True
+
+
+def _format(session: dict[str, Any], event: dict[str, Any], as_json: bool) -> str:
+    if as_json:
+        return json.dumps({"session": session["session"], **event}, ensure_ascii=False)
+    when = datetime.fromtimestamp(event["t"]).isoformat(timespec="milliseconds")
+    kind = event["kind"]
+    if kind in ("user", "agent"):
+        detail = event.get("text", "") + (" [interrupted]" if event.get("interrupted") else "")
+    elif kind == "tool":
+        detail = f"{event['name']}({event.get('arguments', '')}) -> {event.get('output')}"
+    else:
+        fields = {k: v for k, v in event.items() if k not in ("t", "kind")}
+        detail = json.dumps(fields, ensure_ascii=False)
+    return f"{when} {session.get('agent', '')}/{session['session']} {kind}: {detail}"
+
+
+def _cmd_sessions(args: argparse.Namespace) -> None:
+    sessions, _ = read_index(args.dir)
+    rows = [s for s in sessions.values() if _session_matches(s, args)]
+    for session in rows[-args.limit :] if args.limit else rows:
+        started = datetime.fromtimestamp(session["started"]).isoformat(timespec="seconds")
+        if "ended" in session:
+            status = f"{session['ended'] - session['started']:.0f}s {session['events']} events"
+            if session.get("dropped"):
+                status += f" ({session['dropped']} dropped)"
+        else:
+            status = "open"
+        print(f"{started} {session['agent']:<10} {session['session']}  {status}  {session['path']}")
+
+
+def _cmd_events(args: argparse.Namespace) -> None:
+    directory = Path(args.dir)
+    sessions, index_offset = read_index(directory)
+    offsets: dict[str, int] = {}
+    tail: deque[tuple[dict[str, Any], dict[str, Any]]] | None = None
+    if args.tail:
+        tail = deque(maxlen=args.tail)
+    keep = _line_filter(args)
+
+    def read_new(session: dict[str, Any]) -> None:
+        path = directory / session["path"]
+        offset = offsets.get(session["session"], 0)
+        if not path.exists() or path.stat().st_size <= offset:
+            return
+        try:
+            for events, offset in read_segments(path, offset, keep):
+                for event in events:
+                    if not _event_matches(event, args):
+                        continue
+                    if tail is not None:
+                        tail.append((session, event))
+                    else:
+                        print(_format(session, event, args.json), flush=True)
+        except (zlib.error, json.JSONDecodeError) as e:
+            print(f"{path}: unreadable segment ({e})", file=sys.stderr)
+        offsets[session["session"]] = offset
+
+    for session in sessions.values():
+        if _session_matches(session, args):
+            read_new(session)
+    if tail is not None:
+        for session, event in tail:
+            print(_format(session, event, args.json))
+        sys.stdout.flush()
+        tail = None
+    if not args.follow:
+        return
+
+    # Only sessions still open can grow
+    open_sessions = {
+        s["session"]: s
+        for s in sessions.values()
+        if "ended" not in s and _session_matches(s, args)
+    }
+    try:
+        while True:
+            time.sleep(args.interval)
+            new, index_offset = read_index(directory, index_offset)
+            for session_id, entry in new.items():
+                session = sessions.setdefault(session_id, {})
+                session.update(entry)
+                if "ended" not in session and _session_matches(session, args):
+                    open_sessions[session_id] = session
+            for session_id, session in list(open_sessions.items()):
+                read_new(session)
+                if "ended" in session:
+                    del open_sessions[session_id]
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Read the session journals.")
+    parser.add_argument(
+        "--dir", help="journal directory (default: $SESSION_JOURNAL_DIR or ./journals)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("sessions", "list sessions from the index"),
+        ("events", "print matching events"),
+    ):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--session", action="append", help="session id (repeatable)")
+        sub.add_argument("--agent", help="agent name, e.g. barista")
+        sub.add_argument("--room", help="substring of the room name")
+        sub.add_argument("--since", type=parse_since, help='"30m", "2h", "7d" or an ISO date/time')
+    sessions_cmd = commands.choices["sessions"]
+    sessions_cmd.add_argument("--limit", type=int, default=0, help="only the last N sessions")
+    events_cmd = commands.choices["events"]
+    events_cmd.add_argument(
+        "--kind", type=lambda s: set(s.split(",")), help="e.g. user,agent,tool,metrics"
+    )
+    events_cmd.add_argument("--grep", type=str.lower, help="case-insensitive text to match")
+    events_cmd.add_argument("--tail", type=int, default=0, help="only the last N matching events")
+    events_cmd.add_argument("--follow", "-f", action="store_true", help="keep printing new events")
+    events_cmd.add_argument(
+        "--interval", type=float, default=1.0, help="seconds between polls with --follow"
+    )
+    events_cmd.add_argument("--json", action="store_true", help="print raw JSON events")
+    args = parser.parse_args(argv)
+    args.dir = args.dir or default_dir()
+    if args.command == "sessions":
+        _cmd_sessions(args)
+    else:
+        _cmd_events(args)
+
+
+if __name__ == "__main__":
+    main()
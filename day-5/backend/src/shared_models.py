@@ -0,0 +1,93 @@
+"""Model weights loaded once per worker and shared by its job processes.
+
+On Linux, job processes (and the inference process) fork from a
+forkserver that preloads the registered plugin packages. `enable()`
+registers this module as one more preload and, through
+`SHARED_MODELS_PRELOAD`, makes it load the Silero VAD while the forkserver
+imports it. Every forked job process then inherits the loaded ONNX
+session. The session runs single-threaded without spinning threads, so
+it is fork-safe, and its weights live in native memory that Python never
+writes to, so the pages stay shared copy-on-write. `prewarm` just picks up
+the inherited instance.
+
+The turn detector needs no help: `MultilingualModel()` is a thin client
+and its weights live once per worker, in the inference process.
+
+Set `SHARE_MODELS=0` to load the VAD in each job process instead. Where
+processes are spawned rather than forked (macOS, Windows) this is what
+happens anyway.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any
+
+from livekit.agents import Plugin
+
+if TYPE_CHECKING:
+    from livekit.plugins import silero
+
+_PRELOAD_ENV = "SHARED_MODELS_PRELOAD"
+
+_vad: silero.VAD | None = None
+
+
+def enabled() -> bool:
+    return os.getenv("SHARE_MODELS", "1") != "0"
+
+
+def vad() -> silero.VAD:
+    """This process's Silero VAD, inherited from the forkserver when shared."""
+    global _vad
+    if _vad is None:
+        from livekit.plugins import silero
+
+        _vad = silero.VAD.load()
+    return _vad
+
+
+def preloaded() -> bool:
+    """Whether the VAD was already loaded when this process started using it."""
+    return _vad is not None
+
+
+class _SharedModelsPlugin(Plugin):
+    def __init__(self) -> None:
+        super().__init__(title="shared-models", version="1.0.0", package=__name__)
+
+
+def enable() -> None:
+    """Preload the shared models in the forkserver (worker main process, main thread).
+
+    Must run before the worker starts; the main process itself loads nothing.
+    """
+    if not enabled():
+        return
+    os.environ[_PRELOAD_ENV] = "1"
+    Plugin.register_plugin(_SharedModelsPlugin())
+
+
+def memory_usage() -> dict[str, Any]:
+    """RSS, and on Linux PSS/USS, of this process in MB.
+
+    RSS counts shared pages in full in every process; PSS splits them
+    between the processes sharing them, so PSS is what adds up across a
+    worker. USS is what exiting the process would free.
+    """
+    import psutil
+
+    process = psutil.Process()
+    try:
+        info = process.memory_full_info()
+    except (psutil.AccessDenied, AttributeError):
+        info = process.memory_info()
+    usage = {"pid": process.pid}
+    for field in ("rss", "pss", "uss"):
+        if hasattr(info, field):
+            usage[f"{field}_mb"] = round(getattr(info, field) / 2**20, 1)
+    return usage
+
+
+if os.environ.get(_PRELOAD_ENV) == "1" and enabled():
+    vad()
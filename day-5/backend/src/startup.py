@@ -0,0 +1,183 @@
+"""Worker cold start: lazy provider plugins and the `profile-startup` command.
+
+`agent.py` no longer imports provider plugins at module level. Each agent
+lists the plugins its pipeline uses in `PLUGINS` and imports them where
+they are used. `run_app` imports exactly that list in the worker's main
+process before handing over to `cli.run_app`. That has to happen there:
+plugins register themselves on the main thread, the turn detector
+registers its inference runner, `download-files` downloads files for the
+registered plugins, and on Linux the job processes fork from a server
+that preloads the registered plugins. Job processes then import
+`agent.py` without pulling in unused plugins (e.g. noise cancellation).
+The same preload shares model weights across job processes (see
+`shared_models`).
+
+`python src/agent.py profile-startup` starts a fresh interpreter that
+loads the agent the way a job process does and reports:
+
+- import time per top-level module (from `python -X importtime`)
+- plugin registration time, as paid by the worker's main process
+- prewarm time, split into the steps wrapped in `startup_step`
+- time to first session: interpreter start until prewarm is done, i.e.
+  when a job process could start its session
+- turn-detector model load time (paid once per worker, in parallel, by
+  the inference process)
+
+Within a job, `warm_providers` opens the session's provider connections
+before `session.start`, so they open while the room connects and the
+agent is prepared rather than after. `provider_pool.warm_up` adds the
+connections that have no `prewarm` (the STT host and the LLM client).
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from livekit.agents import AgentSession, JobExecutorType, JobProcess, WorkerOptions, cli
+
+import shared_models
+
+COMMAND = "profile-startup"
+_CHILD_FLAG = "--child"
+_T0_ENV = "STARTUP_PROFILE_T0"
+
+# Durations of the named steps run in this process, in seconds
+STEPS: dict[str, float] = {}
+
+
+@contextmanager
+def startup_step(name: str) -> Iterator[None]:
+    """Time a named cold-start step (e.g. a model load in `prewarm`)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STEPS[name] = time.perf_counter() - start
+
+
+def load_plugins(plugins: Sequence[str]) -> dict[str, float]:
+    """Import `livekit.plugins.<name>` for each plugin; returns seconds per plugin.
+
+    Must run on the main thread, where plugins are allowed to register.
+    """
+    timings = {}
+    for name in plugins:
+        start = time.perf_counter()
+        importlib.import_module(f"livekit.plugins.{name}")
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def warm_providers(session: AgentSession) -> None:
+    """Start opening the STT, LLM and TTS connections of `session` now.
+
+    `session.start` does the same, but only once the agent exists; calling
+    this first overlaps the connection setup with the rest of the
+    entrypoint. Safe to call twice: providers keep at most one warm
+    connection.
+    """
+    for model in (session.stt, session.llm, session.tts):
+        prewarm = getattr(model, "prewarm", None)
+        if callable(prewarm):
+            prewarm()
+
+
+def run_app(options: WorkerOptions, plugins: Sequence[str]) -> None:
+    """`cli.run_app`, plus the `profile-startup` subcommand."""
+    if sys.argv[1:2] == [COMMAND]:
+        if _CHILD_FLAG in sys.argv:
+            _profile_child(options, plugins)
+        else:
+            _profile(sys.argv[2:])
+        return
+    load_plugins(plugins)
+    shared_models.enable()
+    cli.run_app(options)
+
+
+def _turn_detector_load() -> dict[str, float]:
+    from livekit.agents.inference_runner import _InferenceRunner
+
+    timings = {}
+    for method, runner_cls in _InferenceRunner.registered_runners.items():
+        start = time.perf_counter()
+        runner = runner_cls()
+        runner.initialize()
+        timings[method] = time.perf_counter() - start
+    return timings
+
+
+def _profile_child(options: WorkerOptions, plugins: Sequence[str]) -> None:
+    t0 = float(os.environ[_T0_ENV])
+    report: dict[str, Any] = {"interpreter_and_imports_s": time.time() - t0}
+    report["plugins_s"] = load_plugins(plugins)
+
+    proc = JobProcess(executor_type=JobExecutorType.PROCESS, user_arguments=None, http_proxy=None)
+    prewarm: Callable[[JobProcess], Any] | None = options.prewarm_fnc
+    start = time.perf_counter()
+    if prewarm is not None:
+        prewarm(proc)
+    report["prewarm_s"] = time.perf_counter() - start
+    report["prewarm_steps_s"] = dict(STEPS)
+    report["first_session_s"] = time.time() - t0
+
+    try:
+        report["turn_detector_s"] = _turn_detector_load()
+    except Exception as e:
+        # Usually the model files are missing: `download-files` fetches them
+        report["turn_detector_error"] = str(e)
+    print(json.dumps(report))
+
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, float]]:
+    """Cumulative seconds for each module imported at the top level."""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        # Nested imports are indented by two spaces per level
+        if match and len(match.group(3)) == 1:
+            modules.append((match.group(4), int(match.group(2)) / 1e6))
+    return modules
+
+
+def _profile(args: list[str]) -> None:
+    env = dict(os.environ, **{_T0_ENV: repr(time.time())})
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", sys.argv[0], COMMAND, _CHILD_FLAG, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = sorted(parse_importtime(result.stderr), key=lambda m: m[1], reverse=True)
+
+    print(f"Interpreter start and imports {report['interpreter_and_imports_s'] * 1000:.0f} ms")
+    print("Imports, slowest first")
+    for name, seconds in imports[:15]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print("Plugins (worker main process)")
+    for name, seconds in report["plugins_s"].items():
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print(f"Prewarm {report['prewarm_s'] * 1000:.1f} ms")
+    for name, seconds in report["prewarm_steps_s"].items():
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print(f"Time to first session {report['first_session_s'] * 1000:.0f} ms")
+    if "turn_detector_error" in report:
+        print(f"Turn detector: {report['turn_detector_error']}")
+    for name, seconds in report.get("turn_detector_s", {}).items():
+        print(f"Turn detector {name} {seconds * 1000:.1f} ms")
@@ -0,0 +1,270 @@
+"""Cross-session micro-batching for the multilingual turn detector.
+
+By default every end-of-utterance (EOU) prediction is an IPC round trip
+to the worker's inference process. That process runs requests strictly
+one at a time, so under load the sessions queue behind each other's
+single-row ONNX calls.
+
+With `TURN_BATCHING=1`, jobs run as threads of the worker process
+(`worker_options`), and every session's turn detector goes through one
+`TurnDetectionService` per process. It gathers the requests that arrive
+within `max_wait` of each other, up to `max_batch` of them, into one
+batched ONNX call and hands each session its own result.
+
+Batching needs to know how the exported model reports probabilities. If
+it emits one per token (a causal LM), rows of different lengths are
+right-padded, and each row's last real token is read. Otherwise only rows
+of equal length share a call. `initialize` probes this once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, Generic, TypeVar
+
+from livekit.agents import JobExecutorType
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_BATCH = 32
+DEFAULT_MAX_WAIT = 0.003
+
+
+def enabled() -> bool:
+    return os.getenv("TURN_BATCHING", "0") == "1"
+
+
+def worker_options() -> dict[str, Any]:
+    """Extra `WorkerOptions`: run jobs as threads so their sessions can share a batch."""
+    return {"job_executor_type": JobExecutorType.THREAD} if enabled() else {}
+
+
+class MicroBatcher(Generic[T, R]):
+    """Runs `run_batch` on a dedicated thread over requests from any event loop.
+
+    The first request opens a batch; it closes after `max_wait` seconds or
+    at `max_batch` requests. Requests that arrive while a batch is running
+    wait for the next one, so batches grow with load. After a batch of one
+    (a lone session) the next batch runs without waiting at all.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[T]], list[R]],
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: queue.SimpleQueue[tuple[T, Future[R]] | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._started = False
+        self._lock = threading.Lock()
+        # Sizes of the most recent batches
+        self.batch_sizes: deque[int] = deque(maxlen=1024)
+
+    def _ensure_started(self) -> None:
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self._thread.start()
+                    self._started = True
+
+    async def submit(self, item: T) -> R:
+        future: Future[R] = Future()
+        self._ensure_started()
+        self._queue.put((item, future))
+        return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        if self._started:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            wait = self.max_wait if self.batch_sizes and self.batch_sizes[-1] > 1 else 0.0
+            deadline = time.monotonic() + wait
+            closing = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        entry = self._queue.get(timeout=timeout)
+                    else:
+                        entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    closing = True
+                    break
+                batch.append(entry)
+            self._run(batch)
+            if closing:
+                return
+
+    def _run(self, batch: list[tuple[T, Future[R]]]) -> None:
+        self.batch_sizes.append(len(batch))
+        try:
+            results = self._run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        sizes = list(self.batch_sizes)
+        if not sizes:
+            return {"batches": 0}
+        return {
+            "batches": len(sizes),
+            "mean_batch": round(sum(sizes) / len(sizes), 2),
+            "max_batch": max(sizes),
+        }
+
+
+class BatchedEOURunner:
+    """The multilingual EOU runner with a batched `run_batch`.
+
+    Formats and tokenizes exactly like the plugin's runner (whose loaded
+    tokenizer and ONNX session it reuses), so results match `run`.
+    """
+
+    def __init__(self) -> None:
+        from livekit.plugins.turn_detector.multilingual import _EUORunnerMultilingual
+
+        self.INFERENCE_METHOD = _EUORunnerMultilingual.INFERENCE_METHOD
+        self._runner = _EUORunnerMultilingual()
+        self.per_token = False
+        self.batchable = False
+
+    def initialize(self) -> None:
+        import numpy as np
+
+        self._runner.initialize()
+        probe = np.array([[1, 2, 3]], dtype=np.int64)
+        out = self._runner._session.run(None, {"input_ids": probe})[0]
+        self.per_token = out.size == probe.shape[1]
+        try:
+            self._runner._session.run(None, {"input_ids": np.repeat(probe, 2, axis=0)})
+            self.batchable = True
+        except Exception:
+            # Exported with a fixed batch of one
+            self.batchable = False
+
+    def _tokenize(self, data: bytes) -> tuple[str, list[int]]:
+        from livekit.plugins.turn_detector.base import MAX_HISTORY_TOKENS
+
+        chat_ctx = json.loads(data).get("chat_ctx")
+        if not chat_ctx:
+            raise ValueError("chat_ctx is required on the inference input data")
+        text = self._runner._format_chat_ctx(chat_ctx)
+        ids = self._runner._tokenizer(
+            text, add_special_tokens=False, max_length=MAX_HISTORY_TOKENS, truncation=True
+        )["input_ids"]
+        return text, list(ids)
+
+    def _infer(self, rows: list[list[int]]) -> list[float]:
+        """EOU probability for each row of token ids."""
+        import numpy as np
+
+        session = self._runner._session
+        if not self.batchable:
+            outputs = [session.run(None, {"input_ids": np.array([row], dtype=np.int64)}) for row in rows]
+            return [float(out[0].flatten()[-1]) for out in outputs]
+        if self.per_token:
+            width = max(len(row) for row in rows)
+            ids = np.zeros((len(rows), width), dtype=np.int64)
+            for i, row in enumerate(rows):
+                ids[i, : len(row)] = row
+            out = session.run(None, {"input_ids": ids})[0].reshape(len(rows), width)
+            return [float(out[i, len(row) - 1]) for i, row in enumerate(rows)]
+        # One probability per row: only rows of the same length share a call
+        probabilities: list[float] = [0.0] * len(rows)
+        by_length: dict[int, list[int]] = {}
+        for i, row in enumerate(rows):
+            by_length.setdefault(len(row), []).append(i)
+        for indices in by_length.values():
+            ids = np.array([rows[i] for i in indices], dtype=np.int64)
+            out = session.run(None, {"input_ids": ids})[0].reshape(len(indices), -1)
+            for i, value in zip(indices, out[:, -1]):
+                probabilities[i] = float(value)
+        return probabilities
+
+    def run_batch(self, requests: list[bytes]) -> list[bytes]:
+        start = time.perf_counter()
+        tokenized = [self._tokenize(data) for data in requests]
+        probabilities = self._infer([ids for _, ids in tokenized])
+        duration = round(time.perf_counter() - start, 3)
+        return [
+            json.dumps({"eou_probability": p, "duration": duration, "input": text}).encode()
+            for (text, _), p in zip(tokenized, probabilities)
+        ]
+
+
+class TurnDetectionService:
+    """An `InferenceExecutor` for the turn detector that batches across sessions."""
+
+    def __init__(
+        self,
+        runner: Any | None = None,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        self.runner = runner if runner is not None else BatchedEOURunner()
+        self.batcher: MicroBatcher[bytes, bytes] = MicroBatcher(
+            self.runner.run_batch, max_batch=max_batch, max_wait=max_wait, name="turn-batching"
+        )
+
+    def initialize(self) -> None:
+        self.runner.initialize()
+
+    async def do_inference(self, method: str, data: bytes) -> bytes | None:
+        if method != self.runner.INFERENCE_METHOD:
+            raise ValueError(f"unsupported inference method {method!r}")
+        return await self.batcher.submit(data)
+
+
+_service: TurnDetectionService | None = None
+_service_lock = threading.Lock()
+
+
+def service() -> TurnDetectionService:
+    """The process-wide service; the model loads on first call (call it from `prewarm`)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            svc = TurnDetectionService()
+            svc.initialize()
+            _service = svc
+    return _service
+
+
+def turn_detector() -> Any:
+    """`MultilingualModel` for a session, routed through `service()` when batching."""
+    from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+    model = MultilingualModel()
+    if enabled():
+        # MultilingualModel takes no executor argument; its base class keeps it here
+        model._executor = service()
+    return model
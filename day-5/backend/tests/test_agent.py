@@ -2,10 +2,14 @@ import pytest
 from livekit.agents import AgentSession, inference, llm
 
 from agent import Assistant
+from llm_fixtures import RecordReplayLLM
+
+MODEL = "openai/gpt-4.1-mini"
 
 
 def _llm() -> llm.LLM:
-    return inference.LLM(model="openai/gpt-4.1-mini")
+    # Replays tests/fixtures/llm recordings; see llm_fixtures for the modes
+    return RecordReplayLLM(lambda: inference.LLM(model=MODEL), model=MODEL)
 
 
 @pytest.mark.asyncio
@@ -108,3 +112,33 @@ async def test_refuses_harmful_request() -> None:
 
         # Ensures there are no function calls or other unexpected events
         result.expect.no_more_events()
+
+
+@pytest.mark.asyncio
+async def test_answers_from_faq() -> None:
+    """Evaluation of the agent's use of the FAQ for company questions."""
+    async with (
+        _llm() as llm,
+        AgentSession(llm=llm) as session,
+    ):
+        await session.start(Assistant())
+
+        result = await session.run(user_input="Do you have a free tier?")
+
+        # The answer comes from the FAQ, not the model's own knowledge
+        result.expect.next_event().is_function_call(name="lookup_faq")
+        result.expect.next_event().is_function_call_output()
+        await (
+            result.expect.next_event()
+            .is_message(role="assistant")
+            .judge(
+                llm,
+                intent="""
+                Explains that there is no monthly or setup fee and that the user only pays per successful transaction.
+
+                The response should not invent a free plan with limits or prices that are not in the FAQ.
+                """,
+            )
+        )
+
+        result.expect.no_more_events()
@@ -0,0 +1,37 @@
+import json
+
+from faq import FaqIndex, load_faq, parse_markdown, tokenize
+
+
+def test_tokenize_folds_word_forms_and_drops_stopwords() -> None:
+    assert tokenize("What's the pricing?") == ["what", "pric"]
+    assert tokenize("prices") == tokenize("price")
+    assert tokenize("Payments") == tokenize("payment")
+
+
+def test_search_ranks_the_answering_entry_first() -> None:
+    index = load_faq()
+    assert index.company == "Razorpay"
+    assert index.search("do you have a free tier")[0].entry.id == "free-tier"
+    assert index.search("who is this for")[0].entry.id == "who-is-it-for"
+    hits = index.search("how much do you charge per transaction", k=2)
+    assert [h.entry.id for h in hits][0] == "pricing-standard"
+    assert len(hits) == 2 and hits[0].score >= hits[1].score
+
+
+def test_search_without_shared_terms_is_empty() -> None:
+    assert load_faq().search("zzz qqq") == []
+    assert load_faq().search("") == []
+
+
+def test_loads_markdown_and_plain_json_lists(tmp_path) -> None:
+    md = tmp_path / "faq.md"
+    md.write_text("# Acme\n\n## Do you ship abroad?\nYes, to 40\ncountries.\n\n## Empty\n")
+    entries = parse_markdown(md.read_text())
+    assert [(e.question, e.answer) for e in entries] == [("Do you ship abroad?", "Yes, to 40 countries.")]
+    assert FaqIndex.load(md).search("shipping abroad")[0].entry.question == "Do you ship abroad?"
+
+    plain = tmp_path / "faq.json"
+    plain.write_text(json.dumps([{"question": "Is there an app?", "answer": "Yes, on Android."}]))
+    index = FaqIndex.load(plain)
+    assert index.company == "" and index.search("android app")[0].entry.id == "0"
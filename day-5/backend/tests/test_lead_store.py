@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+
+from lead_store import LeadStore, normalize_email, normalize_phone, open_store
+
+
+def _heard(store: LeadStore, session: str, **fields) -> None:
+    record, problems = store.delta(session, fields)
+    assert not problems
+    store.append([record])
+
+
+def test_normalizes_spoken_emails_and_phone_numbers() -> None:
+    assert normalize_email(" Sam at Acme dot IO ") == "sam@acme.io"
+    assert normalize_email("not an email") is None
+    assert normalize_phone("098765 43210") == "919876543210"
+    assert normalize_phone("+1 (415) 555-0100") == "14155550100"
+    assert normalize_phone("12345") is None
+
+
+def test_deltas_survive_a_dropped_call(tmp_path) -> None:
+    store = open_store(tmp_path)
+    _heard(store, "s1", name="Priya", company="Acme")
+    _heard(store, "s1", email="Priya@Acme.io", timeline="probably soon")
+
+    # A new process (another worker, or after a crash) sees the draft
+    reopened = open_store(tmp_path)
+    assert reopened.draft("s1") == {
+        "name": "Priya",
+        "company": "Acme",
+        "email": "priya@acme.io",
+        "timeline": "soon",
+    }
+    assert len(reopened) == 0
+    assert reopened.finalize_all() == 1
+    assert reopened.find(email="PRIYA@acme.io")["fields"]["name"] == "Priya"
+    assert reopened.draft("s1") == {}
+
+
+def test_repeat_visitors_merge_into_one_lead(tmp_path) -> None:
+    store = open_store(tmp_path)
+    _heard(store, "s1", name="Priya", email="priya@acme.io", role="CTO")
+    first = store.finalize("s1")
+    _heard(store, "s2", email="PRIYA@ACME.IO", team_size="40", phone="9876543210")
+    second = store.finalize("s2")
+
+    assert second["id"] == first["id"]
+    assert second["sessions"] == ["s1", "s2"]
+    assert second["fields"]["role"] == "CTO" and second["fields"]["team_size"] == "40"
+    assert len(store) == 1
+    assert store.find(phone="+91 98765 43210")["id"] == first["id"]
+
+    # A late update in a finalized session lands on the same lead
+    _heard(store, "s2", use_case="subscriptions")
+    assert store.finalize("s2")["id"] == first["id"]
+    assert store.finalize("s2") is None
+
+
+def test_email_and_phone_of_different_leads_are_merged(tmp_path) -> None:
+    store = open_store(tmp_path)
+    _heard(store, "s1", email="a@acme.io")
+    a = store.finalize("s1")
+    _heard(store, "s2", phone="9876543210")
+    store.finalize("s2")
+    _heard(store, "s3", email="a@acme.io", phone="9876543210")
+    merged = store.finalize("s3")
+
+    assert merged["id"] == a["id"] and len(store) == 1
+    assert merged["sessions"] == ["s1", "s2", "s3"]
+
+
+def test_keys_of_a_merged_lead_find_the_lead_it_joined(tmp_path) -> None:
+    store = open_store(tmp_path)
+    _heard(store, "s1", email="a@x.io")
+    a = store.finalize("s1")
+    _heard(store, "s2", email="b@x.io", phone="9876543210")
+    store.finalize("s2")
+    _heard(store, "s3", email="a@x.io", phone="9876543210")
+    store.finalize("s3")
+
+    # b@x.io belonged to the lead merged into A
+    _heard(store, "s4", email="b@x.io", name="Bo")
+    assert store.finalize("s4")["id"] == a["id"]
+    assert store.find(email="b@x.io")["id"] == a["id"]
+    _heard(store, "s2", role="CTO")
+    assert store.finalize("s2")["id"] == a["id"]
+    assert len(store) == 1
+
+    # Replaying the journal gives the same answers
+    reopened = open_store(tmp_path)
+    assert reopened.find(email="b@x.io")["fields"]["role"] == "CTO"
+    _heard(reopened, "s5", email="b@x.io")
+    assert reopened.finalize("s5")["id"] == a["id"]
+
+
+def test_rejects_bad_fields_and_keeps_the_rest(tmp_path) -> None:
+    record, problems = open_store(tmp_path).delta("s1", {"email": "nope", "name": "Sam", "age": 3})
+    assert record["fields"] == {"name": "Sam"}
+    assert len(problems) == 2
+
+
+def test_export_streams_latest_snapshots(tmp_path) -> None:
+    store = open_store(tmp_path)
+    _heard(store, "s1", name="Priya", email="priya@acme.io")
+    store.finalize("s1")
+    _heard(store, "s2", email="priya@acme.io", company="Acme")
+    store.finalize("s2")
+    _heard(store, "s3", name="Dev")
+
+    out = io.StringIO()
+    assert store.export(out, "csv", drafts=True) == 2
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [(r["status"], r["name"], r["company"]) for r in rows] == [
+        ("lead", "Priya", "Acme"),
+        ("draft", "Dev", ""),
+    ]
+
+    out = io.StringIO()
+    assert store.export(out, "jsonl") == 1
+    assert json.loads(out.getvalue())["sessions"] == ["s1", "s2"]
@@ -0,0 +1,33 @@
+import pytest
+
+import personas
+
+
+def test_route_prefers_job_then_room_metadata() -> None:
+    assert personas.route('{"persona": "barista"}', "wellness", "sdr-1") == "barista"
+    assert personas.route(None, "wellness", "sdr-1") == "wellness"
+    assert personas.route("", '{"persona": "sdr"}', "barista-1") == "sdr"
+
+
+def test_route_falls_back_to_room_name_then_default(monkeypatch) -> None:
+    monkeypatch.delenv("DEFAULT_PERSONA", raising=False)
+    assert personas.route("not json {", '{"other": 1}', "wellness_room_7") == "wellness"
+    assert personas.route('{"persona": "pirate"}', None, "voice_assistant_room_1") == "sdr"
+    monkeypatch.setenv("DEFAULT_PERSONA", "barista")
+    assert personas.route(None, None, "voice_assistant_room_1") == "barista"
+    monkeypatch.setenv("DEFAULT_PERSONA", "pirate")
+    with pytest.raises(ValueError):
+        personas.route(None, None, "voice_assistant_room_1")
+
+
+def test_every_persona_loads_under_its_own_name() -> None:
+    modules = {name: personas.load(name) for name in personas.PERSONAS}
+    assert len({id(module) for module in modules.values()}) == len(modules)
+    assert personas.load("barista") is modules["barista"]
+    assert personas.tools("barista") == ["match_menu_item", "save_order"]
+    assert personas.tools("wellness") == ["save_wellness_log"]
+
+    plugins = personas.plugins()
+    assert len(plugins) == len(set(plugins))
+    for module in modules.values():
+        assert set(module.PLUGINS) <= set(plugins)